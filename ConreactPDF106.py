@@ -1,9 +1,12 @@
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 from datetime import datetime
-from fpdf import FPDF
 import json
+import tempfile
+
+from pricing_core import reference
+from pricing_core.decision import APPROVAL_ROLES, evaluate_portfolio, portfolio_template, read_portfolio, run_decision
+from pricing_core.export import XLSX_MIME, frame_to_xlsx
+from pricing_core.instrument import sidebar_recorder
 
 st.set_page_config(page_title="Dyce Decision Engine", layout="wide")
 
@@ -30,16 +33,14 @@ st.markdown("""
 st.image(LOGO_PATH, width=200)
 
 st.title(f"⚡ Dyce Decision Engine (v{VERSION})")
-
-SIC_CODES_URL = "https://raw.githubusercontent.com/ChrisBeardsmore/Gas-Pricing/main/Sic%20Codes.xlsx"
+perf = sidebar_recorder("ConreactPDF106")
 
 @st.cache_data
 def load_sic_codes():
-    df = pd.read_excel(SIC_CODES_URL)
-    df['SIC_Code'] = df['SIC_Code'].astype(str).str.strip()
-    return df
+    return reference.load_sic_codes()
 
-sic_df = load_sic_codes()
+with perf.stage("load_sic_codes"):
+    sic_df = load_sic_codes()
 
 # --- Sidebar Config ---
 st.sidebar.header("🔧 Configuration")
@@ -51,7 +52,7 @@ max_broker_uplift_standing = st.sidebar.number_input("Max Broker Uplift Standing
 max_broker_uplift_unit_rate = st.sidebar.number_input("Max Broker Uplift Unit Rate (p/kWh)", 0.0, 10.0, 1.0)
 
 st.sidebar.subheader("Approval Matrix")
-approval_roles = ['Sales Agent', 'Channel Manager', 'Commercial Manager', 'Managing Director']
+approval_roles = APPROVAL_ROLES
 approval_matrix = {}
 for role in approval_roles:
     st.sidebar.markdown(f"**{role}**")
@@ -95,95 +96,14 @@ ccjs = st.radio("Any CCJs/Defaults in last 2 years?", ["No", "Yes"])
 payment_terms = st.selectbox("Requested Payment Terms", ["14 Days Direct Debit", "14 Days BACS", "28 Days BACS"])
 
 # --- Decision Logic ---
-def run_decision():
-    reasons = []
-    decision = "Approved"
-
-    if credit_score < refer_threshold:
-        decision = "Declined"
-        reasons.append("Declined: Credit Score below referral threshold")
-    if ccjs == "Yes":
-        decision = "Declined"
-        reasons.append("Declined: CCJs or Defaults present")
-
-    if decision != "Declined":
-        if refer_threshold <= credit_score < approve_threshold:
-            reasons.append("Referral: Credit Score between thresholds")
-
-        if (business_type in ["Sole Trader", "Partnership"] and years_trading < 1) or (business_type == "Limited Company" and years_trading < 2):
-            reasons.append("Referral: Insufficient trading history")
-
-        if sic_risk in ["High", "Very High"]:
-            reasons.append("Referral: SIC Risk is High/Very High")
-
-        if payment_terms != "14 Days Direct Debit":
-            reasons.append("Referral: Payment terms exceed maximum allowed")
-
-        if unit_margin_ppkwh < minimum_unit_margin_ppkwh:
-            reasons.append("Referral: Unit Margin below minimum")
-
-        if broker_uplift_standing > max_broker_uplift_standing:
-            reasons.append("Referral: Standing charge uplift exceeds maximum")
-
-        if broker_uplift_unit_rate > max_broker_uplift_unit_rate:
-            reasons.append("Referral: Unit rate uplift exceeds maximum")
-
-    if decision == "Declined":
-        required_approver = None
-    else:
-        required_approver = "Managing Director"
-        for role in approval_roles:
-            limits = approval_matrix[role]
-            if (number_of_sites <= limits['Max Sites'] and
-                contract_value <= limits['Max Spend'] and
-                annual_volume_kwh <= limits['Max Volume (kWh)']):
-                required_approver = role
-                break
-
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    return decision, required_approver, reasons, timestamp
-
-# --- PDF Export ---
-class PDF(FPDF):
-    def header(self):
-        self.image(LOGO_PATH, x=10, y=8, w=50)
-        self.ln(35)
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(15, 42, 52)
-        self.cell(0, 10, f'Report generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', 0, 0, 'C')
-
-def export_to_pdf(inputs, decision, approver, reasons, timestamp):
-    pdf = PDF()
-    pdf.add_page()
-    pdf.set_font('Arial', 'B', 14)
-    pdf.set_text_color(15, 42, 52)
-    pdf.cell(0, 10, 'Dyce Credit Decision Report', ln=True, align='C')
-    pdf.ln(10)
-
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 10, 'Inputs Summary:', ln=True)
-    pdf.set_font('Arial', '', 12)
-    for k, v in inputs.items():
-        pdf.multi_cell(0, 10, f"{k}: {v}")
-
-    pdf.ln(5)
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 10, 'Decision:', ln=True)
-    pdf.set_font('Arial', '', 12)
-    pdf.multi_cell(0, 10, f"Decision: {decision}\nApprover Required: {approver if approver else 'N/A'}\nTimestamp: {timestamp}")
-
-    pdf.ln(5)
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 10, 'Reasons / Stipulations:', ln=True)
-    pdf.set_font('Arial', '', 12)
-    for reason in reasons:
-        pdf.multi_cell(0, 10, f"- {reason}")
-
-    pdf_bytes = pdf.output(dest='S').encode('latin1')
-    return BytesIO(pdf_bytes)
+decision_config = {
+    'approve_threshold': approve_threshold,
+    'refer_threshold': refer_threshold,
+    'minimum_unit_margin_ppkwh': minimum_unit_margin_ppkwh,
+    'max_broker_uplift_standing': max_broker_uplift_standing,
+    'max_broker_uplift_unit_rate': max_broker_uplift_unit_rate,
+    'approval_matrix': approval_matrix,
+}
 
 # --- Run Decision & Download ---
 if st.button("Run Decision Engine"):
@@ -205,7 +125,22 @@ if st.button("Run Decision Engine"):
         'Payment Terms': payment_terms
     }
 
-    final_decision, required_approver, reasons, timestamp = run_decision()
+    with perf.stage("run_decision"):
+        final_decision, required_approver, reasons = run_decision({
+            'Business Type': business_type,
+            'Number of Sites': number_of_sites,
+            'Annual Volume (kWh)': annual_volume_kwh,
+            'Contract Value (£)': contract_value,
+            'Unit Margin (p/kWh)': unit_margin_ppkwh,
+            'Broker Uplift Standing (p/day)': broker_uplift_standing,
+            'Broker Uplift Unit Rate (p/kWh)': broker_uplift_unit_rate,
+            'SIC Risk': sic_risk,
+            'Credit Score': credit_score,
+            'Years Trading': years_trading,
+            'CCJs': ccjs,
+            'Payment Terms': payment_terms,
+        }, decision_config)
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     st.subheader("Decision Results")
     st.write(f"**Final Decision:** {final_decision}")
@@ -217,5 +152,63 @@ if st.button("Run Decision Engine"):
     for reason in reasons:
         st.markdown(f"- {reason}")
 
-    pdf_data = export_to_pdf(inputs, final_decision, required_approver, reasons, timestamp)
+    from pricing_core.reports import export_to_pdf
+
+    with perf.stage("export_to_pdf"):
+        pdf_data = export_to_pdf(inputs, final_decision, required_approver, reasons, timestamp)
     st.download_button("Download PDF Report", pdf_data, "Credit_Decision_Report.pdf", "application/pdf")
+
+# --- Portfolio Review ---
+st.header("4️⃣ Portfolio Review")
+st.markdown("Evaluate a whole portfolio against the current sidebar configuration.")
+
+st.download_button("Download Portfolio Template", portfolio_template(), "portfolio_template.csv", "text/csv")
+portfolio_file = st.file_uploader("Upload Portfolio (CSV or XLSX)", type=["csv", "xlsx"])
+
+if portfolio_file:
+    try:
+        portfolio = read_portfolio(portfolio_file)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+
+    with perf.stage("evaluate_portfolio", rows=len(portfolio)):
+        decisions = evaluate_portfolio(portfolio, decision_config, sic_df)
+
+    cols = st.columns(4)
+    cols[0].metric("Accounts", f"{len(decisions):,}")
+    cols[1].metric("Approved", f"{(decisions['Decision'] == 'Approved').sum():,}")
+    cols[2].metric("Approved with Referrals", f"{((decisions['Decision'] == 'Approved') & (decisions['Referral Count'] > 0)).sum():,}")
+    cols[3].metric("Declined", f"{(decisions['Decision'] == 'Declined').sum():,}")
+    st.dataframe(decisions)
+
+    with perf.stage("frame_to_xlsx", rows=len(decisions)):
+        decisions_xlsx = frame_to_xlsx(decisions, "Decisions")
+    st.download_button(
+        "Download Decision Table",
+        decisions_xlsx,
+        f"Portfolio_Decisions_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+        XLSX_MIME
+    )
+
+    if st.button("Generate PDF Reports (zip)"):
+        from pricing_core.reports import write_reports_zip
+
+        progress_bar = st.progress(0.0, text="Rendering reports...")
+
+        def show_progress(done, total):
+            if done == total or done % 25 == 0:
+                progress_bar.progress(done / total, text=f"Rendered {done:,} of {total:,} reports")
+
+        with tempfile.TemporaryFile() as zip_file:
+            with perf.stage("write_reports_zip", reports=len(decisions)):
+                failed = write_reports_zip(decisions, zip_file, progress=show_progress)
+            if failed:
+                st.warning(f"{len(failed):,} report(s) could not be rendered; the zip holds an .error.txt note for each.")
+            zip_file.seek(0)
+            st.download_button(
+                "Download PDF Reports",
+                zip_file.read(),
+                f"Credit_Decision_Reports_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
+                "application/zip"
+            )
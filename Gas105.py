@@ -1,17 +1,24 @@
 import streamlit as st
-import pandas as pd
-import io
+
+from pricing_core.bands import GAS_BANDS
+from pricing_core.export import XLSX_MIME, frame_to_xlsx
+from pricing_core.ingest import load_flat_file
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.memo import memo, template_hash
+from pricing_core.uplifts import CREDIT_SCORE_COLUMNS, apply_uplifts, band_uplifts
 
 st.set_page_config(page_title="Gas Pricing Uplift Tool", layout="wide")
 st.title("🔹 Gas Pricing Uplift Tool")
+perf = sidebar_recorder("Gas105")
 
-uploaded_file = st.file_uploader("Upload your pricing XLSX file:", type="xlsx")
+uploaded_file = st.file_uploader("Upload your pricing file (XLSX or CSV):", type=["xlsx", "csv"])
 
 if uploaded_file:
     # Read Excel
-    df = pd.read_excel(uploaded_file)
+    with perf.stage("load_flat_file"):
+        df = load_flat_file(uploaded_file)
     # Remove the Credit Score columns if they exist
-    df = df.drop(columns=[col for col in ["Minimum_Credit_Score", "Maximum_Credit_Score"] if col in df.columns])
+    df = df.drop(columns=[col for col in CREDIT_SCORE_COLUMNS if col in df.columns])
     # Show preview
     st.subheader("📄 Flat File Preview")
     st.dataframe(df.head())
@@ -20,15 +27,7 @@ if uploaded_file:
     st.subheader("Step 1 – Enter Uplifts (pence per kWh and pence per day)")
 
     # Consumption Bands
-    default_bands = [
-        {"Min": 1000, "Max": 24999},
-        {"Min": 25000, "Max": 49999},
-        {"Min": 50000, "Max": 73199},
-        {"Min": 73200, "Max": 124999},
-        {"Min": 125000, "Max": 292999},
-        {"Min": 293000, "Max": 449999},
-        {"Min": 450000, "Max": 731999},
-    ]
+    default_bands = GAS_BANDS
 
     band_inputs = []
 
@@ -91,40 +90,11 @@ if uploaded_file:
         value=20000
     )
 
-    # Function to determine uplift per row
-    def get_uplifts(row):
-        consumption = row["Minimum_Annual_Consumption"]
-        matched_band = next((b for b in band_inputs if b["Min"] <= consumption <= b["Max"]), band_inputs[-1])
-
-        # Determine if carbon neutral
-        carbon_raw = str(row.get("Carbon_Offset", "")).strip().lower()
-        carbon = carbon_raw in ["yes", "y", "true", "1"]
-
-        # Contract duration (force match to band selection)
-        contract = matched_band["Contract"]
-
-        if carbon:
-            uplift_unit = matched_band["Carbon_Unit"]
-            uplift_standing = matched_band["Carbon_Standing"]
-        else:
-            uplift_unit = matched_band["Standard_Unit"]
-            uplift_standing = matched_band["Standard_Standing"]
-
-        return pd.Series({
-            "Uplift_Unit": uplift_unit,
-            "Uplift_Standing": uplift_standing
-        })
-
-    # Apply
-    uplift_df = df.apply(get_uplifts, axis=1)
-    df_final = pd.concat([df.reset_index(drop=True), uplift_df], axis=1)
-
-    # Compute uplifted columns
-    df_final["Unit Rate"] = (df_final["Unit_Rate"] + df_final["Uplift_Unit"]).round(4)
-    df_final["Standing Charge"] = (df_final["Standing_Charge"] + df_final["Uplift_Standing"]).round(4)
-    df_final["Total Annual Cost (£)"] = (
-        (df_final["Standing Charge"] * 365) + (df_final["Unit Rate"] * df_final["Minimum_Annual_Consumption"])
-    ) / 100
+    # Band uplifts (the contract selection does not change the uplift); the
+    # priced file and its workbook are memoized per flat file and uplifts
+    memo_key = (df.attrs["flat_file_key"], template_hash(band_inputs))
+    with perf.stage("band_uplifts", rows=len(df)):
+        df_final = memo.get_or_build(("priced", *memo_key), lambda: apply_uplifts(df, band_uplifts(df, band_inputs)))
 
     # Select only columns to display/export
     display_cols = [
@@ -152,13 +122,12 @@ if uploaded_file:
     st.dataframe(df_final[display_cols].head())
 
     # Excel output
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df_final[display_cols].to_excel(writer, index=False, sheet_name="PriceList")
+    with perf.stage("frame_to_xlsx", rows=len(df_final)):
+        price_list_xlsx = memo.get_or_build(("price_list", *memo_key), lambda: frame_to_xlsx(df_final[display_cols], "PriceList"))
 
     st.download_button(
         "⬇️ Download Broker Price List",
-        data=output.getvalue(),
+        data=price_list_xlsx,
         file_name="broker_pricelist.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mime=XLSX_MIME
     )
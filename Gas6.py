@@ -1,8 +1,17 @@
 import streamlit as st
+from datetime import datetime
+
+from pricing_core.credit import (
+    CRITERIA, DECISIONS, DEFAULT_THRESHOLDS, DEFAULT_WEIGHTS, calibrate, customer_template, outcome_flags, prediction_accuracy, read_customers, score_customer,
+    score_customers, weight_grid,
+)
+from pricing_core.export import XLSX_MIME, frame_to_xlsx
+from pricing_core.instrument import sidebar_recorder
 
 st.set_page_config(page_title="Energy Customer Credit Decision Engine", layout="centered")
 
 st.title("⚡ Energy Customer Credit Decision Engine")
+perf = sidebar_recorder("Gas6")
 
 st.markdown("## 1️⃣ Enter Customer Data")
 
@@ -14,97 +23,127 @@ contract_value = st.number_input("Contract Value (£)", min_value=0.0, value=300
 
 st.markdown("## 2️⃣ Adjust Scoring Weights")
 
-weight_creditsafe = st.number_input("Weight: Creditsafe Score", min_value=0.0, max_value=1.0, value=0.4, step=0.01)
-weight_years_trading = st.number_input("Weight: Years Trading", min_value=0.0, max_value=1.0, value=0.15, step=0.01)
-weight_sector_risk = st.number_input("Weight: Sector Risk", min_value=0.0, max_value=1.0, value=0.15, step=0.01)
-weight_annual_consumption = st.number_input("Weight: Annual Consumption", min_value=0.0, max_value=1.0, value=0.15, step=0.01)
-weight_contract_value = st.number_input("Weight: Contract Value", min_value=0.0, max_value=1.0, value=0.15, step=0.01)
+# Defaults live in session state so a calibration result can overwrite them
+for criterion, weight in DEFAULT_WEIGHTS.items():
+    st.session_state.setdefault(f"weight_{criterion}", weight)
+st.session_state.setdefault("stipulations_threshold", DEFAULT_THRESHOLDS["stipulations"])
+
+weight_creditsafe = st.number_input("Weight: Creditsafe Score", min_value=0.0, max_value=1.0, step=0.01, key="weight_Creditsafe")
+weight_years_trading = st.number_input("Weight: Years Trading", min_value=0.0, max_value=1.0, step=0.01, key="weight_Years Trading")
+weight_sector_risk = st.number_input("Weight: Sector Risk", min_value=0.0, max_value=1.0, step=0.01, key="weight_Sector Risk")
+weight_annual_consumption = st.number_input("Weight: Annual Consumption", min_value=0.0, max_value=1.0, step=0.01, key="weight_Annual Consumption")
+weight_contract_value = st.number_input("Weight: Contract Value", min_value=0.0, max_value=1.0, step=0.01, key="weight_Contract Value")
 
 st.markdown("## 3️⃣ Set Decision Thresholds")
 
 approve_threshold = st.number_input("Threshold for Approved", min_value=0, max_value=100, value=80)
-stipulations_threshold = st.number_input("Threshold for Approved with Stipulations", min_value=0, max_value=100, value=60)
+stipulations_threshold = st.number_input("Threshold for Approved with Stipulations", min_value=0, max_value=100, key="stipulations_threshold")
 refer_threshold = st.number_input("Threshold for Refer / Manual Review", min_value=0, max_value=100, value=40)
 
+weights = {
+    "Creditsafe": weight_creditsafe,
+    "Years Trading": weight_years_trading,
+    "Sector Risk": weight_sector_risk,
+    "Annual Consumption": weight_annual_consumption,
+    "Contract Value": weight_contract_value,
+}
+thresholds = {"approve": approve_threshold, "stipulations": stipulations_threshold, "refer": refer_threshold}
+
 
 def credit_decision_engine():
-    def score_creditsafe(cs):
-        if cs >= 80:
-            return 100
-        elif cs >= 60:
-            return 75
-        elif cs >= 40:
-            return 50
-        else:
-            return 25
-
-    def score_years_trading(yt):
-        if yt > 5:
-            return 100
-        elif yt >= 2:
-            return 75
-        elif yt >= 1:
-            return 50
-        else:
-            return 25
-
-    def score_sector(sr):
-        mapping = {"Low": 100, "Medium": 75, "High": 50, "Very High": 25}
-        return mapping.get(sr, 50)
-
-    def score_consumption(mwh):
-        if mwh < 100:
-            return 100
-        elif mwh <= 250:
-            return 75
-        elif mwh <= 500:
-            return 50
-        else:
-            return 25
-
-    def score_contract_value(val):
-        if val < 25000:
-            return 100
-        elif val <= 50000:
-            return 75
-        elif val <= 100000:
-            return 50
-        else:
-            return 25
-
-    s1 = score_creditsafe(creditsafe_score) * weight_creditsafe
-    s2 = score_years_trading(years_trading) * weight_years_trading
-    s3 = score_sector(sector_risk) * weight_sector_risk
-    s4 = score_consumption(annual_consumption) * weight_annual_consumption
-    s5 = score_contract_value(contract_value) * weight_contract_value
-
-    total_score = s1 + s2 + s3 + s4 + s5
-
-    if total_score >= approve_threshold:
-        decision = "✅ Approved"
-    elif total_score >= stipulations_threshold:
-        decision = "⚠️ Approved with Stipulations"
-    elif total_score >= refer_threshold:
-        decision = "🔍 Refer / Manual Review"
-    else:
-        decision = "❌ Decline"
-
-    return {
-        "decision": decision,
-        "total_score": round(total_score, 1),
-        "criteria_scores": {
-            "Creditsafe": round(s1, 1),
-            "Years Trading": round(s2, 1),
-            "Sector Risk": round(s3, 1),
-            "Annual Consumption": round(s4, 1),
-            "Contract Value": round(s5, 1)
-        }
-    }
+    return score_customer({
+        "Creditsafe Score": creditsafe_score,
+        "Years Trading": years_trading,
+        "Sector Risk": sector_risk,
+        "Annual Consumption (MWh)": annual_consumption,
+        "Contract Value (£)": contract_value,
+    }, weights, thresholds)
 
 if st.button("Run Credit Decision"):
     with st.spinner("Calculating..."):
-        result = credit_decision_engine()
+        with perf.stage("credit_decision_engine"):
+            result = credit_decision_engine()
         st.success(f"**Decision: {result['decision']}**")
         st.metric("Total Score", result["total_score"])
         st.subheader("Breakdown of Scores")
         st.json(result["criteria_scores"])
+
+# --- Batch Scoring ---
+st.markdown("## 4️⃣ Batch Scoring")
+st.markdown("Score a file of customers with the weights and thresholds above. Include an Outcome column (Paid / Defaulted) to measure and calibrate the model.")
+
+st.download_button("Download Customer File Template", customer_template(), "credit_customers_template.csv", "text/csv")
+customer_file = st.file_uploader("Upload Customers (CSV or XLSX)", type=["csv", "xlsx"])
+
+if customer_file:
+    try:
+        customers = read_customers(customer_file)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+
+    with perf.stage("score_customers", rows=len(customers)):
+        scored = score_customers(customers, weights, thresholds)
+
+    counts = scored["Decision"].value_counts()
+    cols = st.columns(4)
+    for col, decision in zip(cols, DECISIONS):
+        col.metric(decision, f"{counts.get(decision, 0):,}")
+    st.dataframe(scored)
+
+    with perf.stage("frame_to_xlsx", rows=len(scored)):
+        scored_xlsx = frame_to_xlsx(scored, "Scores")
+    st.download_button(
+        "Download Scored Customers",
+        scored_xlsx,
+        f"Credit_Scores_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+        XLSX_MIME
+    )
+
+    # --- Calibration ---
+    if "Outcome" in customers.columns:
+        st.markdown("## 5️⃣ Calibrate Against Outcomes")
+        flags = outcome_flags(customers["Outcome"])
+        known = flags.notna().to_numpy()
+        if not known.any():
+            st.warning("No Outcome values were recognised; use Paid or Defaulted.")
+            st.stop()
+        if not known.all():
+            st.caption(f"{(~known).sum():,} customers have no recognised outcome and are left out of calibration.")
+        defaulted = flags[known].to_numpy(dtype=bool)
+
+        # A customer is predicted to pay when Approved or Approved with Stipulations
+        current = prediction_accuracy(scored["Total Score"].to_numpy()[known], defaulted, stipulations_threshold)
+        st.metric("Accuracy of current settings", f"{current:.1%}")
+
+        step = st.selectbox("Weight step", [0.1, 0.05, 0.025], index=1,
+                            help="Every weighting in multiples of this step that sums to 1 is tried, each with every whole-number cutoff between the Refer and Approved thresholds.")
+        candidates = weight_grid(step)
+        # The cutoff becomes the Approved with Stipulations threshold, so it
+        # has to stay between the Refer and Approved thresholds
+        if refer_threshold > approve_threshold:
+            st.warning("The Refer / Manual Review threshold is above the Approved threshold; fix the thresholds to calibrate.")
+            st.stop()
+        cutoffs = list(range(refer_threshold, approve_threshold + 1))
+        st.caption(f"{len(candidates):,} weightings × {len(cutoffs)} cutoffs ({refer_threshold}–{approve_threshold})")
+
+        calibration_key = (customer_file.name, step, refer_threshold, approve_threshold)
+        if st.button("Run Calibration"):
+            with st.spinner("Searching weightings..."):
+                with perf.stage("calibrate", rows=int(known.sum()), candidates=len(candidates)):
+                    ranked = calibrate(customers[known], defaulted, candidates, cutoffs)
+                st.session_state["calibration"] = (calibration_key, ranked)
+
+        calibration = st.session_state.get("calibration")
+        if calibration is not None and calibration[0] == calibration_key:
+            ranked = calibration[1]
+            st.dataframe(ranked)
+
+            def apply_best():
+                best = ranked.iloc[0]
+                for criterion in CRITERIA:
+                    st.session_state[f"weight_{criterion}"] = float(best[f"Weight: {criterion}"])
+                st.session_state["stipulations_threshold"] = int(best["Cutoff"])
+
+            st.button("Use the best weighting and cutoff", on_click=apply_best,
+                      help="Sets the weights above and the Approved with Stipulations threshold; the other thresholds are unchanged.")
@@ -1,31 +1,52 @@
 import streamlit as st
 import pandas as pd
-import io
+
+from pricing_core import reference
+from pricing_core.bulk import build_gas_index, prepare_gas_tariffs, quote_sites, read_site_list, site_list_template
+from pricing_core.export import XLSX_MIME, frame_to_xlsx
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.quotes import QuoteStore
+from pricing_core.suppliers import SUPPLIER_COLUMN, load_suppliers, suppliers_key
 
 st.set_page_config(page_title="Gas Multi-tool", layout="wide")
 st.title("Gas Multi-tool")
+perf = sidebar_recorder("GasdebugMulti10")
 
 # --- Load postcode-to-LDZ mapping ---
-LDZ_DATA_URL = "https://raw.githubusercontent.com/ChrisBeardsmore/Gas-Pricing/main/postcode_ldz_full.csv"
-
-@st.cache_data
-def load_ldz_data():
-    df = pd.read_csv(LDZ_DATA_URL)
-    df["Postcode"] = df["Postcode"].astype(str).str.upper().str.replace(r"\s+", "", regex=True)
-    return df
-
-ldz_df = load_ldz_data()
-
-# --- Upload Supplier Flat File ---
-uploaded_file = st.file_uploader("Upload Supplier Flat File (XLSX)", type=["xlsx"])
-
-if uploaded_file:
-    df = pd.read_excel(uploaded_file)
-
-    df["LDZ"] = df["LDZ"].astype(str).str.strip().str.upper()
-    df["Contract_Duration"] = pd.to_numeric(df["Contract_Duration"], errors='coerce').fillna(0).astype(int)
-    df["Minimum_Annual_Consumption"] = pd.to_numeric(df["Minimum_Annual_Consumption"], errors='coerce').fillna(0)
-    df["Maximum_Annual_Consumption"] = pd.to_numeric(df["Maximum_Annual_Consumption"], errors='coerce').fillna(0)
+@st.cache_resource
+def load_ldz_index():
+    return reference.load_ldz_index()
+
+try:
+    with perf.stage("load_ldz_index"):
+        ldz_index = load_ldz_index()
+except OSError as e:
+    # No local postcode_ldz_full.csv and the GitHub copy could not be fetched
+    st.error(f"Could not load the postcode to LDZ list: {e}")
+    st.stop()
+
+# The combined, prepared tariffs are kept per set of uploaded files, so a
+# rerun (e.g. a keystroke in the site form) only re-hashes the uploads
+@st.cache_resource(max_entries=4)
+def load_tariffs(flat_file_key, _uploaded_files):
+    return prepare_gas_tariffs(load_suppliers(_uploaded_files))
+
+@st.cache_resource
+def build_tariff_index(flat_file_key, _df):
+    return build_gas_index(_df)
+
+# --- Upload Supplier Flat Files ---
+# One file per supplier; each site is priced from the cheapest matching
+# tariff across all of them
+uploaded_files = st.file_uploader("Upload Supplier Flat File(s) (XLSX or CSV)", type=["xlsx", "csv"], accept_multiple_files=True)
+
+if uploaded_files:
+    with perf.stage("load_flat_file", files=len(uploaded_files)):
+        df = load_tariffs(suppliers_key(uploaded_files), uploaded_files)
+    with perf.stage("build_tariff_index", rows=len(df)):
+        tariff_index = build_tariff_index(df.attrs["flat_file_key"], df)
+    if len(uploaded_files) > 1:
+        st.caption(", ".join(f"{name}: {count:,} tariffs" for name, count in df[SUPPLIER_COLUMN].value_counts(sort=False).items()))
 
     st.subheader("Quote Details")
     customer_name = st.text_input("Customer Name")
@@ -36,94 +57,120 @@ if uploaded_file:
     output_filename = st.text_input("Output file name (without .xlsx)", value="multi_site_quote")
 
     st.subheader("Multi-site Input")
-    input_rows = []
-
-    for i in range(10):
-        st.markdown(f"### Site {i+1}")
-        cols = st.columns([1.2, 1.2, 1, 1, 1, 1, 1, 1.5])
-
-        site = cols[0].text_input("Site Name", key=f"site_{i}")
-        postcode_input = cols[1].text_input("Postcode", key=f"postcode_{i}")
-        postcode = postcode_input.replace(" ", "").upper()
-        kwh = cols[2].number_input("Annual Consumption (kWh)", min_value=0, value=0, step=1000, key=f"kwh_{i}")
-
-        ldz = ""
-        unit_rate = standing_charge = 0
-        debug_info = ""
-
-        if postcode:
-            match = ldz_df[ldz_df["Postcode"] == postcode]
-            if match.empty and len(postcode) >= 5:
-                match = ldz_df[ldz_df["Postcode"].str.startswith(postcode[:5])]
-
-            if not match.empty:
-                ldz = match.iloc[0]["LDZ"]
-                debug_info += f"Matched Postcode {postcode} to LDZ: {ldz}\n"
-
-                tariffs = df[
-                    (df["LDZ"] == ldz) &
-                    (df["Contract_Duration"] == contract_duration) &
-                    (df["Minimum_Annual_Consumption"] <= kwh) &
-                    (df["Maximum_Annual_Consumption"] >= kwh) &
-                    (df["Carbon_Offset"] == carbon_offset_required)
-                ]
-
-                debug_info += f"Tariffs found: {len(tariffs)}\n"
-
-                if not tariffs.empty:
-                    tariff = tariffs.sort_values("Unit_Rate").iloc[0]
-                    unit_rate = tariff["Unit_Rate"]
-                    standing_charge = tariff["Standing_Charge"]
-                    debug_info += f"Unit Rate: {unit_rate}, Standing Charge: {standing_charge}\n"
+    site_mode = st.radio("Site entry", ["Manual (up to 10 sites)", "Bulk upload (CSV/XLSX site list)"], horizontal=True)
+    results_df = None
+
+    if site_mode.startswith("Bulk"):
+        st.download_button(
+            label="Download Site List Template",
+            data=site_list_template(),
+            file_name="site_list_template.csv",
+            mime="text/csv"
+        )
+        site_file = st.file_uploader("Upload Site List (CSV or XLSX)", type=["csv", "xlsx"])
+
+        if site_file:
+            try:
+                sites = read_site_list(site_file)
+            except ValueError as e:
+                st.error(str(e))
+                st.stop()
+
+            with perf.stage("quote_sites", sites=len(sites)):
+                results_df = quote_sites(sites, df, tariff_index, ldz_index, contract_duration, carbon_offset_required, customer_name)
+
+            cols = st.columns(3)
+            cols[0].metric("Sites", f"{len(results_df):,}")
+            cols[1].metric("Priced", f"{(results_df['Status'] == 'Priced').sum():,}")
+            cols[2].metric("Total £/year", f"£{results_df['Total Annual Cost (£)'].sum():,.2f}")
+            st.dataframe(results_df)
+    else:
+        input_rows = []
+
+        for i in range(10):
+            st.markdown(f"### Site {i+1}")
+            cols = st.columns([1.2, 1.2, 1, 1, 1, 1, 1, 1.5])
+
+            site = cols[0].text_input("Site Name", key=f"site_{i}")
+            postcode_input = cols[1].text_input("Postcode", key=f"postcode_{i}")
+            postcode = postcode_input.replace(" ", "").upper()
+            kwh = cols[2].number_input("Annual Consumption (kWh)", min_value=0, value=0, step=1000, key=f"kwh_{i}")
+
+            ldz = supplier = ""
+            unit_rate = standing_charge = 0
+            debug_info = ""
+
+            if postcode:
+                matched_ldz, match_level = ldz_index.resolve(postcode_input)
+
+                if matched_ldz:
+                    ldz = matched_ldz
+                    debug_info += f"Matched Postcode {postcode} to LDZ: {ldz} (by {match_level})\n"
+
+                    tariff_rows = tariff_index.candidates((ldz, contract_duration, carbon_offset_required), kwh)
+
+                    debug_info += f"Tariffs found: {len(tariff_rows)}\n"
+
+                    if len(tariff_rows):
+                        tariff = df.iloc[tariff_rows[0]]
+                        supplier = tariff[SUPPLIER_COLUMN]
+                        unit_rate = tariff["Unit_Rate"]
+                        standing_charge = tariff["Standing_Charge"]
+                        debug_info += f"Supplier: {supplier}, Unit Rate: {unit_rate}, Standing Charge: {standing_charge}\n"
+                    else:
+                        debug_info += "No matching tariff for consumption, contract duration, or product type.\n"
                 else:
-                    debug_info += "No matching tariff for consumption, contract duration, or product type.\n"
-            else:
-                debug_info += "No LDZ mapping found for postcode.\n"
-
-        cols[3].metric("Unit Rate (p/kWh)", f"{unit_rate:.3f}")
-        cols[4].metric("Standing Charge (p/day)", f"{standing_charge:.3f}")
-
-        uplift_unit = cols[5].number_input("Uplift Unit (p/kWh)", min_value=0.0, value=0.0, step=0.01, key=f"uplift_unit_{i}")
-        uplift_sc = cols[6].number_input("Uplift SC (p/day)", min_value=0.0, value=0.0, step=0.1, key=f"uplift_sc_{i}")
-
-        final_unit = unit_rate + uplift_unit
-        final_sc = standing_charge + uplift_sc
-        total_cost = round((final_unit * kwh + final_sc * 365) / 100, 2) if kwh > 0 else 0
-
-        cols[7].metric("Total £/year", f"£{total_cost:.2f}")
-
-        if debug_info:
-            st.text_area("Debug Info", debug_info, height=100)
-
-        input_rows.append({
-            "Customer": customer_name,
-            "Site": site,
-            "Postcode": postcode_input,
-            "Annual Consumption (kWh)": kwh,
-            "LDZ": ldz,
-            "Unit Rate (p/kWh)": unit_rate,
-            "Standing Charge (p/day)": standing_charge,
-            "Uplift Unit Rate (p/kWh)": uplift_unit,
-            "Uplift Standing Charge (p/day)": uplift_sc,
-            "Final Unit Rate (p/kWh)": final_unit,
-            "Final Standing Charge (p/day)": final_sc,
-            "Total Annual Cost (£)": total_cost
-        })
-
-    if input_rows:
-        st.subheader("Download Results")
+                    debug_info += "No LDZ mapping found for postcode.\n"
+
+            cols[3].metric("Unit Rate (p/kWh)", f"{unit_rate:.3f}")
+            cols[4].metric("Standing Charge (p/day)", f"{standing_charge:.3f}")
+
+            uplift_unit = cols[5].number_input("Uplift Unit (p/kWh)", min_value=0.0, value=0.0, step=0.01, key=f"uplift_unit_{i}")
+            uplift_sc = cols[6].number_input("Uplift SC (p/day)", min_value=0.0, value=0.0, step=0.1, key=f"uplift_sc_{i}")
+
+            final_unit = unit_rate + uplift_unit
+            final_sc = standing_charge + uplift_sc
+            total_cost = round((final_unit * kwh + final_sc * 365) / 100, 2) if kwh > 0 else 0
+
+            cols[7].metric("Total £/year", f"£{total_cost:.2f}")
+
+            if debug_info:
+                st.text_area("Debug Info", debug_info, height=100)
+
+            input_rows.append({
+                "Customer": customer_name,
+                "Site": site,
+                "Postcode": postcode_input,
+                "Annual Consumption (kWh)": kwh,
+                "LDZ": ldz,
+                SUPPLIER_COLUMN: supplier,
+                "Unit Rate (p/kWh)": unit_rate,
+                "Standing Charge (p/day)": standing_charge,
+                "Uplift Unit Rate (p/kWh)": uplift_unit,
+                "Uplift Standing Charge (p/day)": uplift_sc,
+                "Final Unit Rate (p/kWh)": final_unit,
+                "Final Standing Charge (p/day)": final_sc,
+                "Total Annual Cost (£)": total_cost
+            })
+
         results_df = pd.DataFrame(input_rows)
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            results_df.to_excel(writer, index=False, sheet_name="Quote")
-        output.seek(0)
+    if results_df is not None and not results_df.empty:
+        st.subheader("Download Results")
+
+        with perf.stage("frame_to_xlsx", rows=len(results_df)):
+            quote_xlsx = frame_to_xlsx(results_df, "Quote")
 
         st.download_button(
             label="Download Quote as Excel",
-            data=output,
+            data=quote_xlsx,
             file_name=f"{output_filename}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=XLSX_MIME
         )
+
+        if st.button("💾 Save Quote to Quote History"):
+            with perf.stage("save_quote", rows=len(results_df)):
+                quote_id = QuoteStore().save_quote("GasdebugMulti10", results_df, customer=customer_name)
+            st.success(f"Saved as quote #{quote_id}.")
 else:
-    st.info("Please upload the supplier flat file to begin.")
+    st.info("Please upload one or more supplier flat files to begin.")
@@ -1,31 +1,54 @@
 import streamlit as st
-import pandas as pd
+import altair as alt
 import io
 import json
 from datetime import datetime
 
+from pricing_core.bands import GAS_BANDS, overlapping_bands
+from pricing_core.export import XLSX_MIME, frame_to_xlsx, write_workbooks
+from pricing_core.incremental import PricingState
+from pricing_core.ingest import flat_file_key, iter_flat_file, load_flat_file, read_source_bytes
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.memo import memo, template_hash
+from pricing_core.quotes import QuoteStore
+from pricing_core.scenarios import SUMMARY_GROUPS, ScenarioSet
+from pricing_core.suppliers import supplier_name, unique_names
+from pricing_core.sweep import SWEEP_METRICS, UpliftSweep, uplift_grid
+from pricing_core.uplifts import broker_columns, drop_credit_scores, price_flat_file, year_inputs_from_template
+
 st.set_page_config(page_title="Dyce Gas Pricing Tool with Configurable Bands", layout="wide")
 st.title("🔹 Dyce Gas Pricing Tool with Configurable Bands & Version Control")
+perf = sidebar_recorder("Gaswcost4")
 
-uploaded_file = st.file_uploader("Upload your supplier flat file (.xlsx):", type="xlsx")
+uploaded_file = st.file_uploader("Upload your supplier flat file (.xlsx or .csv):", type=["xlsx", "csv"])
+large_file_mode = st.sidebar.checkbox(
+    "🐘 Large file mode",
+    help="Stream the flat file in chunks instead of loading it: the preview shows the first rows only, and the downloads are priced and written chunk by chunk."
+)
+PREVIEW_ROWS = 5
 
 # Load Margin Template
 st.sidebar.subheader("🔖 Load Margin Template")
 margin_template_file = st.sidebar.file_uploader("Upload Margin Template (JSON)", type="json")
 loaded_template = json.load(margin_template_file) if margin_template_file else {}
 
+# Margin and customer cost over a grid of band uplifts instead of one rerun per guess
+sweep_mode = st.sidebar.checkbox(
+    "📈 Uplift sweep mode",
+    help="Price a grid of unit and standing uplifts for a band and year, and show the flat file's total margin and customer cost at every point."
+)
+
+# Other templates to compare against the configuration on this page
+st.sidebar.subheader("🧪 Compare Scenarios")
+scenario_files = st.sidebar.file_uploader(
+    "Margin templates to compare (JSON)", type="json", accept_multiple_files=True,
+    help="Each template is priced over the whole flat file alongside the current configuration, with deltas per band and per LDZ."
+)
+
 # Configurable Bands
 st.subheader("Step 1 – Configure Consumption Bands")
 
-default_bands = loaded_template.get("bands", [
-    {"Min": 1000, "Max": 24999},
-    {"Min": 25000, "Max": 49999},
-    {"Min": 50000, "Max": 73199},
-    {"Min": 73200, "Max": 124999},
-    {"Min": 125000, "Max": 292999},
-    {"Min": 293000, "Max": 449999},
-    {"Min": 450000, "Max": 731999},
-])
+default_bands = loaded_template.get("bands", GAS_BANDS)
 
 bands = []
 for i in range(len(default_bands)):
@@ -36,9 +59,8 @@ for i in range(len(default_bands)):
     bands.append({"Min": min_val, "Max": max_val})
 
 # Validate bands for overlaps
-for idx in range(1, len(bands)):
-    if bands[idx]['Min'] <= bands[idx-1]['Max']:
-        st.error(f"Bands {idx} and {idx+1} are overlapping. Please correct them!")
+for previous, current in overlapping_bands(bands):
+    st.error(f"Bands {previous} and {current} are overlapping. Please correct them!")
 
 version_label = st.text_input("Enter version label for this pricing configuration:", value=loaded_template.get('template_name', 'v1'))
 
@@ -108,63 +130,166 @@ if st.button("💾 Save Margin Template"):
         mime="application/json"
     )
 
-if uploaded_file:
-    df = pd.read_excel(uploaded_file)
-    df = df.drop(columns=[col for col in ["Minimum_Credit_Score", "Maximum_Credit_Score"] if col in df.columns])
-
-    def calculate_uplifts(row):
-        duration = int(row["Contract_Duration"] / 12)
-        year_config = year_inputs.get(duration)
-        if not year_config:
-            return pd.Series({"Uplift_Unit": 0, "Uplift_Standing": 0})
-
-        cost_unit = cost_standing = 0
-        if year_config["cost_method"] == "fixed":
-            fixed = year_config["fixed_cost"] * 100
-            cost_standing = (fixed * year_config["standing_pct"] / 100) / 365
-            cost_unit = (fixed * year_config["unit_pct"] / 100) / max(row["Minimum_Annual_Consumption"],1)
-        else:
-            cost_unit = year_config["ppkwh"]
-
-        band = next((b for b in year_config["bands"] if b["Min"] <= row["Minimum_Annual_Consumption"] <= b["Max"]), year_config["bands"][-1])
-        carbon = str(row.get("Carbon_Offset", "")).strip().lower() in ["yes", "y", "true", "1"]
-        uplift_unit = cost_unit + (band["Carbon_Unit"] if carbon else band["Standard_Unit"])
-        uplift_standing = cost_standing + (band["Carbon_Standing"] if carbon else band["Standard_Standing"])
+if uploaded_file and large_file_mode:
+    # Never hold the whole file: only the first rows are parsed for the
+    # preview, and the downloads read, price and write it chunk by chunk
+    source_key = flat_file_key(read_source_bytes(uploaded_file))
+    with perf.stage("preview_first_chunk"):
+        chunks = iter_flat_file(uploaded_file, chunk_rows=PREVIEW_ROWS)
+        preview = price_flat_file(drop_credit_scores(next(chunks)), year_inputs)
+        chunks.close()
 
-        return pd.Series({"Uplift_Unit": uplift_unit, "Uplift_Standing": uplift_standing})
+    def priced_file():
+        return (price_flat_file(drop_credit_scores(chunk), year_inputs) for chunk in iter_flat_file(uploaded_file))
+    export_details = {"streamed": True}
+elif uploaded_file:
+    with perf.stage("load_flat_file"):
+        df = drop_credit_scores(load_flat_file(uploaded_file))
+    source_key = df.attrs["flat_file_key"]
 
-    uplift_df = df.apply(calculate_uplifts, axis=1)
-    df_final = pd.concat([df.reset_index(drop=True), uplift_df], axis=1)
+    # The priced file is kept across reruns; an edit re-prices only the
+    # (year, band, carbon) partitions whose inputs changed
+    pricing = st.session_state.get("pricing_state")
+    if pricing is None or pricing[0] != source_key:
+        with perf.stage("price_flat_file", rows=len(df)):
+            pricing = (source_key, PricingState(df, year_inputs))
+        st.session_state["pricing_state"] = pricing
+    pricing_state = pricing[1]
+    with perf.stage("reprice_changes"):
+        df_final = pricing_state.update(year_inputs)
+    preview = df_final.head()
 
-    df_final["Unit Rate"] = (df_final["Unit_Rate"] + df_final["Uplift_Unit"]).round(4)
-    df_final["Standing Charge"] = (df_final["Standing_Charge"] + df_final["Uplift_Standing"]).round(4)
-    df_final["Total Annual Cost (£)"] = ((df_final["Standing Charge"] * 365) + (df_final["Unit Rate"] * df_final["Minimum_Annual_Consumption"])) / 100
+    def priced_file():
+        return df_final
+    export_details = {"rows": len(df_final)}
 
+if uploaded_file:
     st.subheader("✅ Final Price List Preview")
-    st.dataframe(df_final.head())
+    st.dataframe(preview)
 
     broker_file_name = st.text_input("Broker File Name (without extension):", value="broker_pricelist")
-    output_broker = io.BytesIO()
-    with pd.ExcelWriter(output_broker, engine='xlsxwriter') as writer:
-        df_final[[c for c in df_final.columns if c not in ["Uplift_Unit", "Uplift_Standing"]]].to_excel(writer, index=False, sheet_name='PriceList')
-
-    st.download_button(
-        "⬇️ Download Broker Price List",
-        data=output_broker.getvalue(),
-        file_name=f"{broker_file_name}_{version_label}.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
 
     # Internal Audit Output
     st.subheader("🔍 Internal Audit Report")
     audit_file_name = st.text_input("Audit File Name (without extension):", value="internal_audit_report")
-    output_audit = io.BytesIO()
-    with pd.ExcelWriter(output_audit, engine='xlsxwriter') as writer:
-        df_final.to_excel(writer, index=False, sheet_name='AuditData')
 
-    st.download_button(
-        "⬇️ Download Internal Audit Report",
-        data=output_audit.getvalue(),
-        file_name=f"{audit_file_name}_{version_label}.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    # Both workbooks are built together, and only when asked for. This
+    # session keeps the bytes it built so both downloads stay available
+    # across reruns; the shared memo only saves rebuilding them (it may
+    # evict them, or skip workbooks larger than its budget)
+    export_key = ("workbooks", source_key, template_hash(year_inputs))
+    exports = st.session_state.get("exports")
+    if exports is None or exports[0] != export_key:
+        cached = memo.get(export_key)
+        exports = (export_key, cached) if cached is not None else None
+    if st.button("📦 Prepare Downloads") and exports is None:
+        output_broker = io.BytesIO()
+        output_audit = io.BytesIO()
+        with perf.stage("write_workbooks", **export_details):
+            write_workbooks(priced_file(), [
+                (output_broker, "PriceList", broker_columns),
+                (output_audit, "AuditData", None),
+            ])
+        exports = (export_key, memo.put(export_key, (output_broker.getvalue(), output_audit.getvalue())))
+    st.session_state["exports"] = exports
+
+    if exports:
+        broker_bytes, audit_bytes = exports[1]
+        st.download_button(
+            "⬇️ Download Broker Price List",
+            data=broker_bytes,
+            file_name=f"{broker_file_name}_{version_label}.xlsx",
+            mime=XLSX_MIME
+        )
+        st.download_button(
+            "⬇️ Download Internal Audit Report",
+            data=audit_bytes,
+            file_name=f"{audit_file_name}_{version_label}.xlsx",
+            mime=XLSX_MIME
+        )
+
+    # Keep a copy of the issued price list in the quote history (QuoteHistory.py)
+    if st.button("💾 Save Price List to Quote History"):
+        with perf.stage("save_quote", **export_details):
+            quote_id = QuoteStore().save_quote(
+                "Gaswcost4", priced_file(), template_version=version_label, flat_file_key=source_key
+            )
+        st.success(f"Saved as quote #{quote_id}.")
+
+if uploaded_file and scenario_files:
+    st.subheader("🧪 Scenario Comparison")
+    if large_file_mode:
+        st.info("Scenario comparison needs the whole flat file loaded; turn off large file mode to compare templates.")
+    else:
+        templates = [json.load(f) for f in scenario_files]
+        labels = unique_names([version_label] + [t.get("template_name") or supplier_name(f) for t, f in zip(templates, scenario_files)])
+        scenarios = dict(zip(labels, [year_inputs] + [year_inputs_from_template(t) for t in templates]))
+
+        # All templates are priced together; the summaries are memoized for
+        # this flat file and set of templates
+        scenario_key = ("scenarios", source_key, *(template_hash(config) for config in scenarios.values()), *labels)
+        with perf.stage("scenario_summaries", rows=len(df), scenarios=len(scenarios)):
+            summaries = memo.get_or_build(scenario_key, lambda: ScenarioSet(df, scenarios, bands=bands).summaries())
+
+        st.caption(f"Deltas are against the current configuration ({labels[0]}); prices are means over the flat file's tariffs.")
+        group_by = st.radio("Compare by", SUMMARY_GROUPS, horizontal=True)
+        st.dataframe(summaries[group_by], use_container_width=True)
+
+if uploaded_file and sweep_mode:
+    st.subheader("📈 Uplift Sweep")
+    if large_file_mode:
+        st.info("The uplift sweep needs the whole flat file loaded; turn off large file mode to use it.")
+    else:
+        cols = st.columns(3)
+        sweep_year = cols[0].selectbox("Year", list(year_inputs), key="sweep_year")
+        sweep_band = cols[1].selectbox(
+            "Band", range(len(bands)), format_func=lambda i: f"Band {i+1}: {bands[i]['Min']} – {bands[i]['Max']} kWh", key="sweep_band"
+        )
+        sweep_product = cols[2].radio("Product", ["Standard", "Carbon"], horizontal=True, key="sweep_product")
+
+        cols = st.columns(3)
+        unit_low = cols[0].number_input("Unit uplift from (p/kWh)", min_value=0.0, value=0.0, step=0.1)
+        unit_high = cols[1].number_input("Unit uplift to (p/kWh)", min_value=0.0, value=2.0, step=0.1)
+        unit_steps = cols[2].number_input("Unit uplift steps", min_value=2, max_value=101, value=21)
+        cols = st.columns(3)
+        standing_low = cols[0].number_input("Standing uplift from (p/day)", min_value=0.0, value=0.0, step=1.0)
+        standing_high = cols[1].number_input("Standing uplift to (p/day)", min_value=0.0, value=20.0, step=1.0)
+        standing_steps = cols[2].number_input("Standing uplift steps", min_value=2, max_value=101, value=21)
+        unit_grid = uplift_grid(unit_low, unit_high, unit_steps)
+        standing_grid = uplift_grid(standing_low, standing_high, standing_steps)
+
+        # Every grid point is priced against the band's rows at once; the
+        # rest of the flat file keeps the configuration above
+        sweep_key = (source_key, template_hash(year_inputs))
+        sweep_state = st.session_state.get("uplift_sweep")
+        if sweep_state is None or sweep_state[0] != sweep_key:
+            with perf.stage("uplift_sweep_setup", rows=len(df)):
+                sweep_state = (sweep_key, UpliftSweep(df, year_inputs))
+            st.session_state["uplift_sweep"] = sweep_state
+        uplift_sweep = sweep_state[1]
+        with perf.stage("uplift_sweep", points=len(unit_grid) * len(standing_grid)):
+            surface = uplift_sweep.sweep(sweep_year, sweep_band, unit_grid, standing_grid, carbon=sweep_product == "Carbon")
+
+        if surface["Tariffs"].iloc[0] == 0:
+            st.warning("No tariffs in the flat file fall in this year, band and product.")
+        else:
+            st.caption(f"{surface['Tariffs'].iloc[0]:,} tariffs in this band; totals are over the whole flat file.")
+            metric = st.radio("Show", SWEEP_METRICS, horizontal=True)
+            heatmap = alt.Chart(surface).mark_rect().encode(
+                x=alt.X("Standing Uplift (p/day):O", axis=alt.Axis(format=".2f")),
+                y=alt.Y("Unit Uplift (p/kWh):O", sort="descending", axis=alt.Axis(format=".4f")),
+                color=alt.Color(f"{metric}:Q", scale=alt.Scale(scheme="viridis")),
+                tooltip=["Unit Uplift (p/kWh)", "Standing Uplift (p/day)"] + SWEEP_METRICS,
+            )
+            st.altair_chart(heatmap, use_container_width=True)
+
+        sweep_all = st.checkbox("Include every year, band and product in the download")
+        if st.button("📦 Prepare Sweep Table"):
+            with perf.stage("uplift_sweep_all"):
+                table = uplift_sweep.sweep_all(unit_grid, standing_grid) if sweep_all else surface
+            st.download_button(
+                "⬇️ Download Sweep Table",
+                data=frame_to_xlsx(table, "Sweep"),
+                file_name=f"uplift_sweep_{version_label}.xlsx",
+                mime=XLSX_MIME
+            )
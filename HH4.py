@@ -1,14 +1,21 @@
-import streamlit as st
 import pandas as pd
-import io
+import streamlit as st
+
+from pricing_core.export import XLSX_MIME, frame_to_xlsx
+from pricing_core.ingest import load_flat_file
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.nhh import nhh_quote
+from pricing_core.quotes import QuoteStore
 
 st.title("NHH Pricing Calculator")
+perf = sidebar_recorder("HH4")
 
 # Upload file each time
-uploaded_file = st.file_uploader("Upload the Flat File (.xlsx)", type=["xlsx"])
+uploaded_file = st.file_uploader("Upload the Flat File (.xlsx or .csv)", type=["xlsx", "csv"])
 
 if uploaded_file is not None:
-    df = pd.read_excel(uploaded_file)
+    with perf.stage("load_flat_file"):
+        df = load_flat_file(uploaded_file)
 
     # Show the first few rows to confirm
     st.write("Flat file loaded successfully. Preview:")
@@ -37,89 +44,53 @@ if uploaded_file is not None:
     night_pct = st.slider("Night %", 0, 100, 20)
     evw_pct = st.slider("Evening & Weekend %", 0, 100, 10)
 
+    st.subheader("Quote History")
+    customer_name = st.text_input("Customer Name")
+    save_quote = st.checkbox("Save this quote to the quote history", value=False)
+
     # Validation
     if day_pct + night_pct + evw_pct != 100:
         st.error("The % split must add up to 100%.")
     else:
         if st.button("Calculate"):
 
-            # Filter DataFrame for NHH and contract duration
-            filtered = df[
-                (df["Rate_Structure"].str.upper() == "NHH") &
-                (df["Contract_Duration"] == contract_duration) &
-                (df["Minimum_Annual_Consumption"] <= eac) &
-                (df["Maximum_Annual_Consumption"] >= eac)
-            ]
+            with perf.stage("nhh_quote", rows=len(df)):
+                row, results_df = nhh_quote(
+                    df, eac, contract_duration,
+                    (uplift_standing, uplift_day, uplift_night, uplift_evw),
+                    (day_pct, night_pct, evw_pct)
+                )
 
-            if filtered.empty:
+            if row is None:
                 st.error("No matching tariff found for this EAC and contract duration.")
             else:
-                row = filtered.iloc[0]
-
-                # Base Rates + Uplifts
-                standing_p_day = row["Standing_Charge"] + uplift_standing
-                day_p_kwh = row["Day_Rate"] + uplift_day
-                night_p_kwh = row["Night_Rate"] + uplift_night
-                evw_p_kwh = row["Evening_And_Weekend_Rate"] + uplift_evw
-
-                # Consumption Split
-                day_kwh = eac * (day_pct / 100)
-                night_kwh = eac * (night_pct / 100)
-                evw_kwh = eac * (evw_pct / 100)
-
-                # Costs
-                standing_cost = standing_p_day * 365 / 100
-                day_cost = (day_kwh * day_p_kwh) / 100
-                night_cost = (night_kwh * night_p_kwh) / 100
-                evw_cost = (evw_kwh * evw_p_kwh) / 100
-
-                total_cost = standing_cost + day_cost + night_cost + evw_cost
-
                 # Display Results
                 st.success("Calculation Complete")
                 st.markdown(
                     f"**Matched Band:** {row['Minimum_Annual_Consumption']} – {row['Maximum_Annual_Consumption']} kWh"
                 )
 
-                results_df = pd.DataFrame({
-                    "Description": [
-                        "Standing Charge (p/day)",
-                        "Day Rate (p/kWh)",
-                        "Night Rate (p/kWh)",
-                        "Evening & Weekend Rate (p/kWh)",
-                        "Annual Standing Charge (£)",
-                        "Annual Day Consumption (£)",
-                        "Annual Night Consumption (£)",
-                        "Annual Evening & Weekend Consumption (£)",
-                        "Estimated Annual Cost (£)"
-                    ],
-                    "Value": [
-                        standing_p_day,
-                        day_p_kwh,
-                        night_p_kwh,
-                        evw_p_kwh,
-                        standing_cost,
-                        day_cost,
-                        night_cost,
-                        evw_cost,
-                        total_cost
-                    ]
-                })
-
                 st.table(results_df)
 
+                if save_quote:
+                    quote_line = {
+                        "Customer": customer_name,
+                        "EAC": eac,
+                        "Contract Duration (Months)": contract_duration,
+                        **dict(zip(results_df["Description"], results_df["Value"])),
+                    }
+                    quote_id = QuoteStore().save_quote("HH4", pd.DataFrame([quote_line]), customer=customer_name)
+                    st.info(f"Saved as quote #{quote_id}.")
+
                 # Prepare Excel output
-                output = io.BytesIO()
-                with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-                    results_df.to_excel(writer, index=False, sheet_name="NHH Quote")
-                    writer.save()
-                processed_data = output.getvalue()
+                with perf.stage("frame_to_xlsx"):
+                    processed_data = frame_to_xlsx(results_df, "NHH Quote")
 
                 st.download_button(
                     label="Download Excel Quote",
                     data=processed_data,
                     file_name="nhh_quote.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    mime=XLSX_MIME
                 )
 
 else:
@@ -1,31 +1,58 @@
 import streamlit as st
 import pandas as pd
-import io
-from datetime import datetime
+from datetime import date, datetime
+
+from pricing_core import reference
+from pricing_core.export import XLSX_MIME, frame_to_xlsx
+from pricing_core.ingest import load_flat_file
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.quotes import QuoteStore
+from pricing_core.tariff_index import TariffIndex
+from pricing_core.validity import ValidityIndex
 
 st.set_page_config(page_title="Direct Sales LLF Multi-tool", layout="wide")
 st.title("Direct Sales LLF Multi-tool")
+perf = sidebar_recorder("LLFMulti10")
 
-# Load LLF Mapping Table from external source
-LLF_MAPPING_URL = "https://github.com/ChrisBeardsmore/Gas-Pricing/raw/main/LLF%20Mapping%20Table_External.xlsx"
-
-@st.cache_data
+# Load LLF Mapping Table from the bundled reference data
+@st.cache_resource
 def load_llf_mapping():
-    return pd.read_excel(LLF_MAPPING_URL, skiprows=1)
+    return reference.load_llf_mapping()
+
+with perf.stage("load_llf_mapping"):
+    llf_mapping = load_llf_mapping()
 
-llf_mapping = load_llf_mapping()
+TARIFF_KEYS = ["DNO_ID", "LLF_Band", "Contract_Duration", "Green_Energy", "Rate_Structure"]
+
+@st.cache_resource
+def build_tariff_index(flat_file_key, _df):
+    keyed = _df[TARIFF_KEYS + ["Minimum_Annual_Consumption", "Maximum_Annual_Consumption"]].copy()
+    keyed["DNO_ID"] = keyed["DNO_ID"].astype(str)
+    keyed["Green_Energy"] = keyed["Green_Energy"].astype(str).str.upper()
+    return TariffIndex(keyed, TARIFF_KEYS)
+
+@st.cache_resource
+def build_validity_index(flat_file_key, _df):
+    return ValidityIndex(_df)
 
 # --- File Upload ---
-uploaded_file = st.file_uploader("Upload Electricity Flat File (.xlsx)", type=["xlsx"])
+uploaded_file = st.file_uploader("Upload Electricity Flat File (.xlsx or .csv)", type=["xlsx", "csv"])
 
 if uploaded_file:
-    df = pd.read_excel(uploaded_file)
+    with perf.stage("load_flat_file"):
+        df = load_flat_file(uploaded_file)
+    with perf.stage("build_tariff_index", rows=len(df)):
+        tariff_index = build_tariff_index(df.attrs["flat_file_key"], df)
+    with perf.stage("build_validity_index", rows=len(df)):
+        validity_index = build_validity_index(df.attrs["flat_file_key"], df)
 
     st.subheader("Quote Details")
     customer_name = st.text_input("Customer Name")
     contract_duration = st.selectbox("Contract Duration (months)", options=[12, 24, 36])
     green_energy = st.radio("Green Energy", ["False", "True"])
     contract_start_date = st.date_input("Contract Start Date", value=datetime.today())
+    valid_today_only = st.checkbox("Only use tariffs valid for quoting today", value=False)
+    quote_date = date.today() if valid_today_only else None
 
     output_filename = st.text_input("Output file name (without .xlsx)", value="llf_multi_site_quote")
 
@@ -42,27 +69,17 @@ if uploaded_file:
         consumption = cols[3].number_input("Annual Consumption (kWh)", min_value=0, value=0, step=1000, key=f"consumption_{i}")
         rate_structure = cols[4].selectbox("Rate Structure", options=["DayNight", "Standard"], key=f"rate_struct_{i}")
 
-        band_row = llf_mapping[
-            (llf_mapping["DNO"].astype(str) == str(dno_id)) &
-            (llf_mapping["LLF"].astype(str) == str(llf_code))
-        ]
+        llf_band = llf_mapping.band(dno_id, llf_code)
 
-        if not band_row.empty:
-            llf_band = band_row.iloc[0]["Band"]
+        if llf_band is not None:
             st.write(f"LLF Band for Site {i+1}: {llf_band}")
 
-            # Filter flat file
-            matched = df[
-                (df["DNO_ID"].astype(str) == str(dno_id)) &
-                (df["LLF_Band"] == llf_band) &
-                (df["Contract_Duration"] == contract_duration) &
-                (df["Green_Energy"].astype(str).str.upper() == green_energy.upper()) &
-                (df["Rate_Structure"] == rate_structure) &
-                (df["Minimum_Annual_Consumption"] <= consumption) &
-                (df["Maximum_Annual_Consumption"] >= consumption) &
-                (pd.to_datetime(df["Minimum_Contract_Start_Date"]) <= pd.to_datetime(contract_start_date)) &
-                (pd.to_datetime(df["Maximum_Contract_Start_Date"]) >= pd.to_datetime(contract_start_date))
-            ]
+            # Look up tariffs for this site, then apply the start (and quote) date windows
+            with perf.stage("tariff_lookup", site=i + 1):
+                candidates = tariff_index.candidates(
+                    (str(dno_id), llf_band, contract_duration, green_energy.upper(), rate_structure), consumption
+                )
+                matched = df.iloc[validity_index.filter(candidates, contract_start_date, quote_date)]
 
             if not matched.empty:
                 price = matched.iloc[0]
@@ -100,16 +117,19 @@ if uploaded_file:
         st.subheader("Pricing Results")
         results_df = pd.DataFrame(input_rows)
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            results_df.to_excel(writer, index=False, sheet_name="Quote")
-        output.seek(0)
+        with perf.stage("frame_to_xlsx", rows=len(results_df)):
+            quote_xlsx = frame_to_xlsx(results_df, "Quote")
 
         st.download_button(
             label="Download Quote as Excel",
-            data=output,
+            data=quote_xlsx,
             file_name=f"{output_filename}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=XLSX_MIME
         )
+
+        if st.button("💾 Save Quote to Quote History"):
+            with perf.stage("save_quote", rows=len(results_df)):
+                quote_id = QuoteStore().save_quote("LLFMulti10", results_df, customer=customer_name)
+            st.success(f"Saved as quote #{quote_id}.")
 else:
     st.info("Please upload the electricity flat file to begin.")
@@ -1,17 +1,23 @@
 import streamlit as st
-import pandas as pd
-import io
+
+from pricing_core.bands import NHH_BANDS
+from pricing_core.export import XLSX_MIME, frame_to_xlsx, frames_to_xlsx
+from pricing_core.ingest import load_flat_file
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.nhh import price_book, price_book_sheets, price_books
 
 # Make app full-width
 st.set_page_config(layout="wide")
 
 st.title("NHH Pricing Tool")
+perf = sidebar_recorder("NHH10")
 
 # Upload file each time
-uploaded_file = st.file_uploader("Upload the Flat File (.xlsx)", type=["xlsx"])
+uploaded_file = st.file_uploader("Upload the Flat File (.xlsx or .csv)", type=["xlsx", "csv"])
 
 if uploaded_file is not None:
-    df = pd.read_excel(uploaded_file)
+    with perf.stage("load_flat_file"):
+        df = load_flat_file(uploaded_file)
 
     st.write("Flat file loaded successfully. Preview:")
     st.dataframe(df.head())
@@ -31,15 +37,7 @@ if uploaded_file is not None:
     st.subheader("Uplifts per Consumption Band")
 
     # Define bandings
-    bands = [
-        (1000, 3000),
-        (3001, 12500),
-        (12501, 26000),
-        (26001, 100000),
-        (100001, 175000),
-        (175001, 225000),
-        (225001, 300000)
-    ]
+    bands = NHH_BANDS
 
     # Prepare storage for uplifts
     uplift_inputs = []
@@ -73,55 +71,38 @@ if uploaded_file is not None:
     report_title = st.text_input("Enter Report Filename (without .xlsx):", value="nhh_price_book")
 
     if st.button("Generate Excel Price Book"):
-        output_rows = []
-
-        for band in uplift_inputs:
-            # Filter matching rows
-            filtered = df[
-                (df["Minimum_Annual_Consumption"] <= band["max"]) &
-                (df["Maximum_Annual_Consumption"] >= band["min"]) &
-                (df["Contract_Duration"] == contract_duration) &
-                (
-                    (df["Green_Energy"].str.upper() == "YES") if green_option == "Green" else
-                    (df["Green_Energy"].str.upper() == "NO")
-                )
-            ]
-
-            if filtered.empty:
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": "N/A",
-                    "Day Rate (p/kWh)": "N/A",
-                    "Night Rate (p/kWh)": "N/A",
-                    "Evening & Weekend Rate (p/kWh)": "N/A"
-                })
-            else:
-                row = filtered.iloc[0]
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": row["Standing_Charge"] + band["uplift_standing"],
-                    "Day Rate (p/kWh)": row["Day_Rate"] + band["uplift_day"],
-                    "Night Rate (p/kWh)": row["Night_Rate"] + band["uplift_night"],
-                    "Evening & Weekend Rate (p/kWh)": row["Evening_And_Weekend_Rate"] + band["uplift_evw"]
-                })
-
-        # Prepare DataFrame
-        result_df = pd.DataFrame(output_rows)
+        with perf.stage("price_book", rows=len(df)):
+            result_df = price_book(df, uplift_inputs, contract_duration, green_option == "Green", with_annual_cost=False)
 
         st.success("Excel file prepared. Preview:")
         st.dataframe(result_df)
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            result_df.to_excel(writer, index=False, sheet_name="Price Book")
-
-        processed_data = output.getvalue()
+        with perf.stage("frame_to_xlsx"):
+            processed_data = frame_to_xlsx(result_df, "Price Book")
 
         st.download_button(
             label="Download Excel Price Book",
             data=processed_data,
             file_name=f"{report_title}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=XLSX_MIME
+        )
+
+    if st.button("Generate Full Price Book (all durations, Standard and Green)"):
+        with perf.stage("price_books", rows=len(df)):
+            books = price_books(df, uplift_inputs, with_annual_cost=False)
+        sheets = price_book_sheets(books)
+
+        st.success(f"Price book prepared: {len(books)} duration/tariff combinations.")
+        st.dataframe(sheets["All Tariffs"])
+
+        with perf.stage("frames_to_xlsx"):
+            full_book = frames_to_xlsx(sheets)
+
+        st.download_button(
+            label="Download Full Excel Price Book",
+            data=full_book,
+            file_name=f"{report_title}_all.xlsx",
+            mime=XLSX_MIME
         )
 
 else:
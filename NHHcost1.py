@@ -1,14 +1,20 @@
 import streamlit as st
-import pandas as pd
-import io
+
+from pricing_core.bands import NHH_BANDS
+from pricing_core.export import XLSX_MIME, frame_to_xlsx, frames_to_xlsx
+from pricing_core.ingest import load_flat_file
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.nhh import cost_stack, price_book, price_book_sheets, price_books
 
 st.set_page_config(layout="wide")
 st.title("NHH Pricing Tool with Cost Stack")
+perf = sidebar_recorder("NHHcost1")
 
-uploaded_file = st.file_uploader("Upload the Flat File (.xlsx)", type=["xlsx"])
+uploaded_file = st.file_uploader("Upload the Flat File (.xlsx or .csv)", type=["xlsx", "csv"])
 
 if uploaded_file is not None:
-    df = pd.read_excel(uploaded_file)
+    with perf.stage("load_flat_file"):
+        df = load_flat_file(uploaded_file)
     st.write("Flat file loaded successfully. Preview:")
     st.dataframe(df.head())
 
@@ -23,15 +29,7 @@ if uploaded_file is not None:
     margin = st.number_input("Margin (p/kWh)", value=0.0, step=0.1)
 
     st.subheader("Uplifts per Consumption Band")
-    bands = [
-        (1000, 3000),
-        (3001, 12500),
-        (12501, 26000),
-        (26001, 100000),
-        (100001, 175000),
-        (175001, 225000),
-        (225001, 300000)
-    ]
+    bands = NHH_BANDS
 
     uplift_inputs = []
     for idx, (min_val, max_val) in enumerate(bands):
@@ -57,67 +55,40 @@ if uploaded_file is not None:
     report_title = st.text_input("Enter Report Filename (without .xlsx):", value="nhh_price_book")
 
     if st.button("Generate Excel Price Book"):
-        output_rows = []
-
-        for band in uplift_inputs:
-            filtered = df[
-                (df["Minimum_Annual_Consumption"] <= band["max"]) &
-                (df["Maximum_Annual_Consumption"] >= band["min"]) &
-                (df["Contract_Duration"] == contract_duration) &
-                ((df["Green_Energy"].str.upper() == "YES") if green_option == "Green" else (df["Green_Energy"].str.upper() == "NO"))
-            ]
-
-            if filtered.empty:
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": "N/A",
-                    "Day Rate (p/kWh)": "N/A",
-                    "Night Rate (p/kWh)": "N/A",
-                    "Evening & Weekend Rate (p/kWh)": "N/A",
-                    "Total Annual Cost (£)": "N/A"
-                })
-            else:
-                row = filtered.iloc[0]
-
-                base_standing = row["Standing_Charge"] + billing_cost + customer_service + regulatory_cost
-                base_day = row["Day_Rate"] + bad_debt + margin
-                base_night = row["Night_Rate"] + bad_debt + margin
-                base_evw = row["Evening_And_Weekend_Rate"] + bad_debt + margin
-
-                final_standing = base_standing + band["uplift_standing"]
-                final_day = base_day + band["uplift_day"]
-                final_night = base_night + band["uplift_night"]
-                final_evw = base_evw + band["uplift_evw"]
-
-                # estimate total annual cost based on midband consumption
-                mid_consumption = (band['min'] + band['max']) / 2
-                annual_cost = (mid_consumption * final_day / 100) + (365 * final_standing / 100)
-
-                output_rows.append({
-                    "Band": f"{band['min']:,} – {band['max']:,}",
-                    "Standing Charge (p/day)": round(final_standing, 4),
-                    "Day Rate (p/kWh)": round(final_day, 4),
-                    "Night Rate (p/kWh)": round(final_night, 4),
-                    "Evening & Weekend Rate (p/kWh)": round(final_evw, 4),
-                    "Total Annual Cost (£)": round(annual_cost, 2)
-                })
-
-        result_df = pd.DataFrame(output_rows)
+        cost = cost_stack(bad_debt, billing_cost, customer_service, regulatory_cost, margin)
+        with perf.stage("price_book", rows=len(df)):
+            result_df = price_book(df, uplift_inputs, contract_duration, green_option == "Green", cost=cost)
 
         st.success("Excel file prepared. Preview:")
         st.dataframe(result_df)
 
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            result_df.to_excel(writer, index=False, sheet_name="Price Book")
-
-        processed_data = output.getvalue()
+        with perf.stage("frame_to_xlsx"):
+            processed_data = frame_to_xlsx(result_df, "Price Book")
 
         st.download_button(
             label="Download Excel Price Book",
             data=processed_data,
             file_name=f"{report_title}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            mime=XLSX_MIME
+        )
+
+    if st.button("Generate Full Price Book (all durations, Standard and Green)"):
+        cost = cost_stack(bad_debt, billing_cost, customer_service, regulatory_cost, margin)
+        with perf.stage("price_books", rows=len(df)):
+            books = price_books(df, uplift_inputs, cost=cost)
+        sheets = price_book_sheets(books)
+
+        st.success(f"Price book prepared: {len(books)} duration/tariff combinations.")
+        st.dataframe(sheets["All Tariffs"])
+
+        with perf.stage("frames_to_xlsx"):
+            full_book = frames_to_xlsx(sheets)
+
+        st.download_button(
+            label="Download Full Excel Price Book",
+            data=full_book,
+            file_name=f"{report_title}_all.xlsx",
+            mime=XLSX_MIME
         )
 else:
     st.warning("Please upload the flat file to start.")
@@ -0,0 +1,67 @@
+import streamlit as st
+import io
+from datetime import date, timedelta
+
+from pricing_core.export import XLSX_MIME, write_workbooks
+from pricing_core.instrument import sidebar_recorder
+from pricing_core.quotes import QuoteStore
+
+st.set_page_config(page_title="Quote History", layout="wide")
+st.title("📚 Quote History")
+perf = sidebar_recorder("QuoteHistory")
+
+store = QuoteStore()
+
+# --- Filters ---
+st.sidebar.header("Search")
+customer = st.sidebar.text_input("Customer").strip()
+postcode = st.sidebar.text_input("Postcode (or the start of one)").strip()
+ldz = st.sidebar.text_input("LDZ").strip()
+site = st.sidebar.text_input("Site").strip()
+template_version = st.sidebar.text_input("Template version").strip()
+tool = st.sidebar.selectbox("Tool", ["All", "Gaswcost4", "GasdebugMulti10", "LLFMulti10", "HH4"])
+since = st.sidebar.date_input("Saved from", value=date.today() - timedelta(days=90))
+until = st.sidebar.date_input("Saved to", value=date.today())
+limit = st.sidebar.number_input("Maximum rows", min_value=10, max_value=100_000, value=1000, step=100)
+
+filters = {
+    "customer": customer or None,
+    "template_version": template_version or None,
+    "tool": None if tool == "All" else tool,
+    "since": since.isoformat(),
+    "until": (until + timedelta(days=1)).isoformat(),
+}
+
+st.subheader("Quotes")
+with perf.stage("find_quotes"):
+    quotes = store.find_quotes(limit=limit, **filters)
+st.dataframe(quotes, use_container_width=True)
+
+if postcode or ldz or site:
+    st.subheader("Matching Lines")
+    with perf.stage("find_lines"):
+        lines = store.find_lines(postcode=postcode or None, ldz=ldz or None, site=site or None, limit=limit, **filters)
+    st.caption(f"{len(lines):,} line(s)")
+    st.dataframe(lines, use_container_width=True)
+
+# --- One quote in full ---
+if not quotes.empty:
+    st.subheader("Open a Quote")
+    quote_id = st.selectbox("Quote", quotes["quote_id"].tolist(),
+                            format_func=lambda q: f"#{q} – {quotes.set_index('quote_id').at[q, 'customer'] or 'no customer'}")
+    with perf.stage("load_quote"):
+        quote_lines = store.quote(quote_id)
+    st.dataframe(quote_lines.head(1000), use_container_width=True)
+    if len(quote_lines) > 1000:
+        st.caption(f"Showing the first 1,000 of {len(quote_lines):,} lines.")
+
+    if st.button("📦 Prepare Download"):
+        output = io.BytesIO()
+        with perf.stage("write_workbooks", rows=len(quote_lines)):
+            write_workbooks(quote_lines, [(output, "Quote", None)])
+        st.download_button(
+            "⬇️ Download Quote",
+            data=output.getvalue(),
+            file_name=f"quote_{quote_id}.xlsx",
+            mime=XLSX_MIME
+        )
@@ -0,0 +1 @@
+"""Benchmarks for the pricing tools on synthetic flat files (see ``benchmarks.run``)."""
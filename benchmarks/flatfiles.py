@@ -0,0 +1,196 @@
+"""Synthetic supplier flat files and inputs with the real column schemas.
+
+Every generator is deterministic for a given ``rows``/``seed`` and fully
+vectorised, so multi-million-row files build in seconds::
+
+    python -m benchmarks.flatfiles gas 100000 gas_100k.xlsx
+    python -m benchmarks.flatfiles electricity 5000000 elec_5m.csv
+
+Files beyond Excel's row limit are written as CSV whatever the extension.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+EXCEL_MAX_DATA_ROWS = 1_048_575
+
+LDZS = ["EA", "EM", "LC", "LO", "LS", "LT", "LW", "NE", "NO", "NT", "NW", "SC", "SE", "SO", "SW", "WM", "WN", "WS"]
+DNO_IDS = list(range(10, 24))
+CONTRACT_DURATIONS = [12, 24, 36]
+
+GAS_BAND_EDGES = [0, 1000, 25000, 50000, 73200, 125000, 293000, 450000, 732000]
+NHH_BAND_EDGES = [0, 1000, 3001, 12501, 26001, 100001, 175001, 225001, 300001]
+
+
+def _bands(rng, edges, rows):
+    pos = rng.integers(0, len(edges) - 1, rows)
+    edges = np.asarray(edges)
+    return edges[pos], edges[pos + 1] - 1
+
+
+def _dates(rng, rows, start="2025-01-01", spread_days=180, window_days=60):
+    low = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, spread_days, rows), unit="D")
+    return low, low + pd.to_timedelta(window_days, unit="D")
+
+
+def _rates(rng, rows, low, high):
+    return np.round(rng.uniform(low, high, rows), 4)
+
+
+def gas_flat_file(rows, seed=0):
+    """Gas flat file in the shape read by Gaswcost4, Gas105 and GasdebugMulti10."""
+    rng = np.random.default_rng(seed)
+    ldz = np.asarray(LDZS)[rng.integers(0, len(LDZS), rows)]
+    min_kwh, max_kwh = _bands(rng, GAS_BAND_EDGES, rows)
+    start_min, start_max = _dates(rng, rows)
+    quote_min, quote_max = _dates(rng, rows, spread_days=30, window_days=14)
+
+    return pd.DataFrame({
+        "Broker_ID": rng.integers(1000, 1010, rows),
+        "Production_Date": pd.Timestamp("2025-01-01"),
+        "Utility": "Gas",
+        "LDZ": ldz,
+        "Exit_Zone": np.char.add(ldz, rng.integers(1, 4, rows).astype(str)),
+        "Sale_Type": np.where(rng.random(rows) < 0.8, "Acquisition", "Renewal"),
+        "Contract_Duration": np.asarray(CONTRACT_DURATIONS)[rng.integers(0, 3, rows)],
+        "Minimum_Annual_Consumption": min_kwh,
+        "Maximum_Annual_Consumption": max_kwh,
+        "Minimum_Contract_Start_Date": start_min,
+        "Maximum_Contract_Start_Date": start_max,
+        "Minimum_Valid_Quote_Date": quote_min,
+        "Maximum_Valid_Quote_Date": quote_max,
+        "Product_Name": np.where(rng.random(rows) < 0.5, "Fixed", "Fixed Plus"),
+        "Carbon_Offset": np.where(rng.random(rows) < 0.3, "Yes", "No"),
+        "Unit_Rate": _rates(rng, rows, 4.0, 9.0),
+        "Standing_Charge": _rates(rng, rows, 20.0, 120.0),
+        "Minimum_Credit_Score": rng.integers(0, 50, rows),
+        "Maximum_Credit_Score": 100,
+    })
+
+
+def electricity_flat_file(rows, seed=0):
+    """Electricity flat file in the shape read by the NHH tools, HH4 and LLFMulti10."""
+    rng = np.random.default_rng(seed)
+    min_kwh, max_kwh = _bands(rng, NHH_BAND_EDGES, rows)
+    start_min, start_max = _dates(rng, rows)
+    quote_min, quote_max = _dates(rng, rows, spread_days=30, window_days=14)
+    day_night = rng.random(rows) < 0.5
+
+    return pd.DataFrame({
+        "Broker_ID": rng.integers(1000, 1010, rows),
+        "Production_Date": pd.Timestamp("2025-01-01"),
+        "Utility": "Electricity",
+        "DNO_ID": np.asarray(DNO_IDS)[rng.integers(0, len(DNO_IDS), rows)],
+        "LLF_Band": np.char.add("Band ", rng.integers(1, 9, rows).astype(str)),
+        "Rate_Structure": np.asarray(["Standard", "DayNight", "NHH"])[rng.integers(0, 3, rows)],
+        "Contract_Duration": np.asarray(CONTRACT_DURATIONS)[rng.integers(0, 3, rows)],
+        "Minimum_Annual_Consumption": min_kwh,
+        "Maximum_Annual_Consumption": max_kwh,
+        "Minimum_Contract_Start_Date": start_min,
+        "Maximum_Contract_Start_Date": start_max,
+        "Minimum_Valid_Quote_Date": quote_min,
+        "Maximum_Valid_Quote_Date": quote_max,
+        "Green_Energy": np.where(rng.random(rows) < 0.3, "Yes", "No"),
+        "Standing_Charge": _rates(rng, rows, 20.0, 120.0),
+        "Standard_Rate": np.where(day_night, np.nan, _rates(rng, rows, 18.0, 32.0)),
+        "Day_Rate": _rates(rng, rows, 20.0, 35.0),
+        "Night_Rate": _rates(rng, rows, 12.0, 22.0),
+        "Evening_And_Weekend_Rate": _rates(rng, rows, 14.0, 26.0),
+        "Capacity_Rate": 0.0,
+        "Metering_Charge": _rates(rng, rows, 0.0, 10.0),
+    })
+
+
+def postcode_table(postcodes=20000, seed=0):
+    """Postcode → LDZ reference rows like ``postcode_ldz_full.csv``."""
+    rng = np.random.default_rng(seed)
+    letters = np.asarray(list("ABCDEFGHJKLMNPRSTUWXY"))
+    area = np.char.add(letters[rng.integers(0, len(letters), postcodes)], letters[rng.integers(0, len(letters), postcodes)])
+    outward = np.char.add(area, rng.integers(1, 30, postcodes).astype(str))
+    inward = np.char.add(
+        rng.integers(0, 10, postcodes).astype(str),
+        np.char.add(letters[rng.integers(0, len(letters), postcodes)], letters[rng.integers(0, len(letters), postcodes)]),
+    )
+    table = pd.DataFrame({
+        "Postcode": np.char.add(np.char.add(outward, " "), inward),
+        "LDZ": np.asarray(LDZS)[rng.integers(0, len(LDZS), postcodes)],
+    })
+    return table.drop_duplicates("Postcode").reset_index(drop=True)
+
+
+def site_list(rows, postcodes, seed=0):
+    """Bulk site list (GasdebugMulti10) drawn from ``postcodes``; ~2% are unknown postcodes."""
+    rng = np.random.default_rng(seed)
+    picked = np.asarray(postcodes, dtype=object)[rng.integers(0, len(postcodes), rows)]
+    picked[rng.random(rows) < 0.02] = "ZZ99 9ZZ"
+    return pd.DataFrame({
+        "Site": [f"Site {i + 1}" for i in range(rows)],
+        "Postcode": picked,
+        "Annual Consumption (kWh)": rng.integers(1000, 700000, rows).astype("float64"),
+        "Uplift Unit (p/kWh)": _rates(rng, rows, 0.0, 1.5),
+        "Uplift SC (p/day)": _rates(rng, rows, 0.0, 10.0),
+    })
+
+
+def llf_mapping(seed=0):
+    """(DNO, LLF code) → band rows like the LLF Mapping Table."""
+    rng = np.random.default_rng(seed)
+    dnos = np.repeat(DNO_IDS, 900)
+    codes = np.tile(np.arange(100, 1000), len(DNO_IDS)).astype(str)
+    return pd.DataFrame({"DNO": dnos, "LLF": codes, "Band": np.char.add("Band ", rng.integers(1, 9, len(dnos)).astype(str))})
+
+
+def portfolio(rows, seed=0):
+    """Credit decision portfolio (ConreactPDF106) with the ``PORTFOLIO_COLUMNS`` headers."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Business Name": [f"Business {i + 1} Ltd" for i in range(rows)],
+        "Business Type": np.asarray(["Sole Trader", "Partnership", "Limited Company"])[rng.integers(0, 3, rows)],
+        "Number of Sites": rng.integers(1, 20, rows),
+        "Annual Volume (kWh)": rng.integers(1000, 2_000_000, rows),
+        "Contract Value (£)": np.round(rng.uniform(500, 500_000, rows), 2),
+        "Unit Margin (p/kWh)": np.round(rng.uniform(0, 2, rows), 3),
+        "Broker Uplift Standing (p/day)": np.round(rng.uniform(0, 10, rows), 2),
+        "Broker Uplift Unit Rate (p/kWh)": np.round(rng.uniform(0, 2, rows), 3),
+        "SIC Risk": np.asarray(["Low", "Medium", "High", "Very High"])[rng.integers(0, 4, rows)],
+        "Credit Score": rng.integers(0, 101, rows),
+        "Years Trading": rng.integers(0, 30, rows),
+        "CCJs": np.where(rng.random(rows) < 0.05, "Yes", "No"),
+        "Payment Terms": np.asarray(["14 Days Direct Debit", "14 Days BACS", "28 Days BACS"])[rng.choice(3, rows, p=[0.8, 0.1, 0.1])],
+    })
+
+
+def write_flat_file(df, path):
+    """Write ``df`` as .xlsx, or as CSV when it has more rows than a sheet holds. Returns the path used."""
+    if len(df) > EXCEL_MAX_DATA_ROWS or not path.lower().endswith(".xlsx"):
+        path = os.path.splitext(path)[0] + ".csv"
+        df.to_csv(path, index=False)
+    else:
+        from pricing_core.export import write_workbooks
+
+        write_workbooks(df, [(path, "Sheet1", None)])
+    return path
+
+
+GENERATORS = {"gas": gas_flat_file, "electricity": electricity_flat_file, "portfolio": portfolio}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.flatfiles", description=__doc__.split("\n\n")[0])
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path", help=".xlsx or .csv output path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    path = write_flat_file(GENERATORS[args.kind](args.rows, args.seed), args.path)
+    print(f"Wrote {args.rows:,} {args.kind} rows to {path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
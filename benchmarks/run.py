@@ -0,0 +1,309 @@
+"""Time each pricing tool's stages on synthetic data of growing size.
+
+Stages are timed separately (ingest, uplift, index, lookup, decision,
+export) and written to a JSON file so runs from different versions can be
+compared::
+
+    python -m benchmarks.run --sizes 1000 10000 100000
+    python -m benchmarks.run --sizes 1000000 5000000 --tools gaswcost4 gas105 --stages uplift export
+    python -m benchmarks.run --compare benchmarks/results/<older>.json
+
+``--compare`` prints the ratio to an earlier result file for every matching
+(tool, stage, rows) and exits non-zero if any stage got slower than
+``--threshold``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import flatfiles
+from pricing_core.bands import GAS_BANDS, NHH_BANDS
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+DEFAULT_SIZES = [1000, 10000, 100000]
+STAGES = ["ingest", "uplift", "index", "lookup", "decision", "export"]
+
+
+def _year_inputs():
+    bands = [dict(b, Standard_Unit=0.25, Standard_Standing=2.0, Carbon_Unit=0.4, Carbon_Standing=3.0) for b in GAS_BANDS]
+    return {
+        1: {"cost_method": "fixed", "fixed_cost": 60.0, "standing_pct": 50, "unit_pct": 50, "bands": bands},
+        2: {"cost_method": "per_kwh", "ppkwh": 0.3, "bands": bands},
+        3: {"cost_method": "per_kwh", "ppkwh": 0.2, "bands": bands},
+    }
+
+
+def _nhh_uplifts():
+    return [
+        {"min": lo, "max": hi, "uplift_standing": 1.0, "uplift_day": 0.5, "uplift_night": 0.3, "uplift_evw": 0.4}
+        for lo, hi in NHH_BANDS
+    ]
+
+
+class Context:
+    """Synthetic inputs for one size, built lazily and shared between tools."""
+
+    def __init__(self, rows, sites, workdir):
+        self.rows = rows
+        self.sites = sites
+        self.workdir = workdir
+        self._cache = {}
+
+    def get(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    # Typed by the flat-file schema, as the tools see them after load_flat_file
+    @property
+    def gas(self):
+        from pricing_core.ingest import normalize_flat_file
+
+        return self.get("gas", lambda: normalize_flat_file(flatfiles.gas_flat_file(self.rows)))
+
+    @property
+    def electricity(self):
+        from pricing_core.ingest import normalize_flat_file
+
+        return self.get("electricity", lambda: normalize_flat_file(flatfiles.electricity_flat_file(self.rows)))
+
+    def flat_file_path(self, kind):
+        frame = self.gas if kind == "gas" else self.electricity
+        return self.get(f"{kind}_path", lambda: flatfiles.write_flat_file(
+            frame, os.path.join(self.workdir, f"{kind}_{self.rows}.xlsx")))
+
+
+def _ingest(path):
+    from pricing_core.ingest import normalize_flat_file, parse_flat_file
+
+    if path.endswith(".csv"):
+        return lambda: normalize_flat_file(pd.read_csv(path))
+    with open(path, "rb") as f:
+        data = f.read()
+    return lambda: parse_flat_file(data)
+
+
+def _gaswcost4(ctx, stage):
+    from pricing_core.uplifts import CREDIT_SCORE_COLUMNS, broker_columns, price_flat_file
+
+    if stage == "ingest":
+        return _ingest(ctx.flat_file_path("gas"))
+    df = ctx.gas.drop(columns=CREDIT_SCORE_COLUMNS)
+    year_inputs = _year_inputs()
+    if stage == "uplift":
+        return lambda: price_flat_file(df, year_inputs)
+    if stage == "export":
+        from pricing_core.export import write_workbooks
+
+        priced = price_flat_file(df, year_inputs)
+        broker = os.path.join(ctx.workdir, "broker.xlsx")
+        audit = os.path.join(ctx.workdir, "audit.xlsx")
+        return lambda: write_workbooks(priced, [(broker, "PriceList", broker_columns), (audit, "AuditData", None)])
+
+
+def _gas105(ctx, stage):
+    from pricing_core.uplifts import apply_uplifts, band_uplifts
+
+    bands = [dict(b, Contract=1, Standard_Unit=0.25, Standard_Standing=2.0, Carbon_Unit=0.4, Carbon_Standing=3.0) for b in GAS_BANDS]
+    if stage == "uplift":
+        return lambda: apply_uplifts(ctx.gas, band_uplifts(ctx.gas, bands))
+    if stage == "export" and ctx.rows <= flatfiles.EXCEL_MAX_DATA_ROWS:
+        from pricing_core.export import frame_to_xlsx
+
+        priced = apply_uplifts(ctx.gas, band_uplifts(ctx.gas, bands))
+        return lambda: frame_to_xlsx(priced, "PriceList")
+
+
+def _nhhcost2(ctx, stage):
+    from pricing_core.nhh import manual_allocation, price_book
+
+    if stage == "ingest":
+        return _ingest(ctx.flat_file_path("electricity"))
+    if stage == "uplift":
+        uplifts = _nhh_uplifts()
+        return lambda: price_book(ctx.electricity, uplifts, 12, False, cost=manual_allocation(120.0, 0.5), profile=(70, 20, 10))
+
+
+def _gasdebugmulti10(ctx, stage):
+    from pricing_core.bulk import build_gas_index, prepare_gas_tariffs, quote_sites
+    from pricing_core.postcodes import PostcodeIndex
+
+    postcodes = ctx.get("postcodes", flatfiles.postcode_table)
+    if stage == "index":
+        return lambda: (build_gas_index(prepare_gas_tariffs(ctx.gas.copy())), PostcodeIndex.from_frame(postcodes))
+    if stage == "lookup":
+        df = prepare_gas_tariffs(ctx.gas.copy())
+        tariff_index = build_gas_index(df)
+        ldz_index = PostcodeIndex.from_frame(postcodes)
+        sites = flatfiles.site_list(ctx.sites, postcodes["Postcode"])
+        return lambda: quote_sites(sites, df, tariff_index, ldz_index, 12, True)
+
+
+def _llfmulti10(ctx, stage):
+    from pricing_core.llf import LLFBandMap
+    from pricing_core.tariff_index import TariffIndex
+
+    keys = ["DNO_ID", "LLF_Band", "Contract_Duration", "Green_Energy", "Rate_Structure"]
+    mapping = ctx.get("llf_mapping", flatfiles.llf_mapping)
+
+    def build():
+        keyed = ctx.electricity[keys + ["Minimum_Annual_Consumption", "Maximum_Annual_Consumption"]].copy()
+        keyed["DNO_ID"] = keyed["DNO_ID"].astype(str)
+        keyed["Green_Energy"] = keyed["Green_Energy"].astype(str).str.upper()
+        return TariffIndex(keyed, keys), LLFBandMap(mapping)
+
+    if stage == "index":
+        return build
+    if stage == "lookup":
+        tariff_index, band_map = build()
+        rng = np.random.default_rng(1)
+        picks = mapping.iloc[rng.integers(0, len(mapping), ctx.sites)]
+        consumption = rng.integers(1000, 300000, ctx.sites)
+
+        def lookup():
+            bands = band_map.bands(picks["DNO"], picks["LLF"])
+            site_keys = pd.DataFrame({
+                "DNO_ID": picks["DNO"].astype(str).to_numpy(), "LLF_Band": bands.to_numpy(),
+                "Contract_Duration": 12, "Green_Energy": "FALSE", "Rate_Structure": "DayNight",
+            })
+            return tariff_index.best_many(site_keys, consumption)
+        return lookup
+
+
+def _conreactpdf106(ctx, stage, max_reports=100):
+    from pricing_core.decision import evaluate_portfolio
+
+    config = {
+        "approve_threshold": 80, "refer_threshold": 60, "minimum_unit_margin_ppkwh": 0.5,
+        "max_broker_uplift_standing": 5.0, "max_broker_uplift_unit_rate": 1.0,
+        "approval_matrix": {role: {"Max Sites": limit, "Max Spend": limit * 25000, "Max Volume (kWh)": limit * 100000}
+                            for role, limit in zip(["Sales Agent", "Channel Manager", "Commercial Manager", "Managing Director"], [2, 5, 20, 100])},
+    }
+    portfolio = ctx.get("portfolio", lambda: flatfiles.portfolio(ctx.rows))
+    if stage == "decision":
+        return lambda: evaluate_portfolio(portfolio, config)
+    if stage == "export":
+        from pricing_core.reports import write_reports_zip
+
+        decisions = evaluate_portfolio(portfolio.head(max_reports), config)
+        target = os.path.join(ctx.workdir, "reports.zip")
+        return lambda: write_reports_zip(decisions, target)
+
+
+TOOLS = {
+    "gaswcost4": _gaswcost4,
+    "gas105": _gas105,
+    "nhhcost2": _nhhcost2,
+    "gasdebugmulti10": _gasdebugmulti10,
+    "llfmulti10": _llfmulti10,
+    "conreactpdf106": _conreactpdf106,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sizes, tools, stages, repeat=1, sites=1000, log=print):
+    results = []
+    for rows in sizes:
+        with tempfile.TemporaryDirectory(prefix="dyce-bench-") as workdir:
+            ctx = Context(rows, sites, workdir)
+            for tool in tools:
+                for stage in stages:
+                    fn = TOOLS[tool](ctx, stage)
+                    if fn is None:
+                        continue
+                    seconds = _time(fn, repeat)
+                    results.append({"tool": tool, "stage": stage, "rows": rows, "seconds": round(seconds, 6)})
+                    log(f"{tool:>16} {stage:>8} {rows:>10,} rows  {seconds:10.4f}s")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print slow-downs against ``baseline`` results; returns the number of regressions."""
+    previous = {(r["tool"], r["stage"], r["rows"]): r["seconds"] for r in baseline["results"]}
+    regressions = 0
+    for r in results:
+        before = previous.get((r["tool"], r["stage"], r["rows"]))
+        if not before:
+            continue
+        ratio = r["seconds"] / before
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{r['tool']:>16} {r['stage']:>8} {r['rows']:>10,} rows  {before:10.4f}s -> {r['seconds']:10.4f}s  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Flat-file row counts (default: %(default)s)")
+    parser.add_argument("--tools", nargs="+", choices=sorted(TOOLS), default=list(TOOLS))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--sites", type=int, default=1000, help="Sites per lookup (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="Keep the best of N timings (default: %(default)s)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slow-down ratio counted as a regression (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    results = run(args.sizes, args.tools, args.stages, args.repeat, args.sites)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "sites": args.sites,
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        return 1 if compare(results, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Shared pricing logic for the Dyce Streamlit tools.
+
+Nothing in this package imports Streamlit, so it can be used from the apps,
+scripts and worker processes alike. Export-only dependencies (xlsxwriter,
+fpdf) are imported when a workbook or report is actually produced:
+``pricing_core.reports`` is the only module that needs fpdf, and the apps
+import it on their PDF paths.
+"""
@@ -0,0 +1,38 @@
+"""Default consumption bands and band validation.
+
+Gas bands use the ``{"Min": .., "Max": ..}`` dicts stored in margin
+templates; NHH bands are ``(min, max)`` pairs as in the NHH tools.
+"""
+
+GAS_BANDS = [
+    {"Min": 1000, "Max": 24999},
+    {"Min": 25000, "Max": 49999},
+    {"Min": 50000, "Max": 73199},
+    {"Min": 73200, "Max": 124999},
+    {"Min": 125000, "Max": 292999},
+    {"Min": 293000, "Max": 449999},
+    {"Min": 450000, "Max": 731999},
+]
+
+NHH_BANDS = [
+    (1000, 3000),
+    (3001, 12500),
+    (12501, 26000),
+    (26001, 100000),
+    (100001, 175000),
+    (175001, 225000),
+    (225001, 300000),
+]
+
+
+def overlapping_bands(bands):
+    """1-based ``(previous, current)`` band numbers where a band starts at or before the previous one ends."""
+    return [
+        (idx, idx + 1)
+        for idx in range(1, len(bands))
+        if bands[idx]["Min"] <= bands[idx - 1]["Max"]
+    ]
+
+
+def band_label(min_val, max_val):
+    return f"{min_val:,} – {max_val:,}"
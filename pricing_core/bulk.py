@@ -0,0 +1,111 @@
+"""Bulk multi-site gas quoting from an uploaded site list."""
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.schema import map_categories
+from pricing_core.suppliers import SUPPLIER_COLUMN
+from pricing_core.tariff_index import TariffIndex
+
+GAS_TARIFF_KEYS = ["LDZ", "Contract_Duration", "Carbon_Offset"]
+
+# Site list column -> accepted header spellings (compared case-insensitively)
+SITE_COLUMNS = {
+    "Site": ["site", "site name"],
+    "Postcode": ["postcode", "post code"],
+    "Annual Consumption (kWh)": ["annual consumption (kwh)", "annual consumption", "kwh", "aq", "consumption"],
+    "Uplift Unit (p/kWh)": ["uplift unit (p/kwh)", "uplift unit", "uplift unit rate"],
+    "Uplift SC (p/day)": ["uplift sc (p/day)", "uplift sc", "uplift standing", "uplift standing charge"],
+}
+REQUIRED_SITE_COLUMNS = ["Postcode", "Annual Consumption (kWh)"]
+
+
+def prepare_gas_tariffs(df):
+    """Normalise the key columns of a gas flat file the way the multi-tool compares them."""
+    df["LDZ"] = map_categories(df["LDZ"], lambda ldz: str(ldz).strip().upper())
+    df["Contract_Duration"] = pd.to_numeric(df["Contract_Duration"], errors='coerce').fillna(0).astype(int)
+    df["Minimum_Annual_Consumption"] = pd.to_numeric(df["Minimum_Annual_Consumption"], errors='coerce').fillna(0)
+    df["Maximum_Annual_Consumption"] = pd.to_numeric(df["Maximum_Annual_Consumption"], errors='coerce').fillna(0)
+    return df
+
+
+def build_gas_index(df):
+    """Cheapest-first tariff index over a prepared gas flat file."""
+    return TariffIndex(df, GAS_TARIFF_KEYS, order_by="Unit_Rate")
+
+
+def site_list_template():
+    """CSV bytes with the site list headers, for users to fill in."""
+    return (",".join(SITE_COLUMNS) + "\n").encode("utf-8")
+
+
+def read_site_list(source, file_name=None):
+    """Read a CSV/XLSX site list and map its headers onto ``SITE_COLUMNS``."""
+    file_name = file_name or getattr(source, "name", str(source))
+    if str(file_name).lower().endswith((".xlsx", ".xls")):
+        sites = pd.read_excel(source)
+    else:
+        sites = pd.read_csv(source)
+
+    lookup = {alias: column for column, aliases in SITE_COLUMNS.items() for alias in aliases}
+    sites = sites.rename(columns=lambda c: lookup.get(" ".join(str(c).lower().split()), c))
+
+    missing = [c for c in REQUIRED_SITE_COLUMNS if c not in sites.columns]
+    if missing:
+        raise ValueError(f"Site list is missing column(s): {', '.join(missing)}")
+
+    sites = sites.dropna(subset=["Postcode"]).reset_index(drop=True)
+    if "Site" not in sites.columns:
+        sites["Site"] = [f"Site {i + 1}" for i in range(len(sites))]
+    for column in ["Annual Consumption (kWh)", "Uplift Unit (p/kWh)", "Uplift SC (p/day)"]:
+        values = sites[column] if column in sites.columns else 0
+        sites[column] = pd.to_numeric(values, errors="coerce")
+        sites[column] = sites[column].fillna(0)
+    return sites
+
+
+def quote_sites(sites, df, tariff_index, ldz_index, contract_duration, carbon_offset_required, customer=""):
+    """Price every site in one pass; columns match the manual multi-site quote.
+
+    With a combined multi-supplier file each site gets the cheapest matching
+    tariff across suppliers, and a Supplier column says whose it is.
+    """
+    postcodes = sites["Postcode"].astype(str)
+    kwh = sites["Annual Consumption (kWh)"].to_numpy(dtype="float64")
+    ldzs, _ = ldz_index.resolve_many(postcodes)
+
+    keys = pd.DataFrame({"LDZ": ldzs, "Contract_Duration": contract_duration, "Carbon_Offset": carbon_offset_required})
+    best = tariff_index.best_many(keys, kwh)
+    best[pd.isna(ldzs)] = -1
+    found = best >= 0
+
+    unit_rate = np.where(found, df["Unit_Rate"].to_numpy(dtype="float64")[np.maximum(best, 0)], 0)
+    standing_charge = np.where(found, df["Standing_Charge"].to_numpy(dtype="float64")[np.maximum(best, 0)], 0)
+    uplift_unit = sites["Uplift Unit (p/kWh)"].to_numpy(dtype="float64")
+    uplift_sc = sites["Uplift SC (p/day)"].to_numpy(dtype="float64")
+    final_unit = unit_rate + uplift_unit
+    final_sc = standing_charge + uplift_sc
+    total_cost = np.where(kwh > 0, np.round((final_unit * kwh + final_sc * 365) / 100, 2), 0)
+
+    status = np.where(pd.isna(ldzs), "No LDZ mapping found for postcode",
+                      np.where(found, "Priced", "No matching tariff"))
+
+    results = pd.DataFrame({
+        "Customer": customer,
+        "Site": sites["Site"].to_numpy(),
+        "Postcode": postcodes.to_numpy(),
+        "Annual Consumption (kWh)": kwh,
+        "LDZ": np.where(pd.isna(ldzs), "", ldzs),
+        "Unit Rate (p/kWh)": unit_rate,
+        "Standing Charge (p/day)": standing_charge,
+        "Uplift Unit Rate (p/kWh)": uplift_unit,
+        "Uplift Standing Charge (p/day)": uplift_sc,
+        "Final Unit Rate (p/kWh)": final_unit,
+        "Final Standing Charge (p/day)": final_sc,
+        "Total Annual Cost (£)": total_cost,
+        "Status": status,
+    })
+    if SUPPLIER_COLUMN in df.columns:
+        suppliers = df[SUPPLIER_COLUMN].iloc[np.maximum(best, 0)].astype(object).to_numpy()
+        results.insert(results.columns.get_loc("LDZ") + 1, SUPPLIER_COLUMN, np.where(found, suppliers, ""))
+    return results
@@ -0,0 +1,94 @@
+"""Headless batch pricer: apply margin templates to a supplier flat file.
+
+Writes the same broker price list and internal audit workbooks as
+Gaswcost4.py, one pair per template, without importing Streamlit::
+
+    python -m pricing_core.cli flat_file.xlsx -t margin_template_v3.json -o out/
+
+Suitable for cron, e.g. a nightly repricing run::
+
+    0 2 * * * cd /srv/gas-pricing && python -m pricing_core.cli /data/flat.xlsx -t templates/*.json -o /data/out
+
+With ``--stream`` the flat file is never loaded whole: it is read, priced
+and written chunk by chunk (once per template), so memory is bounded by
+``--chunk-rows`` however large the file is.
+
+The exit status is non-zero if any template fails.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+
+from pricing_core.export import CHUNK_ROWS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pricing_core.cli", description=__doc__.split("\n\n")[0])
+    parser.add_argument("flat_file", help="Supplier flat file (.xlsx or .csv)")
+    parser.add_argument("-t", "--template", action="append", required=True, dest="templates",
+                        help="Margin template JSON saved from the pricing tool (repeatable)")
+    parser.add_argument("-o", "--output-dir", default=".", help="Directory for the output workbooks (default: current directory)")
+    parser.add_argument("--broker-name", default="broker_pricelist", help="Broker file name prefix")
+    parser.add_argument("--audit-name", default="internal_audit_report", help="Audit file name prefix")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"Rows priced and written per chunk (default: {CHUNK_ROWS:,})")
+    parser.add_argument("--stream", action="store_true", help="Read the flat file in chunks instead of loading it (for very large files)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only report errors")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log = (lambda *a: None) if args.quiet else (lambda *a: print(*a, file=sys.stderr))
+
+    # The rest of the engine is imported once the arguments are known to be valid
+    from pricing_core.export import iter_chunks, write_workbooks
+    from pricing_core.ingest import iter_flat_file, load_flat_file
+    from pricing_core.uplifts import broker_columns, drop_credit_scores, price_flat_file, year_inputs_from_template
+
+    if args.stream:
+        def chunks():
+            return iter_flat_file(args.flat_file, args.chunk_rows)
+    else:
+        started = time.perf_counter()
+        try:
+            df = load_flat_file(args.flat_file)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            # Missing, unreadable, or an .xlsx that is not a workbook
+            print(f"{args.flat_file}: {e}", file=sys.stderr)
+            return 1
+        log(f"Loaded {len(df):,} rows from {args.flat_file} in {time.perf_counter() - started:.2f}s")
+
+        def chunks():
+            return iter_chunks(df, args.chunk_rows)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    failures = 0
+    for template_path in args.templates:
+        try:
+            with open(template_path) as f:
+                template = json.load(f)
+            year_inputs = year_inputs_from_template(template)
+            version_label = template.get("template_name", os.path.splitext(os.path.basename(template_path))[0])
+
+            broker_path = os.path.join(args.output_dir, f"{args.broker_name}_{version_label}.xlsx")
+            audit_path = os.path.join(args.output_dir, f"{args.audit_name}_{version_label}.xlsx")
+            priced = (price_flat_file(drop_credit_scores(chunk), year_inputs) for chunk in chunks())
+
+            template_started = time.perf_counter()
+            rows = write_workbooks(priced, [(broker_path, "PriceList", broker_columns), (audit_path, "AuditData", None)])
+            if not rows:
+                print(f"{template_path}: {args.flat_file} has no rows; wrote empty workbooks", file=sys.stderr)
+            log(f"{version_label}: wrote {rows:,} rows to {broker_path} and {audit_path} in {time.perf_counter() - template_started:.2f}s")
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            failures += 1
+            print(f"{template_path}: {e}", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
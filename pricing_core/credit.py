@@ -0,0 +1,232 @@
+"""Weighted credit scoring of Gas6.py, for one customer, a customer file or a calibration search.
+
+Each criterion is scored 25/50/75/100 by fixed steps, weighted, and the
+weighted total is compared with the decision thresholds::
+
+    weights = {"Creditsafe": 0.4, "Years Trading": 0.15, "Sector Risk": 0.15,
+               "Annual Consumption": 0.15, "Contract Value": 0.15}
+    thresholds = {"approve": 80, "stipulations": 60, "refer": 40}
+
+``calibrate`` searches weightings (on a grid over weights summing to 1)
+and acceptance cutoffs against customers with a known outcome. A customer
+only enters the search through its five step scores, so customers are
+grouped by score profile (at most 4^5 of them) and every candidate is
+scored against the profiles rather than the customers.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+CRITERIA = ["Creditsafe", "Years Trading", "Sector Risk", "Annual Consumption", "Contract Value"]
+DEFAULT_WEIGHTS = {"Creditsafe": 0.4, "Years Trading": 0.15, "Sector Risk": 0.15, "Annual Consumption": 0.15, "Contract Value": 0.15}
+DEFAULT_THRESHOLDS = {"approve": 80, "stipulations": 60, "refer": 40}
+DECISIONS = ["✅ Approved", "⚠️ Approved with Stipulations", "🔍 Refer / Manual Review", "❌ Decline"]
+SECTOR_SCORES = {"Low": 100, "Medium": 75, "High": 50, "Very High": 25}
+
+# Customer file column -> accepted header spellings (compared case-insensitively)
+CUSTOMER_COLUMNS = {
+    "Customer": ["customer", "customer name", "business name", "account", "account name"],
+    "Creditsafe Score": ["creditsafe score", "creditsafe", "credit score"],
+    "Years Trading": ["years trading"],
+    "Sector Risk": ["sector risk", "sic risk"],
+    "Annual Consumption (MWh)": ["annual consumption (mwh)", "annual consumption", "consumption (mwh)", "mwh"],
+    "Contract Value (£)": ["contract value (£)", "contract value", "spend"],
+    "Outcome": ["outcome", "result", "status", "defaulted"],
+}
+REQUIRED_CUSTOMER_COLUMNS = ["Creditsafe Score", "Years Trading", "Sector Risk", "Annual Consumption (MWh)", "Contract Value (£)"]
+GOOD_OUTCOMES = {"paid", "good", "ok", "no", "n", "false", "0"}
+BAD_OUTCOMES = {"defaulted", "default", "bad", "bad debt", "written off", "yes", "y", "true", "1"}
+
+
+def _steps(conditions, values):
+    return np.select(conditions, values, default=25)
+
+
+def score_creditsafe(cs):
+    cs = np.asarray(cs, dtype="float64")
+    return _steps([cs >= 80, cs >= 60, cs >= 40], [100, 75, 50])
+
+
+def score_years_trading(yt):
+    yt = np.asarray(yt, dtype="float64")
+    return _steps([yt > 5, yt >= 2, yt >= 1], [100, 75, 50])
+
+
+def score_sector(sr):
+    sectors = pd.Series(np.atleast_1d(np.asarray(sr, dtype=object))).astype(str).str.strip()
+    return sectors.map(SECTOR_SCORES).fillna(50).to_numpy(dtype="float64")
+
+
+def score_consumption(mwh):
+    mwh = np.asarray(mwh, dtype="float64")
+    return _steps([mwh < 100, mwh <= 250, mwh <= 500], [100, 75, 50])
+
+
+def score_contract_value(val):
+    val = np.asarray(val, dtype="float64")
+    return _steps([val < 25000, val <= 50000, val <= 100000], [100, 75, 50])
+
+
+def criteria_scores(customers):
+    """Unweighted step scores, one column per criterion in ``CRITERIA`` order (rows × 5)."""
+    return np.column_stack([
+        score_creditsafe(pd.to_numeric(customers["Creditsafe Score"], errors="coerce").fillna(0)),
+        score_years_trading(pd.to_numeric(customers["Years Trading"], errors="coerce").fillna(0)),
+        score_sector(customers["Sector Risk"]),
+        score_consumption(pd.to_numeric(customers["Annual Consumption (MWh)"], errors="coerce").fillna(0)),
+        score_contract_value(pd.to_numeric(customers["Contract Value (£)"], errors="coerce").fillna(0)),
+    ]).astype("float64")
+
+
+def weighted_total(scores, weights):
+    """Weighted total per row (``weights`` as a dict or in ``CRITERIA`` order).
+
+    The criteria are added in order, as the single-customer engine does,
+    so a batch gives the same totals to the last bit.
+    """
+    if isinstance(weights, dict):
+        weights = [weights[c] for c in CRITERIA]
+    total = np.zeros(scores.shape[0])
+    for j, weight in enumerate(weights):
+        total = total + scores[:, j] * weight
+    return total
+
+
+def decide(total, thresholds):
+    """Decision label per total score."""
+    total = np.asarray(total, dtype="float64")
+    return np.select(
+        [total >= thresholds["approve"], total >= thresholds["stipulations"], total >= thresholds["refer"]],
+        DECISIONS[:3], default=DECISIONS[3],
+    )
+
+
+def score_customer(customer, weights, thresholds):
+    """Score one customer given as a dict keyed like ``CUSTOMER_COLUMNS``; returns the Gas6 result dict."""
+    scores = criteria_scores(pd.DataFrame([customer]))
+    weighted = {c: scores[0, j] * weights[c] for j, c in enumerate(CRITERIA)}
+    total = weighted_total(scores, weights)[0]
+    return {
+        "decision": str(decide(total, thresholds)),
+        "total_score": round(float(total), 1),
+        "criteria_scores": {c: round(float(v), 1) for c, v in weighted.items()},
+    }
+
+
+def read_customers(source, file_name=None):
+    """Read a CSV/XLSX customer file and map its headers onto ``CUSTOMER_COLUMNS``."""
+    file_name = file_name or getattr(source, "name", str(source))
+    if str(file_name).lower().endswith((".xlsx", ".xls")):
+        customers = pd.read_excel(source)
+    else:
+        customers = pd.read_csv(source)
+
+    lookup = {alias: column for column, aliases in CUSTOMER_COLUMNS.items() for alias in aliases}
+    customers = customers.rename(columns=lambda c: lookup.get(" ".join(str(c).lower().split()), c))
+
+    missing = [c for c in REQUIRED_CUSTOMER_COLUMNS if c not in customers.columns]
+    if missing:
+        raise ValueError(f"Customer file is missing column(s): {', '.join(missing)}")
+    return customers.reset_index(drop=True)
+
+
+def customer_template():
+    """CSV bytes with the customer file headers, for users to fill in."""
+    return (",".join(CUSTOMER_COLUMNS) + "\n").encode("utf-8")
+
+
+def score_customers(customers, weights, thresholds):
+    """Return ``customers`` with a weighted score per criterion, Total Score and Decision."""
+    scores = criteria_scores(customers)
+    total = weighted_total(scores, weights)
+    result = customers.copy()
+    for j, criterion in enumerate(CRITERIA):
+        result[f"{criterion} Score"] = scores[:, j] * weights[criterion]
+    result["Total Score"] = total
+    result["Decision"] = decide(total, thresholds)
+    return result
+
+
+def outcome_flags(outcomes):
+    """True for a default, False for paid, NaN where the outcome is blank or not recognised."""
+    text = outcomes.astype(str).str.strip().str.lower()
+    flags = pd.Series(np.nan, index=outcomes.index, dtype="float64")
+    flags[text.isin(GOOD_OUTCOMES)] = 0.0
+    flags[text.isin(BAD_OUTCOMES)] = 1.0
+    return flags
+
+
+def weight_grid(step=0.05):
+    """Every weighting of ``CRITERIA`` in multiples of ``step`` that sums to 1 (candidates × 5)."""
+    parts = int(round(1 / step))
+    n = len(CRITERIA)
+    # Stars and bars: choosing n-1 bar positions among parts+n-1 slots
+    bars = np.array(list(itertools.combinations(range(parts + n - 1), n - 1)))
+    edges = np.column_stack([np.full(len(bars), -1), bars, np.full(len(bars), parts + n - 1)])
+    return np.round((np.diff(edges, axis=1) - 1) / parts, 10)
+
+
+def prediction_accuracy(total, defaulted, cutoff):
+    """Accuracy of "accept at or above ``cutoff``" as a prediction of paying."""
+    accepted = np.asarray(total) >= cutoff
+    return float(np.mean(accepted == ~np.asarray(defaulted, dtype=bool)))
+
+
+def calibrate(customers, outcomes, weights=None, cutoffs=None, top=20, chunk=4096):
+    """Rank weightings and acceptance cutoffs by accuracy against known outcomes.
+
+    ``outcomes`` are booleans (True = defaulted), one per customer; a
+    customer is predicted to pay when its total is at or above the cutoff,
+    i.e. accepted as Approved or Approved with Stipulations. ``weights``
+    default to ``weight_grid()`` and ``cutoffs`` to 0, 1, ..., 100. Each
+    result row has the weights, the best cutoff for them, and the accuracy,
+    acceptance rate and default rate among accepted customers.
+    """
+    weights = weight_grid() if weights is None else np.asarray(weights, dtype="float64")
+    cutoffs = np.arange(0, 101) if cutoffs is None else np.sort(np.asarray(cutoffs, dtype="float64"))
+    defaulted = np.asarray(outcomes, dtype=bool)
+    if not len(defaulted):
+        raise ValueError("No customers with a known outcome to calibrate against")
+
+    # Customers with the same step scores always score the same
+    profiles, inverse = np.unique(criteria_scores(customers), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    bad = np.bincount(inverse, weights=defaulted, minlength=len(profiles))
+    good = np.bincount(inverse, minlength=len(profiles)) - bad
+
+    n_cutoffs = len(cutoffs)
+    best = []
+    for start in range(0, len(weights), chunk):
+        block = weights[start:start + chunk]
+        totals = np.zeros((len(profiles), len(block)))
+        for j in range(len(CRITERIA)):
+            totals = totals + profiles[:, j][:, None] * block[None, :, j]
+
+        # A profile is accepted at every cutoff up to its total: count the
+        # good and bad customers reaching each cutoff in one bincount
+        reach = np.searchsorted(cutoffs, totals, side="right")
+        pairs = (np.arange(len(block))[None, :] * (n_cutoffs + 1) + reach).ravel()
+        shape = (len(block), n_cutoffs + 1)
+        good_at = np.bincount(pairs, weights=np.repeat(good, len(block)), minlength=shape[0] * shape[1]).reshape(shape)
+        bad_at = np.bincount(pairs, weights=np.repeat(bad, len(block)), minlength=shape[0] * shape[1]).reshape(shape)
+        # Accepted at cutoff c: reached beyond c, i.e. a reverse cumulative sum
+        good_accepted = np.cumsum(good_at[:, ::-1], axis=1)[:, ::-1][:, 1:]
+        bad_accepted = np.cumsum(bad_at[:, ::-1], axis=1)[:, ::-1][:, 1:]
+        accuracy = (good_accepted + (bad.sum() - bad_accepted)) / len(defaulted)
+
+        pick = np.argmax(accuracy, axis=1)
+        rows = np.arange(len(block))
+        accepted = good_accepted[rows, pick] + bad_accepted[rows, pick]
+        best.append(pd.DataFrame({
+            **{f"Weight: {c}": block[:, j] for j, c in enumerate(CRITERIA)},
+            "Cutoff": cutoffs[pick],
+            "Accuracy": accuracy[rows, pick],
+            "Accepted": accepted / len(defaulted),
+            "Default Rate (Accepted)": np.where(accepted > 0, bad_accepted[rows, pick] / np.maximum(accepted, 1), 0.0),
+        }))
+
+    ranked = pd.concat(best, ignore_index=True)
+    ranked = ranked.sort_values(["Accuracy", "Default Rate (Accepted)"], ascending=[False, True], kind="stable")
+    return ranked.head(top).reset_index(drop=True)
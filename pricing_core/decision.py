@@ -0,0 +1,141 @@
+"""Credit decision rules from the Dyce Decision Engine, for one application or a whole portfolio.
+
+``config`` holds the sidebar settings of ConreactPDF106.py::
+
+    {"approve_threshold": 80, "refer_threshold": 60,
+     "minimum_unit_margin_ppkwh": 0.5,
+     "max_broker_uplift_standing": 5.0, "max_broker_uplift_unit_rate": 1.0,
+     "approval_matrix": {role: {"Max Sites": .., "Max Spend": .., "Max Volume (kWh)": ..}}}
+"""
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.schema import TRUTHY
+
+APPROVAL_ROLES = ['Sales Agent', 'Channel Manager', 'Commercial Manager', 'Managing Director']
+
+# Portfolio column -> accepted header spellings (compared case-insensitively)
+PORTFOLIO_COLUMNS = {
+    "Business Name": ["business name", "business", "customer", "account", "account name"],
+    "Business Type": ["business type"],
+    "Number of Sites": ["number of sites", "sites"],
+    "Annual Volume (kWh)": ["annual volume (kwh)", "annual volume", "volume", "volume (kwh)"],
+    "Contract Value (£)": ["contract value (£)", "contract value", "spend", "total contract spend (£)", "total contract spend"],
+    "Unit Margin (p/kWh)": ["unit margin (p/kwh)", "unit margin", "margin"],
+    "Broker Uplift Standing (p/day)": ["broker uplift standing (p/day)", "broker uplift standing", "uplift standing"],
+    "Broker Uplift Unit Rate (p/kWh)": ["broker uplift unit rate (p/kwh)", "broker uplift unit rate", "uplift unit rate"],
+    "SIC Code": ["sic code", "sic"],
+    "SIC Risk": ["sic risk", "sector risk"],
+    "Credit Score": ["credit score", "creditsafe score"],
+    "Years Trading": ["years trading"],
+    "CCJs": ["ccjs", "ccj", "ccjs/defaults"],
+    "Payment Terms": ["payment terms"],
+}
+REQUIRED_PORTFOLIO_COLUMNS = ["Business Type", "Credit Score", "Years Trading"]
+NUMERIC_COLUMNS = [
+    "Number of Sites", "Annual Volume (kWh)", "Contract Value (£)", "Unit Margin (p/kWh)",
+    "Broker Uplift Standing (p/day)", "Broker Uplift Unit Rate (p/kWh)", "Credit Score", "Years Trading",
+]
+
+
+def read_portfolio(source, file_name=None):
+    """Read a CSV/XLSX portfolio and map its headers onto ``PORTFOLIO_COLUMNS``."""
+    file_name = file_name or getattr(source, "name", str(source))
+    if str(file_name).lower().endswith((".xlsx", ".xls")):
+        portfolio = pd.read_excel(source)
+    else:
+        portfolio = pd.read_csv(source)
+
+    lookup = {alias: column for column, aliases in PORTFOLIO_COLUMNS.items() for alias in aliases}
+    portfolio = portfolio.rename(columns=lambda c: lookup.get(" ".join(str(c).lower().split()), c))
+
+    missing = [c for c in REQUIRED_PORTFOLIO_COLUMNS if c not in portfolio.columns]
+    if missing:
+        raise ValueError(f"Portfolio is missing column(s): {', '.join(missing)}")
+    return portfolio
+
+
+def portfolio_template():
+    """CSV bytes with the portfolio headers, for users to fill in."""
+    return (",".join(c for c in PORTFOLIO_COLUMNS if c != "SIC Risk") + "\n").encode("utf-8")
+
+
+def _sic_risk(portfolio, sic_df):
+    risk = pd.Series("Medium", index=portfolio.index, dtype=object)
+    if "SIC Code" in portfolio.columns and sic_df is not None:
+        codes = portfolio["SIC Code"].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+        lookup = sic_df.drop_duplicates("SIC_Code").set_index("SIC_Code")["Typical_Risk_Rating"]
+        risk = codes.map(lookup).fillna("Medium")
+    if "SIC Risk" in portfolio.columns:
+        # An explicit risk rating wins, as the manual selection does in the app
+        risk = portfolio["SIC Risk"].where(portfolio["SIC Risk"].notna(), risk)
+    return risk.astype(str).str.strip()
+
+
+def evaluate_portfolio(portfolio, config, sic_df=None):
+    """Return ``portfolio`` with Decision, Required Approver, Referral Count and Reasons columns."""
+    p = portfolio.reset_index(drop=True).copy()
+    for column in NUMERIC_COLUMNS:
+        p[column] = pd.to_numeric(p[column], errors="coerce").fillna(0) if column in p.columns else 0
+    for column, default in (("CCJs", "No"), ("Payment Terms", "14 Days Direct Debit")):
+        if column not in p.columns:
+            p[column] = default
+
+    score = p["Credit Score"].to_numpy(dtype="float64")
+    years = p["Years Trading"].to_numpy(dtype="float64")
+    business_type = p["Business Type"].astype(str).str.strip().to_numpy()
+    ccjs = p["CCJs"].astype(str).str.strip().str.lower().isin(TRUTHY).to_numpy()
+    sic_risk = _sic_risk(p, sic_df).to_numpy()
+
+    declined_rules = [
+        (score < config["refer_threshold"], "Declined: Credit Score below referral threshold"),
+        (ccjs, "Declined: CCJs or Defaults present"),
+    ]
+    declined = declined_rules[0][0] | declined_rules[1][0]
+
+    referral_rules = [
+        ((config["refer_threshold"] <= score) & (score < config["approve_threshold"]), "Referral: Credit Score between thresholds"),
+        ((np.isin(business_type, ["Sole Trader", "Partnership"]) & (years < 1)) | ((business_type == "Limited Company") & (years < 2)),
+         "Referral: Insufficient trading history"),
+        (np.isin(sic_risk, ["High", "Very High"]), "Referral: SIC Risk is High/Very High"),
+        ((p["Payment Terms"].astype(str).str.strip() != "14 Days Direct Debit").to_numpy(), "Referral: Payment terms exceed maximum allowed"),
+        (p["Unit Margin (p/kWh)"].to_numpy() < config["minimum_unit_margin_ppkwh"], "Referral: Unit Margin below minimum"),
+        (p["Broker Uplift Standing (p/day)"].to_numpy() > config["max_broker_uplift_standing"], "Referral: Standing charge uplift exceeds maximum"),
+        (p["Broker Uplift Unit Rate (p/kWh)"].to_numpy() > config["max_broker_uplift_unit_rate"], "Referral: Unit rate uplift exceeds maximum"),
+    ]
+    # Referral reasons only apply to applications that were not declined
+    referral_rules = [(mask & ~declined, text) for mask, text in referral_rules]
+
+    rules = declined_rules + referral_rules
+    texts = np.column_stack([np.where(mask, text, "") for mask, text in rules])
+    reasons = ["; ".join(filter(None, row)) for row in texts]
+
+    matrix = config["approval_matrix"]
+    within = [
+        (p["Number of Sites"].to_numpy() <= matrix[role]['Max Sites']) &
+        (p["Contract Value (£)"].to_numpy() <= matrix[role]['Max Spend']) &
+        (p["Annual Volume (kWh)"].to_numpy() <= matrix[role]['Max Volume (kWh)'])
+        for role in APPROVAL_ROLES
+    ]
+    approver = np.select(within, APPROVAL_ROLES, default="Managing Director").astype(object)
+    approver[declined] = None
+
+    p["SIC Risk"] = sic_risk
+    p["Decision"] = np.where(declined, "Declined", "Approved")
+    p["Required Approver"] = approver
+    p["Referral Count"] = np.sum([mask for mask, _ in referral_rules], axis=0)
+    p["Reasons"] = reasons
+    return p
+
+
+def run_decision(application, config, sic_df=None):
+    """Decide a single application, given as a dict keyed like ``PORTFOLIO_COLUMNS``.
+
+    Returns ``(decision, required_approver, reasons)``; the approver is None
+    for declined applications.
+    """
+    row = evaluate_portfolio(pd.DataFrame([application]), config, sic_df).iloc[0]
+    approver = row["Required Approver"] if isinstance(row["Required Approver"], str) else None
+    reasons = [r for r in row["Reasons"].split("; ") if r]
+    return row["Decision"], approver, reasons
@@ -0,0 +1,122 @@
+"""Streaming Excel export for price lists and audit data.
+
+Several workbooks are written from a single pass over the data using
+xlsxwriter's ``constant_memory`` mode, which flushes each row to disk as it
+is written instead of holding the whole sheet in memory. Sheets roll over
+to "<name> (2)", "<name> (3)"... once Excel's row limit is reached.
+xlsxwriter is only imported once a workbook is actually written. Flag
+columns are written as Yes/No rather than TRUE/FALSE (``flags_as_text``).
+"""
+
+import io
+
+import pandas as pd
+
+from pricing_core.schema import flags_as_text
+
+EXCEL_MAX_ROWS = 1_048_576
+CHUNK_ROWS = 20_000
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def frames_to_xlsx(sheets):
+    """Bytes of a workbook with one sheet per ``{sheet_name: DataFrame}`` item (for small tables)."""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        for sheet_name, df in sheets.items():
+            flags_as_text(df).to_excel(writer, index=False, sheet_name=sheet_name)
+    return output.getvalue()
+
+
+def frame_to_xlsx(df, sheet_name):
+    """Bytes of a single-sheet workbook holding ``df`` (for small tables)."""
+    return frames_to_xlsx({sheet_name: df})
+
+
+def iter_chunks(data, chunk_rows=CHUNK_ROWS):
+    """Yield DataFrame chunks from a DataFrame or pass an iterable of chunks through."""
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, max(len(data), 1), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+    else:
+        yield from data
+
+
+class _SheetWriter:
+    def __init__(self, target, sheet_name, columns, max_rows):
+        import xlsxwriter
+
+        self.workbook = xlsxwriter.Workbook(target, {
+            "constant_memory": True,
+            "nan_inf_to_errors": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+        })
+        self.header_format = self.workbook.add_format({"bold": True, "border": 1})
+        self.sheet_name = sheet_name
+        self.columns = columns
+        self.max_rows = max_rows
+        self.sheets = 0
+        self.worksheet = None
+        self.row = 0
+
+    def _new_sheet(self, header):
+        self.sheets += 1
+        name = self.sheet_name if self.sheets == 1 else f"{self.sheet_name} ({self.sheets})"
+        self.worksheet = self.workbook.add_worksheet(name[:31])
+        self.worksheet.write_row(0, 0, header, self.header_format)
+        self.row = 1
+
+    def write(self, header, rows):
+        for values in rows:
+            if self.worksheet is None or self.row >= self.max_rows:
+                self._new_sheet(header)
+            self.worksheet.write_row(self.row, 0, values)
+            self.row += 1
+
+    def close(self, header):
+        if self.worksheet is None:
+            self._new_sheet(header)
+        self.workbook.close()
+
+
+def write_workbooks(data, outputs, max_rows=EXCEL_MAX_ROWS):
+    """Write ``data`` to several workbooks in one pass and return the number of rows written.
+
+    ``data`` is a DataFrame or an iterable of DataFrame chunks with the same
+    columns. ``outputs`` is a list of ``(target, sheet_name, columns)``
+    where ``target`` is a path or binary file object and ``columns`` is a
+    list of column names, a function choosing them from the data's columns,
+    or ``None`` for every column. Every target gets a workbook, even when
+    ``data`` yields no chunks: its sheet then has the listed columns as a
+    header, or no header when the columns come from the data.
+    """
+    writers = [_SheetWriter(target, sheet, columns, max_rows) for target, sheet, columns in outputs]
+    headers = None
+    selections = []
+    rows = 0
+
+    for chunk in iter_chunks(data):
+        chunk = flags_as_text(chunk)
+        if headers is None:
+            headers = []
+            for writer in writers:
+                if writer.columns is None:
+                    header = list(chunk.columns)
+                elif callable(writer.columns):
+                    header = list(writer.columns(list(chunk.columns)))
+                else:
+                    header = list(writer.columns)
+                headers.append([str(c) for c in header])
+                selections.append([chunk.columns.get_loc(c) for c in header])
+
+        values = chunk.astype(object).where(chunk.notna(), None).to_numpy()
+        for writer, header, selection in zip(writers, headers, selections):
+            writer.write(header, values[:, selection].tolist())
+        rows += len(chunk)
+
+    if headers is None:
+        headers = [[] if writer.columns is None or callable(writer.columns) else [str(c) for c in writer.columns]
+                   for writer in writers]
+    for writer, header in zip(writers, headers):
+        writer.close(header)
+    return rows
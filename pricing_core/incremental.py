@@ -0,0 +1,132 @@
+"""Incremental re-pricing of a flat file as margin inputs change.
+
+``PricingState`` keeps the priced frame and knows which (contract year,
+band, carbon) partition every row falls in. ``update`` compares the new
+``year_inputs`` with the previous ones and re-prices only what changed:
+
+* a band's Standard or Carbon uplifts: that band's standard or carbon rows
+  for that year;
+* a year's cost inputs or band limits, or a year added or removed: that
+  year's rows.
+
+The result is identical to ``price_flat_file`` on the same inputs.
+"""
+
+import copy
+
+import numpy as np
+
+from pricing_core.uplifts import apply_uplifts, band_positions, calculate_uplifts, carbon_flags, contract_years, year_uplifts
+
+PRICED_COLUMNS = ["Uplift_Unit", "Uplift_Standing", "Unit Rate", "Standing Charge", "Total Annual Cost (£)"]
+STANDARD_FIELDS = ("Standard_Unit", "Standard_Standing")
+CARBON_FIELDS = ("Carbon_Unit", "Carbon_Standing")
+
+
+def _cost_inputs(year_config):
+    return {k: v for k, v in year_config.items() if k != "bands"}
+
+
+def _band_limits(year_config):
+    return [(b["Min"], b["Max"]) for b in year_config["bands"]]
+
+
+class _YearPartitions:
+    """A year's rows grouped by (band, carbon), each group as a slice of one sorted array."""
+
+    def __init__(self, rows, consumption, is_carbon, bands):
+        codes = band_positions(consumption, bands) * 2 + is_carbon
+        order = np.argsort(codes, kind="stable")
+        self.rows = rows[order]
+        self.bounds = np.searchsorted(codes[order], np.arange(2 * len(bands) + 1))
+
+    def get(self, band, carbon):
+        code = band * 2 + int(carbon)
+        return self.rows[self.bounds[code]:self.bounds[code + 1]]
+
+
+class PricingState:
+    """A priced flat file that re-prices only the partitions an input change touches.
+
+    ``df_final`` is updated in place, so hold on to the state rather than
+    a copy of the frame.
+    """
+
+    def __init__(self, df, year_inputs):
+        self.df = df.reset_index(drop=True)
+        self.consumption = self.df["Minimum_Annual_Consumption"].to_numpy(dtype="float64")
+        self.unit_rate = self.df["Unit_Rate"].to_numpy(dtype="float64")
+        self.standing_charge = self.df["Standing_Charge"].to_numpy(dtype="float64")
+        self.years = contract_years(self.df)
+        self.carbon = carbon_flags(self.df)
+        self.year_inputs = {int(y): copy.deepcopy(c) for y, c in year_inputs.items()}
+
+        year_values, year_codes = np.unique(self.years, return_inverse=True)
+        order = np.argsort(year_codes, kind="stable")
+        bounds = np.searchsorted(year_codes[order], np.arange(len(year_values) + 1))
+        self._year_rows = {int(y): order[bounds[i]:bounds[i + 1]] for i, y in enumerate(year_values)}
+        self._partitions = {}
+
+        self.df_final = apply_uplifts(self.df, calculate_uplifts(self.df, self.year_inputs))
+        self._positions = [self.df_final.columns.get_loc(c) for c in PRICED_COLUMNS]
+        self.last_repriced = len(self.df)
+
+    def _partition(self, year):
+        if year not in self._partitions:
+            rows = self._year_rows[year]
+            self._partitions[year] = _YearPartitions(
+                rows, self.consumption[rows], self.carbon[rows], self.year_inputs[year]["bands"])
+        return self._partitions[year]
+
+    def changed_rows(self, year_inputs):
+        """Row positions whose prices depend on inputs that differ from the current ones."""
+        parts = []
+        for year in set(self.year_inputs) | set(year_inputs):
+            if year not in self._year_rows:
+                continue
+            old, new = self.year_inputs.get(year), year_inputs.get(year)
+            if old == new:
+                continue
+            if old is None or new is None or _cost_inputs(old) != _cost_inputs(new) or _band_limits(old) != _band_limits(new):
+                parts.append(self._year_rows[year])
+                continue
+            partitions = self._partition(year)
+            for band, (old_band, new_band) in enumerate(zip(old["bands"], new["bands"])):
+                for carbon, fields in ((False, STANDARD_FIELDS), (True, CARBON_FIELDS)):
+                    if any(old_band[f] != new_band[f] for f in fields):
+                        parts.append(partitions.get(band, carbon))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype="int64")
+
+    def update(self, year_inputs):
+        """Re-price the rows affected by ``year_inputs`` and return ``df_final``."""
+        year_inputs = {int(y): c for y, c in year_inputs.items()}
+        rows = self.changed_rows(year_inputs)
+        for year in set(self.year_inputs) | set(year_inputs):
+            old, new = self.year_inputs.get(year), year_inputs.get(year)
+            if old is None or new is None or _band_limits(old) != _band_limits(new):
+                self._partitions.pop(year, None)
+        self.year_inputs = copy.deepcopy(year_inputs)
+
+        if len(rows):
+            self._reprice(rows)
+        self.last_repriced = len(rows)
+        return self.df_final
+
+    def _reprice(self, rows):
+        uplift_unit = np.zeros(len(rows))
+        uplift_standing = np.zeros(len(rows))
+        years = self.years[rows]
+        for year in np.unique(years):
+            config = self.year_inputs.get(int(year))
+            if config is None:
+                continue
+            mask = years == year
+            subset = rows[mask]
+            uplift_unit[mask], uplift_standing[mask] = year_uplifts(self.consumption[subset], self.carbon[subset], config)
+
+        unit_rate = np.round(self.unit_rate[rows] + uplift_unit, 4)
+        standing_charge = np.round(self.standing_charge[rows] + uplift_standing, 4)
+        total = ((standing_charge * 365) + (unit_rate * self.consumption[rows])) / 100
+
+        for position, values in zip(self._positions, (uplift_unit, uplift_standing, unit_rate, standing_charge, total)):
+            self.df_final.iloc[rows, position] = values
@@ -0,0 +1,184 @@
+"""Flat-file ingestion with a content-hashed cache.
+
+Uploaded supplier files are hashed, parsed once with ``pd.read_excel`` and
+stored as a pickled snapshot under the cache directory. Later reruns (and
+other sessions uploading the same bytes) are served from memory or from the
+snapshot instead of going back through openpyxl. ``load_flat_files`` loads
+several files at once, parsing the uncached ones in worker processes.
+
+Files too large to hold in memory are read with ``iter_flat_file`` instead,
+which yields typed chunks straight from openpyxl's read-only row iterator
+(or from a chunked CSV reader) and caches nothing. Flat files may be .xlsx
+or CSV; the format is told from the content.
+"""
+
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from pricing_core.export import CHUNK_ROWS
+from pricing_core.schema import apply_schema
+from pricing_core.snapshots import cached, snapshot_path, write_snapshot
+
+SNAPSHOT_NAMESPACE = "flatfiles"
+SNAPSHOT_VERSION = "3"
+MEMORY_ENTRIES = 8
+XLSX_MAGIC = b"PK\x03\x04"
+
+_memory = OrderedDict()
+
+
+def read_source_bytes(source):
+    """Return the raw bytes of an uploaded file, file object or path."""
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        data = source.read()
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return data
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_flat_file(df):
+    """Tidy a freshly parsed flat file: clean headers, drop blank rows and apply the schema."""
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df.dropna(how="all").reset_index(drop=True)
+    return apply_schema(df.infer_objects())
+
+
+def parse_flat_file(data):
+    if data.startswith(XLSX_MAGIC):
+        return normalize_flat_file(pd.read_excel(io.BytesIO(data)))
+    return normalize_flat_file(pd.read_csv(io.BytesIO(data)))
+
+
+def load_flat_file(source):
+    """Load a supplier flat file, reusing any earlier parse of the same bytes.
+
+    The returned frame is a copy, so callers are free to modify it. Its
+    cache key (content hash plus snapshot version) is available as
+    ``df.attrs["flat_file_key"]``.
+    """
+    return _load_bytes(read_source_bytes(source))
+
+
+def flat_file_key(data):
+    return f"{file_digest(data)}-v{SNAPSHOT_VERSION}"
+
+
+def _remember(key, df):
+    df.attrs["flat_file_key"] = key
+    _memory[key] = df
+    while len(_memory) > MEMORY_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def _load_bytes(data, key=None):
+    key = key or flat_file_key(data)
+    df = _memory.get(key)
+    if df is None:
+        df = cached(SNAPSHOT_NAMESPACE, key, lambda: parse_flat_file(data))
+        _remember(key, df)
+    else:
+        _memory.move_to_end(key)
+    return df.copy()
+
+
+def load_flat_files(sources, max_workers=None):
+    """Load several flat files (see ``load_flat_file``), returned in the order given.
+
+    Files with no snapshot yet are parsed in a process pool of up to
+    ``max_workers`` processes (one per CPU by default); openpyxl parsing is
+    pure Python, so threads would not overlap.
+    """
+    datas = [read_source_bytes(source) for source in sources]
+    keys = [flat_file_key(data) for data in datas]
+    pending = {
+        key: data for key, data in zip(keys, datas)
+        if key not in _memory and not os.path.exists(snapshot_path(SNAPSHOT_NAMESPACE, key))
+    }
+    workers = min(len(pending), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for key, df in zip(pending, pool.map(parse_flat_file, pending.values())):
+                write_snapshot(SNAPSHOT_NAMESPACE, key, df)
+                _remember(key, df)
+    return [_load_bytes(data, key) for data, key in zip(datas, keys)]
+
+
+def _peek(source, size=4):
+    if hasattr(source, "read"):
+        head = source.read(size)
+        source.seek(0)
+        return head
+    with open(source, "rb") as f:
+        return f.read(size)
+
+
+def _xlsx_chunks(source, chunk_rows):
+    """Raw DataFrames of up to ``chunk_rows`` rows from the first sheet, at least one (possibly empty)."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        while header and header[-1] is None:
+            header.pop()
+        header = [f"Unnamed: {i}" if c is None else c for i, c in enumerate(header)]
+        width = len(header)
+
+        batch = []
+        yielded = False
+        for row in rows:
+            if len(row) != width:
+                row = row[:width] + (None,) * (width - len(row))
+            batch.append(row)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=header)
+                yielded = True
+                batch = []
+        if batch or not yielded:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def iter_flat_file(source, chunk_rows=CHUNK_ROWS):
+    """Yield a flat file as typed DataFrame chunks of up to ``chunk_rows`` rows.
+
+    Only one chunk is parsed at a time, so memory is bounded by the chunk
+    size rather than the file, and the first chunk is available as soon as
+    its rows are read. Chunks are normalized like ``load_flat_file``'s
+    result and indexed by their position in the whole file. At least one
+    chunk is yielded, so the columns are known even for an empty file.
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    if _peek(source) == XLSX_MAGIC:
+        raw_chunks = _xlsx_chunks(source, chunk_rows)
+    else:
+        raw_chunks = pd.read_csv(source, chunksize=chunk_rows)
+
+    start = 0
+    empty = None
+    for raw in raw_chunks:
+        chunk = normalize_flat_file(raw)
+        if chunk.empty:
+            empty = chunk if empty is None else empty
+            continue
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+    if start == 0 and empty is not None:
+        yield empty
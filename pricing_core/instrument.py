@@ -0,0 +1,169 @@
+"""Per-stage wall time and peak memory for the pricing tools.
+
+Each app creates one ``Recorder`` per script run and wraps its pipeline
+stages::
+
+    perf = sidebar_recorder("Gaswcost4")
+    with perf.stage("load_flat_file"):
+        df = load_flat_file(uploaded_file)
+
+Finished stages are only written to disk when ``DYCE_PERF_LOG`` is set:
+to ``1`` for ``.cache/perf.jsonl`` or to a path of your own, one JSON line
+per stage. Peak memory comes from tracemalloc, which slows Python
+allocations noticeably, so it is only traced when asked for.
+
+tracemalloc is process-wide and Streamlit sessions share the process, so
+tracing is started by the first traced stage to begin and stopped by the
+last to end, and the peak is only reset while no other stage is traced.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from pricing_core.snapshots import CACHE_DIR
+
+
+def _log_path(setting):
+    flag = setting.strip().lower()
+    if flag in {"", "0", "false", "no"}:
+        return None
+    if flag in {"1", "true", "yes"}:
+        return os.path.join(CACHE_DIR, "perf.jsonl")
+    return setting
+
+
+LOG_PATH = _log_path(os.environ.get("DYCE_PERF_LOG", ""))
+PANEL_COLUMNS = ["stage", "seconds", "peak_mb"]
+
+_tracing_lock = threading.Lock()
+_traced_stages = 0
+_started_tracing = False
+
+
+def _begin_tracing():
+    global _traced_stages, _started_tracing
+    with _tracing_lock:
+        if _traced_stages == 0:
+            # Leave tracing alone at the end if something else turned it on
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        _traced_stages += 1
+
+
+def _end_tracing():
+    """Peak MB since tracing began or was last reset; stops tracing when no traced stage is left."""
+    global _traced_stages
+    with _tracing_lock:
+        peak_mb = round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+        _traced_stages -= 1
+        if _traced_stages == 0 and _started_tracing:
+            tracemalloc.stop()
+    return peak_mb
+
+
+def append_log(record, path=LOG_PATH):
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError:
+        # Instrumentation must never break pricing
+        pass
+
+
+def read_log(path=LOG_PATH):
+    """All records from a perf log as a list of dicts (malformed lines are skipped)."""
+    records = []
+    if not path or not os.path.exists(path):
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+class Recorder:
+    """Collects stage timings for one run of an app.
+
+    ``on_record(recorder)`` is called after each stage, e.g. to redraw a
+    panel; a stage's peak memory is the tracemalloc high-water mark since
+    the stage started, or since an earlier stage still being traced in
+    another session started.
+    """
+
+    def __init__(self, app, trace_memory=False, log_path=LOG_PATH, on_record=None):
+        self.app = app
+        self.run_id = uuid.uuid4().hex[:12]
+        self.trace_memory = trace_memory
+        self.log_path = log_path
+        self.on_record = on_record
+        self.records = []
+
+    @contextmanager
+    def stage(self, name, **details):
+        if self.trace_memory:
+            _begin_tracing()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            peak_mb = None
+            if self.trace_memory:
+                peak_mb = _end_tracing()
+            self.record(name, seconds, peak_mb, **details)
+
+    def record(self, name, seconds, peak_mb=None, **details):
+        record = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "app": self.app,
+            "run": self.run_id,
+            "stage": name,
+            "seconds": round(seconds, 6),
+            "peak_mb": peak_mb,
+            **details,
+        }
+        self.records.append(record)
+        append_log(record, self.log_path)
+        if self.on_record:
+            self.on_record(self)
+        return record
+
+    def total_seconds(self):
+        return sum(r["seconds"] for r in self.records)
+
+
+def sidebar_recorder(app):
+    """A ``Recorder`` wired to an optional "Performance" panel in the Streamlit sidebar.
+
+    The panel is drawn into a placeholder created here, so it stays current
+    even when the script stops early.
+    """
+    import streamlit as st
+
+    show = st.sidebar.checkbox("⏱️ Show performance panel", key="perf_panel")
+    trace_memory = show and st.sidebar.checkbox("Trace peak memory (slower)", key="perf_trace_memory")
+    placeholder = st.sidebar.empty() if show else None
+
+    def draw(recorder):
+        with placeholder.container():
+            st.caption(f"Run {recorder.run_id}: {recorder.total_seconds():.3f}s over {len(recorder.records)} stage(s)")
+            st.dataframe(
+                [{c: r.get(c) for c in PANEL_COLUMNS} for r in recorder.records],
+                hide_index=True,
+            )
+
+    return Recorder(app, trace_memory=trace_memory, on_record=draw if show else None)
@@ -0,0 +1,34 @@
+"""(DNO, LLF code) → LLF band resolution."""
+
+import pandas as pd
+
+
+def normalize_codes(values):
+    """Normalise DNO IDs / LLF codes: text, trimmed, upper case, no float ``.0`` suffix."""
+    return pd.Series(values).astype(str).str.strip().str.upper().str.replace(r"\.0$", "", regex=True)
+
+
+def _keys(dnos, llfs):
+    return normalize_codes(dnos).to_numpy(dtype=object) + "|" + normalize_codes(llfs).to_numpy(dtype=object)
+
+
+class LLFBandMap:
+    """Hash map over the LLF Mapping Table; the first row wins for duplicate pairs."""
+
+    def __init__(self, mapping_df, dno_col="DNO", llf_col="LLF", band_col="Band"):
+        keys = _keys(mapping_df[dno_col], mapping_df[llf_col])
+        bands = mapping_df[band_col].to_numpy(dtype=object)
+        self._bands = {}
+        for key, band in zip(keys, bands):
+            self._bands.setdefault(key, band)
+
+    def __len__(self):
+        return len(self._bands)
+
+    def band(self, dno, llf):
+        """Band for one site, or ``None`` when the pair is not mapped."""
+        return self._bands.get(_keys([dno], [llf])[0])
+
+    def bands(self, dnos, llfs):
+        """Bands for many (DNO, LLF) pairs at once; unmapped pairs are NaN."""
+        return pd.Series(_keys(dnos, llfs)).map(self._bands)
@@ -0,0 +1,115 @@
+"""In-memory memo of priced frames and export bytes.
+
+Streamlit reruns the whole script on every widget change, so editing a
+file-name box used to re-price the flat file and rebuild its workbooks.
+Results are kept here keyed by what they depend on::
+
+    key = ("price_list", df.attrs["flat_file_key"], template_hash(year_inputs))
+    xlsx = memo.get_or_build(key, lambda: frame_to_xlsx(df_final, "PriceList"))
+
+The memo is shared by every session in the process and evicts least
+recently used entries once it holds more than ``MEMORY_BUDGET`` bytes
+(``DYCE_MEMO_MB``, 512 MB by default). Cached frames are shared between
+reruns and sessions, so treat them as read-only.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+MEMORY_BUDGET = int(os.environ.get("DYCE_MEMO_MB", "512")) * 1_000_000
+MAX_ENTRIES = 64
+
+
+def _normalize(value):
+    # 50 and 50.0 from a number_input or a loaded template are the same input
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return str(value)
+
+
+def template_hash(template):
+    """Stable hash of a margin template or ``year_inputs`` dict."""
+    text = json.dumps(_normalize(template), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def nbytes(value):
+    """Approximate memory held by a cached value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class MemoCache:
+    """LRU mapping bounded by total size in bytes and by entry count."""
+
+    def __init__(self, max_bytes=MEMORY_BUDGET, max_entries=MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """Store ``value``; anything larger than the whole budget is not kept."""
+        size = nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted
+        return value
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, build())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+memo = MemoCache()
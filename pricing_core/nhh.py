@@ -0,0 +1,244 @@
+"""NHH electricity price books and quotes.
+
+``uplift_inputs`` is the per-band list built by the NHH tools::
+
+    [{"min": 1000, "max": 3000, "uplift_standing": .., "uplift_day": ..,
+      "uplift_night": .., "uplift_evw": ..}, ...]
+
+Cost functions take a band's mid-point consumption and return the
+``(p/day, p/kWh)`` added to the supplier rates before the band uplifts.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.bands import band_label
+from pricing_core.tariff_index import _ranges
+
+DURATIONS = (12, 24, 36)
+RATE_COLUMNS = ["Standing_Charge", "Day_Rate", "Night_Rate", "Evening_And_Weekend_Rate"]
+
+PRICE_BOOK_COLUMNS = [
+    "Band",
+    "Standing Charge (p/day)",
+    "Day Rate (p/kWh)",
+    "Night Rate (p/kWh)",
+    "Evening & Weekend Rate (p/kWh)",
+    "Total Annual Cost (£)",
+]
+
+
+def green_flags(df):
+    """1 where Green_Energy reads YES (or is True), 0 where it reads NO (or is False), -1 otherwise."""
+    col = df["Green_Energy"]
+    if pd.api.types.is_bool_dtype(col):
+        return np.where(col.isna(), -1, col.fillna(False).to_numpy(dtype=bool).astype(int))
+    codes, uniques = pd.factorize(col)
+    lookup = [{"YES": 1, "NO": 0}.get(u.upper(), -1) if isinstance(u, str) else -1 for u in uniques]
+    return np.array(lookup + [-1])[codes]
+
+
+def cost_stack(bad_debt=0.0, billing_cost=0.0, customer_service=0.0, regulatory_cost=0.0, margin=0.0):
+    """Cost function for per-day operating costs plus per-kWh bad debt and margin."""
+    standing = billing_cost + customer_service + regulatory_cost
+    unit = bad_debt + margin
+    return lambda mid_consumption: (standing, unit)
+
+
+def manual_allocation(total_cost, standing_pct):
+    """Cost function splitting a £/year cost per meter between standing charge and unit rates.
+
+    ``standing_pct`` is a fraction; the unit share is spread over the band's
+    mid-point consumption.
+    """
+    cost_pence = total_cost * 100
+    unit_pct = 1 - standing_pct
+    return lambda mid_consumption: ((cost_pence * standing_pct) / 365, (cost_pence * unit_pct) / mid_consumption)
+
+
+def annual_cost(consumption, standing, day, night, evw, profile=None):
+    """Estimated annual cost in £.
+
+    ``profile`` is the day/night/evening-and-weekend split in percent; without
+    one all consumption is priced at the day rate.
+    """
+    if profile is None:
+        return (consumption * day / 100) + (365 * standing / 100)
+    day_pct, night_pct, evw_pct = profile
+    return (
+        consumption * (
+            day * (day_pct / 100) +
+            night * (night_pct / 100) +
+            evw * (evw_pct / 100)
+        ) / 100
+    ) + (365 * standing / 100)
+
+
+def band_tariff_positions(df, bands, durations, greens=(False, True)):
+    """Position of the first tariff row overlapping each band, per duration and tariff type.
+
+    One interval join over the flat file: every eligible row is expanded to
+    the run of bands its consumption range overlaps, and the lowest row
+    position wins for each (duration, tariff type, band). Returns an int
+    array shaped ``(len(durations), len(greens), len(bands))``, -1 where no
+    row matches. ``bands`` are ``(min, max)`` pairs.
+    """
+    mins = df["Minimum_Annual_Consumption"].to_numpy(dtype="float64")
+    maxs = df["Maximum_Annual_Consumption"].to_numpy(dtype="float64")
+    band_mins = np.array([b[0] for b in bands], dtype="float64")
+    band_maxs = np.array([b[1] for b in bands], dtype="float64")
+    n_bands = len(bands)
+
+    duration_idx = pd.Index(list(durations)).get_indexer(df["Contract_Duration"])
+    flags = green_flags(df)
+    green_idx = np.full(len(df), -1)
+    for i, green in enumerate(greens):
+        green_idx[flags == int(green)] = i
+
+    rows = np.flatnonzero((duration_idx >= 0) & (green_idx >= 0) & ~np.isnan(mins) & ~np.isnan(maxs))
+    if np.all(np.diff(band_mins) >= 0) and np.all(np.diff(band_maxs) >= 0):
+        # Bands overlapping [min, max] are those with max >= min (a suffix)
+        # and min <= max (a prefix), so each row covers one contiguous run
+        lo = np.searchsorted(band_maxs, mins[rows], side="left")
+        hi = np.searchsorted(band_mins, maxs[rows], side="right")
+        counts = np.maximum(hi - lo, 0)
+        pair_rows = np.repeat(rows, counts)
+        pair_bands = np.repeat(lo, counts) + _ranges(counts)
+    else:
+        pairs = [
+            (rows[(mins[rows] <= band_maxs[j]) & (maxs[rows] >= band_mins[j])], j)
+            for j in range(n_bands)
+        ]
+        pair_rows = np.concatenate([r for r, _ in pairs])
+        pair_bands = np.concatenate([np.full(len(r), j) for r, j in pairs])
+        order = np.argsort(pair_rows, kind="stable")
+        pair_rows, pair_bands = pair_rows[order], pair_bands[order]
+
+    groups = (duration_idx[pair_rows] * len(greens) + green_idx[pair_rows]) * n_bands + pair_bands
+    # pair_rows is in row order, so the first occurrence of a group is its first tariff
+    found, first = np.unique(groups, return_index=True)
+    positions = np.full(len(durations) * len(greens) * n_bands, -1)
+    positions[found] = pair_rows[first]
+    return positions.reshape(len(durations), len(greens), n_bands)
+
+
+def price_books(df, uplift_inputs, durations=DURATIONS, greens=(False, True), cost=None, profile=None,
+                with_annual_cost=True):
+    """Price books for every duration and tariff type, keyed ``(duration, green)``.
+
+    Each book has one row per band, priced from the first matching tariff.
+    With ``with_annual_cost=False`` the supplier rates plus uplifts are
+    reported unrounded and there is no total column, as in NHH10.py.
+    """
+    columns = PRICE_BOOK_COLUMNS if with_annual_cost else PRICE_BOOK_COLUMNS[:-1]
+    bands = [(band["min"], band["max"]) for band in uplift_inputs]
+    positions = band_tariff_positions(df, bands, durations, greens).reshape(-1)
+    found = positions >= 0
+    n_books = len(positions) // max(len(bands), 1)
+
+    def per_band(key):
+        return np.tile(np.array([band[key] for band in uplift_inputs], dtype="float64"), n_books)
+
+    rates = df[RATE_COLUMNS].iloc[np.maximum(positions, 0)].to_numpy(dtype="float64") if len(df) else np.zeros((len(positions), 4))
+    mid_consumption = (per_band("min") + per_band("max")) / 2
+    add_standing, add_unit = cost(mid_consumption) if cost else (0, 0)
+    final_standing = rates[:, 0] + add_standing + per_band("uplift_standing")
+    final_day = rates[:, 1] + add_unit + per_band("uplift_day")
+    final_night = rates[:, 2] + add_unit + per_band("uplift_night")
+    final_evw = rates[:, 3] + add_unit + per_band("uplift_evw")
+
+    if with_annual_cost:
+        total = annual_cost(mid_consumption, final_standing, final_day, final_night, final_evw, profile)
+        values = [np.round(v, 4) for v in (final_standing, final_day, final_night, final_evw)] + [np.round(total, 2)]
+    else:
+        values = [final_standing, final_day, final_night, final_evw]
+
+    labels = [band_label(lo, hi) for lo, hi in bands]
+    books = {}
+    for i, (duration, green) in enumerate((d, g) for d in durations for g in greens):
+        rows = slice(i * len(bands), (i + 1) * len(bands))
+        book = {"Band": labels}
+        for column, value in zip(columns[1:], values):
+            cells = value[rows].astype(object)
+            cells[~found[rows]] = "N/A"
+            book[column] = cells
+        books[(duration, green)] = pd.DataFrame(book, columns=columns)
+    return books
+
+
+def price_book(df, uplift_inputs, contract_duration, green, cost=None, profile=None, with_annual_cost=True):
+    """The price book for one duration and tariff type (see ``price_books``)."""
+    books = price_books(df, uplift_inputs, [contract_duration], [green], cost, profile, with_annual_cost)
+    return books[(contract_duration, green)]
+
+
+def price_book_sheets(books):
+    """Workbook sheets for ``price_books``: every book on "All Tariffs", then one sheet per book."""
+    sheets = {}
+    for (duration, green), book in books.items():
+        tariff_type = "Green" if green else "Standard"
+        sheets[f"{duration}m {tariff_type}"] = book
+    combined = pd.concat([
+        book.assign(**{"Contract Duration (Months)": duration, "Tariff Type": "Green" if green else "Standard"})
+        for (duration, green), book in books.items()
+    ], ignore_index=True)
+    leading = ["Contract Duration (Months)", "Tariff Type"]
+    combined = combined[leading + [c for c in combined.columns if c not in leading]]
+    return {"All Tariffs": combined, **sheets}
+
+
+def nhh_quote(df, eac, contract_duration, uplifts, profile):
+    """Single-site NHH quote (HH4.py).
+
+    ``uplifts`` is ``(standing, day, night, evw)`` and ``profile`` the
+    day/night/evening-and-weekend split in percent. Returns the matched tariff
+    row and the quote table, or ``(None, None)`` if no tariff covers the EAC.
+    """
+    filtered = df[
+        (df["Rate_Structure"].str.upper() == "NHH") &
+        (df["Contract_Duration"] == contract_duration) &
+        (df["Minimum_Annual_Consumption"] <= eac) &
+        (df["Maximum_Annual_Consumption"] >= eac)
+    ]
+    if filtered.empty:
+        return None, None
+    row = filtered.iloc[0]
+
+    uplift_standing, uplift_day, uplift_night, uplift_evw = uplifts
+    standing_p_day = row["Standing_Charge"] + uplift_standing
+    day_p_kwh = row["Day_Rate"] + uplift_day
+    night_p_kwh = row["Night_Rate"] + uplift_night
+    evw_p_kwh = row["Evening_And_Weekend_Rate"] + uplift_evw
+
+    day_pct, night_pct, evw_pct = profile
+    standing_cost = standing_p_day * 365 / 100
+    day_cost = (eac * (day_pct / 100) * day_p_kwh) / 100
+    night_cost = (eac * (night_pct / 100) * night_p_kwh) / 100
+    evw_cost = (eac * (evw_pct / 100) * evw_p_kwh) / 100
+    total_cost = standing_cost + day_cost + night_cost + evw_cost
+
+    results_df = pd.DataFrame({
+        "Description": [
+            "Standing Charge (p/day)",
+            "Day Rate (p/kWh)",
+            "Night Rate (p/kWh)",
+            "Evening & Weekend Rate (p/kWh)",
+            "Annual Standing Charge (£)",
+            "Annual Day Consumption (£)",
+            "Annual Night Consumption (£)",
+            "Annual Evening & Weekend Consumption (£)",
+            "Estimated Annual Cost (£)"
+        ],
+        "Value": [
+            standing_p_day,
+            day_p_kwh,
+            night_p_kwh,
+            evw_p_kwh,
+            standing_cost,
+            day_cost,
+            night_cost,
+            evw_cost,
+            total_cost
+        ]
+    })
+    return row, results_df
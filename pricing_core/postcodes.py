@@ -0,0 +1,141 @@
+"""Postcode → LDZ resolution.
+
+Postcodes are held as sorted fixed-width byte strings ("SW1A 1AA") alongside
+a small integer LDZ code, with separate sorted tables for sectors ("SW1A 1")
+and districts ("SW1A") carrying the most common LDZ within them. A lookup
+falls back postcode → sector → district using binary searches, and the
+whole national list fits in a few bytes per postcode.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+INWARD_CODE = re.compile(r"^\d[A-Z]{2}$")
+LEVELS = ("postcode", "sector", "district", "sector")
+
+
+def split_postcode(raw):
+    """Split free-text input into (outward, inward); inward may be partial or empty."""
+    text = " ".join(str(raw).upper().split())
+    if " " in text:
+        outward, inward = text.split(" ", 1)
+        return outward, inward.replace(" ", "")
+    if len(text) >= 5 and INWARD_CODE.match(text[-3:]):
+        return text[:-3], text[-3:]
+    return text, ""
+
+
+def _lookup_keys(outward, inward):
+    """Candidate keys for each of LEVELS, most specific first."""
+    keys = [None, None, outward or None, None]
+    if len(inward) == 3:
+        keys[0] = f"{outward} {inward}"
+    if inward:
+        keys[1] = f"{outward} {inward[0]}"
+    elif len(outward) >= 3 and outward[-1].isdigit():
+        # Unspaced sector such as "W1T9" when no district of that name exists
+        keys[3] = f"{outward[:-1]} {outward[-1]}"
+    return keys
+
+
+class _SortedTable:
+    def __init__(self, keys, codes):
+        self.keys = keys
+        self.codes = codes
+
+    @classmethod
+    def first_of(cls, keys, codes):
+        """Table keeping the first code seen for each key."""
+        unique, first = np.unique(keys, return_index=True)
+        return cls(unique, codes[first])
+
+    @classmethod
+    def majority_of(cls, keys, codes, n_codes):
+        """Table keeping the most common code for each key."""
+        unique, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse * n_codes + codes, minlength=len(unique) * n_codes)
+        return cls(unique, counts.reshape(len(unique), n_codes).argmax(axis=1).astype("int16"))
+
+    def find(self, keys):
+        if not len(self.keys):
+            return np.full(len(keys), -1)
+        pos = np.searchsorted(self.keys, keys)
+        pos = np.minimum(pos, len(self.keys) - 1)
+        hit = self.keys[pos] == keys
+        return np.where(hit, self.codes[pos], -1)
+
+
+def _formatted_keys(compact):
+    """Byte keys for each compact postcode at postcode, sector and district level.
+
+    Works on the raw bytes so national-size lists format without a Python
+    string per row; unused trailing bytes are NUL, which NumPy ignores.
+    """
+    lengths = np.char.str_len(compact)
+    chars = compact.view(np.uint8).reshape(len(compact), compact.itemsize)
+    full = np.zeros((len(compact), 8), dtype=np.uint8)
+    sector = np.zeros_like(full)
+    district = np.zeros_like(full)
+    for length in (5, 6, 7):
+        rows = lengths == length
+        out = length - 3
+        full[rows, :out] = chars[rows, :out]
+        full[rows, out] = ord(" ")
+        full[rows, out + 1:out + 4] = chars[rows, out:length]
+        sector[rows, :out + 2] = full[rows, :out + 2]
+        district[rows, :out] = full[rows, :out]
+    return full.view("S8").ravel(), sector.view("S8").ravel(), district.view("S8").ravel()
+
+
+class PostcodeIndex:
+    """Resolve postcodes, sectors and districts to an LDZ."""
+
+    def __init__(self, postcodes, ldzs):
+        compact = pd.Series(postcodes).astype(str).str.upper().str.replace(r"\s+", "", regex=True)
+        valid = compact.str.len().between(5, 7).to_numpy()
+        codes, labels = pd.factorize(pd.Series(ldzs).astype(str).str.strip().to_numpy()[valid])
+        self.labels = np.asarray(labels, dtype=object)
+        codes = codes.astype("int16")
+
+        full, sector, district = _formatted_keys(compact[valid].to_numpy(dtype="S7"))
+        self._full = _SortedTable.first_of(full, codes)
+        self._sector = _SortedTable.majority_of(sector, codes, len(self.labels))
+        self._district = _SortedTable.majority_of(district, codes, len(self.labels))
+
+    def _tables(self):
+        return self._full, self._sector, self._district, self._sector
+
+    def resolve(self, postcode):
+        """Return ``(ldz, level)`` for one postcode, or ``(None, None)``."""
+        keys = _lookup_keys(*split_postcode(postcode))
+        for level, table, key in zip(LEVELS, self._tables(), keys):
+            if key is None:
+                continue
+            code = table.find(np.array([key], dtype="S8"))[0]
+            if code >= 0:
+                return self.labels[code], level
+        return None, None
+
+    def resolve_many(self, postcodes):
+        """Vectorised :meth:`resolve`; returns (ldz, level) arrays with None for misses."""
+        split = [_lookup_keys(*split_postcode(p)) for p in postcodes]
+        codes = np.full(len(split), -1, dtype="int64")
+        levels = np.full(len(split), None, dtype=object)
+
+        for i, (level, table) in enumerate(zip(LEVELS, self._tables())):
+            todo = np.flatnonzero(codes < 0)
+            if not len(todo):
+                break
+            keys = np.array([split[j][i] or "" for j in todo], dtype="S8")
+            found = np.where(keys == b"", -1, table.find(keys))
+            codes[todo] = found
+            levels[todo[found >= 0]] = level
+
+        ldzs = np.where(codes >= 0, self.labels[np.maximum(codes, 0)], None)
+        return ldzs, levels
+
+    @classmethod
+    def from_frame(cls, df, postcode_col="Postcode", ldz_col="LDZ"):
+        return cls(df[postcode_col], df[ldz_col])
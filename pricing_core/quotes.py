@@ -0,0 +1,245 @@
+"""Local SQLite store of issued quotes and price lists.
+
+A quote is one row in ``quotes`` (tool, customer, template version, time)
+plus its lines in ``quote_lines``. The columns searched on (site,
+postcode, LDZ, supplier, duration, consumption, rates, annual cost) are
+pulled out of each line and indexed; every line is also kept whole as
+JSON, so any tool's output can be stored and read back::
+
+    store = QuoteStore()
+    quote_id = store.save_quote("GasdebugMulti10", results_df, customer="Acme Ltd")
+    store.find_lines(postcode="SW1A", since="2025-01-01")
+
+A quote is written in one transaction however many lines it has (a
+DataFrame or an iterable of chunks). The database lives at ``DB_PATH``
+(``quotes.sqlite`` in the repository, or ``DYCE_QUOTE_DB``).
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from pricing_core.export import iter_chunks
+
+DB_PATH = os.environ.get(
+    "DYCE_QUOTE_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "quotes.sqlite"),
+)
+
+# Line column -> output columns it is read from, first match wins
+LINE_COLUMNS = {
+    "site": ["Site"],
+    "postcode": ["Postcode"],
+    "ldz": ["LDZ"],
+    "supplier": ["Supplier"],
+    "contract_duration": ["Contract_Duration", "Contract Duration (Months)"],
+    "annual_consumption": ["Annual Consumption (kWh)", "EAC"],
+    "min_consumption": ["Minimum_Annual_Consumption"],
+    "max_consumption": ["Maximum_Annual_Consumption"],
+    "unit_rate": ["Unit Rate", "Final Unit Rate (p/kWh)", "Unit Rate (p/kWh)", "Day Rate (p/kWh)", "Day_Rate"],
+    "standing_charge": ["Standing Charge", "Final Standing Charge (p/day)", "Standing Charge (p/day)", "Standing_Charge"],
+    "annual_cost": ["Total Annual Cost (£)", "Estimated Annual Cost (£)"],
+}
+TEXT_LINE_COLUMNS = {"site", "postcode", "ldz", "supplier"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    quote_id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    customer TEXT,
+    template_version TEXT,
+    flat_file_key TEXT,
+    notes TEXT,
+    line_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS quotes_customer ON quotes (customer COLLATE NOCASE, created_at);
+CREATE INDEX IF NOT EXISTS quotes_template_version ON quotes (template_version, created_at);
+CREATE INDEX IF NOT EXISTS quotes_created_at ON quotes (created_at);
+
+CREATE TABLE IF NOT EXISTS quote_lines (
+    quote_id INTEGER NOT NULL REFERENCES quotes (quote_id) ON DELETE CASCADE,
+    line_no INTEGER NOT NULL,
+    site TEXT,
+    postcode TEXT,
+    ldz TEXT,
+    supplier TEXT,
+    contract_duration INTEGER,
+    annual_consumption REAL,
+    min_consumption REAL,
+    max_consumption REAL,
+    unit_rate REAL,
+    standing_charge REAL,
+    annual_cost REAL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (quote_id, line_no)
+);
+CREATE INDEX IF NOT EXISTS quote_lines_site ON quote_lines (site COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS quote_lines_postcode ON quote_lines (postcode);
+CREATE INDEX IF NOT EXISTS quote_lines_ldz ON quote_lines (ldz, quote_id DESC, line_no);
+"""
+
+
+def postcode_key(postcode):
+    """Postcodes are stored and searched upper-case without spaces."""
+    return "".join(str(postcode).split()).upper()
+
+
+def _line_values(chunk):
+    """Indexed column values for each line of ``chunk``, in ``LINE_COLUMNS`` order."""
+    columns = []
+    for name, candidates in LINE_COLUMNS.items():
+        source = next((c for c in candidates if c in chunk.columns), None)
+        if source is None:
+            columns.append([None] * len(chunk))
+            continue
+        values = chunk[source]
+        if name in TEXT_LINE_COLUMNS:
+            values = values.astype(object).where(values.notna(), None)
+            if name == "postcode":
+                values = values.map(lambda p: postcode_key(p) if p is not None else None)
+            elif name == "ldz":
+                values = values.map(lambda v: str(v).strip().upper() if v is not None else None)
+            else:
+                values = values.map(lambda v: str(v) if v is not None else None)
+        else:
+            values = pd.to_numeric(values, errors="coerce").astype(object)
+            values = values.where(values.notna(), None)
+        columns.append(values.tolist())
+    return list(zip(*columns))
+
+
+def _where(clauses):
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+class QuoteStore:
+    """Quote history in a SQLite file; each call opens its own connection (safe across Streamlit sessions)."""
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def save_quote(self, tool, lines, customer=None, template_version=None, flat_file_key=None, notes=None,
+                   created_at=None):
+        """Store a quote and its lines in one transaction; returns the new quote id.
+
+        ``lines`` is a DataFrame (one row per site or tariff) or an iterable
+        of DataFrame chunks with the same columns.
+        """
+        created_at = created_at or datetime.now().isoformat(timespec="seconds")
+        placeholders = ", ".join(["?"] * (len(LINE_COLUMNS) + 3))
+        insert_line = f"INSERT INTO quote_lines (quote_id, line_no, {', '.join(LINE_COLUMNS)}, record) VALUES ({placeholders})"
+
+        conn = self._connect()
+        try:
+            with conn:
+                quote_id = conn.execute(
+                    "INSERT INTO quotes (created_at, tool, customer, template_version, flat_file_key, notes) VALUES (?, ?, ?, ?, ?, ?)",
+                    (created_at, tool, customer or None, template_version, flat_file_key, notes),
+                ).lastrowid
+                line_no = 0
+                for chunk in iter_chunks(lines):
+                    if chunk.empty:
+                        continue
+                    records = chunk.to_json(orient="records", lines=True, date_format="iso", force_ascii=False).splitlines()
+                    conn.executemany(insert_line, (
+                        (quote_id, line_no + i, *values, record)
+                        for i, (values, record) in enumerate(zip(_line_values(chunk), records))
+                    ))
+                    line_no += len(chunk)
+                conn.execute("UPDATE quotes SET line_count = ? WHERE quote_id = ?", (line_no, quote_id))
+        finally:
+            conn.close()
+        return quote_id
+
+    def _query(self, sql, params):
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def find_quotes(self, customer=None, template_version=None, tool=None, since=None, until=None, limit=200):
+        """Quote headers, newest first. ``since``/``until`` are ISO dates or timestamps (until is exclusive)."""
+        clauses, params = self._header_filters(customer, template_version, tool, since, until)
+        sql = f"SELECT * FROM quotes q {_where(clauses)} ORDER BY q.created_at DESC, q.quote_id DESC LIMIT ?"
+        return self._query(sql, params + [limit])
+
+    def find_lines(self, postcode=None, ldz=None, site=None, customer=None, template_version=None, tool=None,
+                   since=None, until=None, limit=1000):
+        """Quoted lines with their quote's header, newest first.
+
+        ``postcode`` matches as a prefix, so "SW1A" finds every SW1A postcode.
+        """
+        clauses, params = self._header_filters(customer, template_version, tool, since, until)
+        if postcode:
+            key = postcode_key(postcode)
+            # A range keeps the prefix match on the postcode index
+            clauses.append("l.postcode >= ? AND l.postcode < ?")
+            params += [key, key + "\uffff"]
+        if ldz:
+            clauses.append("l.ldz = ?")
+            params.append(str(ldz).strip().upper())
+        if site:
+            clauses.append("l.site = ? COLLATE NOCASE")
+            params.append(site)
+        columns = ", ".join(f"l.{c}" for c in LINE_COLUMNS)
+        sql = (
+            f"SELECT q.quote_id, q.created_at, q.tool, q.customer, q.template_version, l.line_no, {columns} "
+            f"FROM quote_lines l JOIN quotes q ON q.quote_id = l.quote_id {_where(clauses)} "
+            f"ORDER BY l.quote_id DESC, l.line_no LIMIT ?"
+        )
+        return self._query(sql, params + [limit])
+
+    @staticmethod
+    def _header_filters(customer, template_version, tool, since, until):
+        clauses, params = [], []
+        if customer:
+            clauses.append("q.customer = ? COLLATE NOCASE")
+            params.append(customer)
+        if template_version:
+            clauses.append("q.template_version = ?")
+            params.append(template_version)
+        if tool:
+            clauses.append("q.tool = ?")
+            params.append(tool)
+        if since:
+            clauses.append("q.created_at >= ?")
+            params.append(str(since))
+        if until:
+            clauses.append("q.created_at < ?")
+            params.append(str(until))
+        return clauses, params
+
+    def quote(self, quote_id):
+        """The lines of one quote as originally saved (all columns), in order."""
+        conn = self._connect()
+        try:
+            records = [json.loads(r) for (r,) in conn.execute(
+                "SELECT record FROM quote_lines WHERE quote_id = ? ORDER BY line_no", (quote_id,))]
+        finally:
+            conn.close()
+        return pd.DataFrame.from_records(records)
+
+    def delete_quote(self, quote_id):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM quote_lines WHERE quote_id = ?", (quote_id,))
+                conn.execute("DELETE FROM quotes WHERE quote_id = ?", (quote_id,))
+        finally:
+            conn.close()
@@ -0,0 +1,88 @@
+"""Reference data (SIC codes, LLF mapping, postcode → LDZ) loaded from disk.
+
+The bundled spreadsheets are parsed once and the compiled result (frame,
+hash map or postcode index) is snapshotted under the cache directory, keyed
+by the source file's mtime and size. Editing a source file invalidates its
+snapshot automatically.
+
+When a local file is missing, the GitHub copy is downloaded as before
+(postcode_ldz_full.csv is not bundled) and its compiled result
+snapshotted for the day. Set ``DYCE_REFERENCE_REMOTE=0`` to run air-gapped
+and only ever use local files.
+"""
+
+import hashlib
+import os
+from datetime import date
+
+import pandas as pd
+
+from pricing_core.llf import LLFBandMap
+from pricing_core.postcodes import PostcodeIndex
+from pricing_core.snapshots import cached
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_NAMESPACE = "reference"
+SNAPSHOT_VERSION = "1"
+
+SIC_CODES_PATH = os.environ.get("DYCE_SIC_CODES_PATH", os.path.join(REPO_DIR, "Sic Codes.xlsx"))
+LLF_MAPPING_PATH = os.environ.get("DYCE_LLF_MAPPING_PATH", os.path.join(REPO_DIR, "LLF Mapping Table_External.xlsx"))
+LDZ_DATA_PATH = os.environ.get("DYCE_LDZ_DATA_PATH", os.path.join(REPO_DIR, "postcode_ldz_full.csv"))
+
+SIC_CODES_URL = "https://raw.githubusercontent.com/ChrisBeardsmore/Gas-Pricing/main/Sic%20Codes.xlsx"
+LLF_MAPPING_URL = "https://github.com/ChrisBeardsmore/Gas-Pricing/raw/main/LLF%20Mapping%20Table_External.xlsx"
+LDZ_DATA_URL = "https://raw.githubusercontent.com/ChrisBeardsmore/Gas-Pricing/main/postcode_ldz_full.csv"
+
+
+def remote_enabled():
+    return os.environ.get("DYCE_REFERENCE_REMOTE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _load(name, path, url, build):
+    if os.path.exists(path):
+        stat = os.stat(path)
+        key = f"{name}-{stat.st_mtime_ns}-{stat.st_size}-v{SNAPSHOT_VERSION}"
+        return cached(SNAPSHOT_NAMESPACE, key, lambda: build(path))
+    if remote_enabled():
+        # Downloaded at most once a day per process and cache directory
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        key = f"{name}-remote-{url_hash}-{date.today().isoformat()}-v{SNAPSHOT_VERSION}"
+        return cached(SNAPSHOT_NAMESPACE, key, lambda: build(url))
+    raise FileNotFoundError(
+        f"Reference file not found: {path}. Place it there, point the matching "
+        f"DYCE_*_PATH variable at it, or remove DYCE_REFERENCE_REMOTE=0 to download {url}."
+    )
+
+
+def _read_sic_codes(source):
+    df = pd.read_excel(source)
+    df["SIC_Code"] = df["SIC_Code"].astype(str).str.strip()
+    return df
+
+
+def _read_llf_mapping(source):
+    # The sheet has title rows above the header, so find the DNO/LLF header row
+    raw = pd.read_excel(source, header=None)
+    header_row = next(i for i, row in raw.iterrows() if {"DNO", "LLF", "Band"} <= set(row.astype(str).str.strip()))
+    df = raw.iloc[header_row + 1:].copy()
+    df.columns = raw.iloc[header_row].astype(str).str.strip()
+    return LLFBandMap(df.dropna(subset=["DNO", "LLF"]))
+
+
+def _read_ldz_index(source):
+    return PostcodeIndex.from_frame(pd.read_csv(source, usecols=["Postcode", "LDZ"], dtype=str))
+
+
+def load_sic_codes():
+    """SIC code table with ``SIC_Code`` as trimmed text."""
+    return _load("sic_codes", SIC_CODES_PATH, SIC_CODES_URL, _read_sic_codes)
+
+
+def load_llf_mapping():
+    """:class:`LLFBandMap` over the LLF Mapping Table."""
+    return _load("llf_mapping", LLF_MAPPING_PATH, LLF_MAPPING_URL, _read_llf_mapping)
+
+
+def load_ldz_index():
+    """:class:`PostcodeIndex` over the postcode → LDZ list."""
+    return _load("ldz_index", LDZ_DATA_PATH, LDZ_DATA_URL, _read_ldz_index)
@@ -0,0 +1,153 @@
+"""Credit decision PDF reports, singly or in bulk.
+
+Reports print ``REPORT_LOGO_PATH``, a copy of the Dyce logo saved as plain
+RGB: fpdf splits an RGBA PNG's alpha channel pixel by pixel in Python (about
+a second per document for this logo), while an RGB PNG's image data is
+embedded as it is. The logo is fully opaque, so the copy looks the same.
+Reports use fpdf's built-in Arial, so there are no font files to load. Bulk generation fans out over a process pool and writes the
+finished PDFs into a zip archive as they arrive.
+"""
+
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+from fpdf import FPDF
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGO_PATH = os.path.join(REPO_DIR, "DYCE-DARK BG.png")
+REPORT_LOGO_PATH = os.path.join(REPO_DIR, "DYCE-DARK BG-rgb.png")
+
+# Portfolio columns shown in the "Inputs Summary" of a bulk report
+REPORT_INPUT_COLUMNS = [
+    "Business Name", "Business Type", "Number of Sites", "Annual Volume (kWh)", "Contract Value (£)",
+    "Unit Margin (p/kWh)", "Broker Uplift Standing (p/day)", "Broker Uplift Unit Rate (p/kWh)",
+    "SIC Code", "SIC Risk", "Credit Score", "Years Trading", "CCJs", "Payment Terms",
+]
+
+# Characters common in pasted text that the built-in (latin-1) fonts lack
+_LATIN1_REPLACEMENTS = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201b": "'",
+    "\u201c": '"', "\u201d": '"', "\u201e": '"',
+    "\u2013": "-", "\u2014": "-", "\u2212": "-",
+    "\u2026": "...", "\u2022": "-", "\u00a0": " ",
+})
+
+
+def latin1_text(value):
+    """``value`` as text the built-in fonts can print: smart punctuation made plain, anything else outside latin-1 as "?"."""
+    return str(value).translate(_LATIN1_REPLACEMENTS).encode("latin-1", "replace").decode("latin-1")
+
+
+class PDF(FPDF):
+    def header(self):
+        self.image(REPORT_LOGO_PATH, x=10, y=8, w=50)
+        self.ln(35)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.set_text_color(15, 42, 52)
+        self.cell(0, 10, f'Report generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', 0, 0, 'C')
+
+
+def render_decision_report(inputs, decision, approver, reasons, timestamp):
+    """Return the PDF bytes of one credit decision report."""
+    inputs = {latin1_text(k): latin1_text(v) for k, v in inputs.items()}
+    decision, timestamp = latin1_text(decision), latin1_text(timestamp)
+    approver = latin1_text(approver) if approver else None
+    reasons = [latin1_text(r) for r in reasons]
+
+    pdf = PDF()
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 14)
+    pdf.set_text_color(15, 42, 52)
+    pdf.cell(0, 10, 'Dyce Credit Decision Report', ln=True, align='C')
+    pdf.ln(10)
+
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'Inputs Summary:', ln=True)
+    pdf.set_font('Arial', '', 12)
+    for k, v in inputs.items():
+        pdf.multi_cell(0, 10, f"{k}: {v}")
+
+    pdf.ln(5)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'Decision:', ln=True)
+    pdf.set_font('Arial', '', 12)
+    pdf.multi_cell(0, 10, f"Decision: {decision}\nApprover Required: {approver if approver else 'N/A'}\nTimestamp: {timestamp}")
+
+    pdf.ln(5)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'Reasons / Stipulations:', ln=True)
+    pdf.set_font('Arial', '', 12)
+    for reason in reasons:
+        pdf.multi_cell(0, 10, f"- {reason}")
+
+    data = pdf.output(dest='S')
+    # fpdf 1.7 returns a latin-1 str, fpdf2 bytes
+    return data.encode('latin1') if isinstance(data, str) else bytes(data)
+
+
+def export_to_pdf(inputs, decision, approver, reasons, timestamp):
+    return BytesIO(render_decision_report(inputs, decision, approver, reasons, timestamp))
+
+
+def _render_job(job):
+    file_name, inputs, decision, approver, reasons, timestamp = job
+    try:
+        return file_name, render_decision_report(inputs, decision, approver, reasons, timestamp), None
+    except Exception as e:
+        # One unprintable row must not lose the rest of the batch
+        return file_name, None, f"{type(e).__name__}: {e}"
+
+
+def _report_jobs(decisions):
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    columns = [c for c in REPORT_INPUT_COLUMNS if c in decisions.columns]
+    for i, row in enumerate(decisions.to_dict("records")):
+        name = str(row.get("Business Name", "") or "")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[:60]
+        file_name = f"{i + 1:05d}_{slug or 'account'}.pdf"
+        reasons = [r for r in str(row.get("Reasons") or "").split("; ") if r]
+        approver = row.get("Required Approver")
+        approver = approver if isinstance(approver, str) else None
+        yield file_name, {c: row[c] for c in columns}, row["Decision"], approver, reasons, timestamp
+
+
+def write_reports_zip(decisions, target, max_workers=None, progress=None):
+    """Render a report per row of an ``evaluate_portfolio`` result into a zip.
+
+    ``target`` is a path or binary file object. ``progress(done, total)`` is
+    called from this process after each report is written. A report that
+    fails to render is replaced in the zip by a ``.error.txt`` note; the
+    ``(file_name, error)`` pairs of those reports are returned.
+    """
+    failed = []
+    jobs = list(_report_jobs(decisions))
+    total = len(jobs)
+    chunksize = max(1, min(64, total // ((max_workers or os.cpu_count() or 1) * 4) or 1))
+
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_STORED) as zf:
+        if max_workers == 1:
+            results = map(_render_job, jobs)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+            results = pool.map(_render_job, jobs, chunksize=chunksize)
+        try:
+            for done, (file_name, data, error) in enumerate(results, 1):
+                if error is None:
+                    zf.writestr(file_name, data)
+                else:
+                    failed.append((file_name, error))
+                    zf.writestr(f"{os.path.splitext(file_name)[0]}.error.txt", f"Report could not be rendered: {error}\n")
+                if progress:
+                    progress(done, total)
+        finally:
+            if pool:
+                pool.shutdown()
+    return failed
@@ -0,0 +1,141 @@
+"""Several margin templates priced over one flat file in one pass.
+
+A row's uplift depends only on its contract year, consumption and carbon
+flag, and a flat file has few distinct combinations of those. So the rows
+are grouped once, each template's uplifts are worked out per group (a
+templates × groups table), and the final prices for every template come
+from broadcasting that table back over the rows::
+
+    scenarios = ScenarioSet(df, {"v3": year_inputs_v3, "v4": year_inputs_v4})
+    scenarios.summary("LDZ")   # mean prices per LDZ and template, with deltas to v3
+    scenarios.price("v4")      # == price_flat_file(df, year_inputs_v4)
+
+Adding templates adds work on the small table and on the broadcast
+arithmetic only; the grouping, band lookups and aggregation are shared.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.bands import GAS_BANDS, band_label
+from pricing_core.uplifts import apply_uplifts, band_positions, carbon_flags, contract_years, year_uplifts
+
+SCENARIO_METRICS = ["Unit Rate", "Standing Charge", "Total Annual Cost (£)"]
+SUMMARY_GROUPS = ["Band", "LDZ"]
+
+
+def _factorize_rows(*columns):
+    """One code per distinct combination of ``columns`` and the position of its first row."""
+    codes = np.zeros(len(columns[0]), dtype="int64")
+    for values in columns:
+        column_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        codes, _ = pd.factorize(codes * len(uniques) + column_codes)
+    first = np.unique(codes, return_index=True)[1]
+    return codes, first
+
+
+class ScenarioSet:
+    """A flat file priced under several templates (``{label: year_inputs}``, the first is the baseline).
+
+    ``bands`` are the consumption bands the per-band summary reports on;
+    they default to the baseline template's year 1 bands.
+    """
+
+    def __init__(self, df, scenarios, bands=None, chunk_rows=16_384):
+        if not scenarios:
+            raise ValueError("At least one scenario is needed")
+        scenarios = {label: {int(y): c for y, c in year_inputs.items()} for label, year_inputs in scenarios.items()}
+        self.df = df.reset_index(drop=True)
+        self.labels = list(scenarios)
+        self.chunk_rows = chunk_rows
+        self.consumption = self.df["Minimum_Annual_Consumption"].to_numpy(dtype="float64")
+        self.unit_rate = self.df["Unit_Rate"].to_numpy(dtype="float64")
+        self.standing_charge = self.df["Standing_Charge"].to_numpy(dtype="float64")
+
+        years = contract_years(self.df)
+        carbon = carbon_flags(self.df)
+        self.codes, first = _factorize_rows(years, self.consumption, carbon)
+
+        # templates × groups uplift tables; a year with no configuration gets zero uplift
+        group_years, group_consumption, group_carbon = years[first], self.consumption[first], carbon[first]
+        self.uplift_unit = np.zeros((len(self.labels), len(first)))
+        self.uplift_standing = np.zeros((len(self.labels), len(first)))
+        for t, year_inputs in enumerate(scenarios.values()):
+            for year, year_config in year_inputs.items():
+                groups = np.flatnonzero(group_years == year)
+                if len(groups):
+                    self.uplift_unit[t, groups], self.uplift_standing[t, groups] = year_uplifts(
+                        group_consumption[groups], group_carbon[groups], year_config)
+
+        if bands is None:
+            baseline = scenarios[self.labels[0]]
+            first_year = baseline.get(1) or next(iter(baseline.values()), None)
+            bands = first_year["bands"] if first_year else GAS_BANDS
+        self.bands = bands
+
+    def _prices(self, rows):
+        """Unit rate, standing charge and annual cost for ``rows`` under every template (templates × rows)."""
+        codes = self.codes[rows]
+        consumption = self.consumption[rows]
+        unit_rate = np.round(self.unit_rate[rows] + self.uplift_unit[:, codes], 4)
+        standing_charge = np.round(self.standing_charge[rows] + self.uplift_standing[:, codes], 4)
+        total = ((standing_charge * 365) + (unit_rate * consumption)) / 100
+        return unit_rate, standing_charge, total
+
+    def group_codes(self, by):
+        """Group code per row and the group labels, for ``by`` in ``SUMMARY_GROUPS``."""
+        if by == "Band":
+            labels = [band_label(b["Min"], b["Max"]) for b in self.bands]
+            return band_positions(self.consumption, self.bands), labels
+        codes, uniques = pd.factorize(self.df[by].astype(object).fillna("(none)"), sort=True)
+        return codes, [str(u) for u in uniques]
+
+    def summaries(self, groupings=SUMMARY_GROUPS):
+        """``{by: summary}`` for several groupings, from one pass over the rows (see ``summary``)."""
+        n_templates = len(self.labels)
+        grouped = {by: self.group_codes(by) for by in groupings}
+        sums = {by: np.zeros((len(SCENARIO_METRICS), n_templates * len(groups))) for by, (_, groups) in grouped.items()}
+
+        # Each chunk is priced under every template once, then binned by
+        # (template, group) for every grouping
+        for start in range(0, len(self.df), self.chunk_rows):
+            rows = np.arange(start, min(start + self.chunk_rows, len(self.df)))
+            prices = [values.ravel() for values in self._prices(rows)]
+            for by, (codes, groups) in grouped.items():
+                pairs = (np.arange(n_templates)[:, None] * len(groups) + codes[rows]).ravel()
+                for m, values in enumerate(prices):
+                    sums[by][m] += np.bincount(pairs, weights=values, minlength=n_templates * len(groups))
+
+        return {by: self._summary_frame(by, groups, codes, sums[by]) for by, (codes, groups) in grouped.items()}
+
+    def summary(self, by="Band"):
+        """Mean unit rate, standing charge and annual cost per group and template.
+
+        The delta columns are each template's means minus the baseline's.
+        """
+        return self.summaries([by])[by]
+
+    def _summary_frame(self, by, groups, codes, sums):
+        n_templates, n_groups = len(self.labels), len(groups)
+        counts = np.bincount(codes, minlength=n_groups)
+        means = sums.reshape(len(SCENARIO_METRICS), n_templates, n_groups) / np.maximum(counts, 1)
+
+        summary = pd.DataFrame({
+            by: np.tile(groups, n_templates),
+            "Scenario": np.repeat(self.labels, n_groups),
+            "Rows": np.tile(counts, n_templates),
+        })
+        for m, metric in enumerate(SCENARIO_METRICS):
+            summary[metric] = means[m].ravel()
+        for m, metric in enumerate(SCENARIO_METRICS):
+            summary[f"Δ {metric}"] = (means[m] - means[m][0]).ravel()
+        return summary[summary["Rows"] > 0].reset_index(drop=True)
+
+    def price(self, label):
+        """The full priced frame for one template, as ``price_flat_file`` returns it."""
+        t = self.labels.index(label)
+        uplifts = pd.DataFrame({
+            "Uplift_Unit": self.uplift_unit[t, self.codes],
+            "Uplift_Standing": self.uplift_standing[t, self.codes],
+        })
+        return apply_uplifts(self.df, uplifts)
@@ -0,0 +1,176 @@
+"""Declared dtypes for supplier flat files.
+
+``pd.read_excel`` leaves every text column as Python strings, which is
+most of a flat file's memory and makes every ``==`` filter a string
+comparison. ``apply_schema`` converts the known columns after parsing:
+
+* headers that only differ in case, spacing or punctuation from a known
+  column ("Unit Rate", "carbon offset") are renamed to it, so files from
+  different suppliers share one set of columns;
+* low-cardinality text (LDZ, Utility, Rate_Structure...) to categoricals;
+* Carbon_Offset / Green_Energy to nullable booleans (yes/y/true/1 and
+  no/n/false/0 in any case);
+* whole-number columns to the narrowest integer type that holds them;
+* date columns to datetime64.
+
+Exports write the flag columns back as Yes/No (``flags_as_text``), as the
+suppliers' files and the tools' earlier output spelled them.
+
+A column is only converted when every value survives the conversion;
+otherwise it is left as parsed. Rates stay float64: prices are rounded to
+4 dp after uplifts are added, float32 only carries about 7 significant
+digits, and fixed-point would change every consumer of the rate columns.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+TRUTHY = {"yes", "y", "true", "1"}
+FALSY = {"no", "n", "false", "0"}
+
+CATEGORY_COLUMNS = ["Utility", "LDZ", "Exit_Zone", "Sale_Type", "Product_Name", "Rate_Structure", "LLF_Band"]
+FLAG_COLUMNS = ["Carbon_Offset", "Green_Energy"]
+DATE_COLUMNS = [
+    "Production_Date",
+    "Minimum_Contract_Start_Date",
+    "Maximum_Contract_Start_Date",
+    "Minimum_Valid_Quote_Date",
+    "Maximum_Valid_Quote_Date",
+]
+# Narrowest type each column may take; kept wide enough for arithmetic on the values
+INTEGER_COLUMNS = {
+    "Broker_ID": "int32",
+    "DNO_ID": "int16",
+    "Contract_Duration": "int16",
+    "Minimum_Annual_Consumption": "int32",
+    "Maximum_Annual_Consumption": "int32",
+    "Minimum_Credit_Score": "int16",
+    "Maximum_Credit_Score": "int16",
+}
+RATE_COLUMNS = [
+    "Unit_Rate",
+    "Standing_Charge",
+    "Standard_Rate",
+    "Day_Rate",
+    "Night_Rate",
+    "Evening_And_Weekend_Rate",
+    "Capacity_Rate",
+    "Metering_Charge",
+]
+INTEGER_TYPES = ["int16", "int32", "int64"]
+KNOWN_COLUMNS = CATEGORY_COLUMNS + FLAG_COLUMNS + DATE_COLUMNS + list(INTEGER_COLUMNS) + RATE_COLUMNS
+
+
+def _squash(name):
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+_CANONICAL = {_squash(column): column for column in KNOWN_COLUMNS}
+
+
+def canonical_columns(columns):
+    """Column names with known columns spelled as in the schema.
+
+    A header is left alone if the canonical name is already taken.
+    """
+    taken = set(columns)
+    renamed = []
+    for column in columns:
+        target = _CANONICAL.get(_squash(column), column)
+        if target != column and target not in taken:
+            taken.add(target)
+            column = target
+        renamed.append(column)
+    return renamed
+
+
+def map_categories(col, func):
+    """Categorical of ``func(value)`` for each row, calling ``func`` once per distinct value."""
+    codes, uniques = pd.factorize(col)
+    # The trailing NaN is what code -1 (a missing value) maps to
+    mapped = pd.Categorical([func(u) for u in uniques] + [np.nan])
+    return pd.Series(pd.Categorical.from_codes(mapped.codes[codes], dtype=mapped.dtype), index=col.index, name=col.name)
+
+
+def to_category(col):
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col
+    if not (pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col)):
+        return col
+    return col.astype("category")
+
+
+def to_flag(col):
+    if pd.api.types.is_bool_dtype(col):
+        return col.astype("boolean")
+    codes, uniques = pd.factorize(col)
+    flags = []
+    for value in uniques:
+        text = str(value).strip().lower()
+        if text in TRUTHY:
+            flags.append(True)
+        elif text in FALSY:
+            flags.append(False)
+        elif text == "":
+            flags.append(None)
+        else:
+            # Not a flag column after all
+            return col
+    lookup = pd.array(flags + [None], dtype="boolean")
+    return pd.Series(lookup[codes], index=col.index, name=col.name)
+
+
+def flags_as_text(df):
+    """``df`` with boolean ``FLAG_COLUMNS`` as "Yes"/"No" (blank stays blank); other frames are returned as they are."""
+    flags = [c for c in FLAG_COLUMNS if c in df.columns and pd.api.types.is_bool_dtype(df[c])]
+    if not flags:
+        return df
+    return df.assign(**{c: df[c].astype(object).map({True: "Yes", False: "No"}) for c in flags})
+
+
+def to_integer(col, narrowest):
+    if not pd.api.types.is_numeric_dtype(col) or pd.api.types.is_bool_dtype(col) or col.isna().any():
+        return col
+    values = col.to_numpy()
+    if len(values) == 0:
+        return col
+    if values.dtype.kind == "f" and not np.array_equal(values, np.trunc(values)):
+        return col
+    low, high = values.min(), values.max()
+    for dtype in INTEGER_TYPES[INTEGER_TYPES.index(narrowest):]:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return col.astype(dtype)
+    return col
+
+
+def to_datetime(col):
+    if pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    converted = pd.to_datetime(col, errors="coerce")
+    if converted.notna().sum() != col.notna().sum():
+        return col
+    return converted
+
+
+def apply_schema(df):
+    """Convert the declared columns of a parsed flat file in place and return it."""
+    df.columns = canonical_columns(list(df.columns))
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = to_category(df[column])
+    for column in FLAG_COLUMNS:
+        if column in df.columns:
+            df[column] = to_flag(df[column])
+    for column, narrowest in INTEGER_COLUMNS.items():
+        if column in df.columns:
+            df[column] = to_integer(df[column], narrowest)
+    for column in DATE_COLUMNS:
+        if column in df.columns:
+            df[column] = to_datetime(df[column])
+    for column in RATE_COLUMNS:
+        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column]):
+            df[column] = df[column].astype("float64")
+    return df
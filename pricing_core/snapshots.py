@@ -0,0 +1,49 @@
+"""On-disk snapshots of parsed data, keyed by content hash or source stamp."""
+
+import os
+import pickle
+import tempfile
+
+CACHE_DIR = os.environ.get(
+    "DYCE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+
+
+def snapshot_path(namespace, key):
+    return os.path.join(CACHE_DIR, namespace, f"{key}.pkl")
+
+
+def read_snapshot(namespace, key):
+    """Return the stored object for ``key`` or ``None`` if there isn't one."""
+    path = snapshot_path(namespace, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # A truncated or stale snapshot is just a cache miss
+        return None
+
+
+def write_snapshot(namespace, key, obj):
+    """Store ``obj`` atomically; failures are ignored because the cache is optional."""
+    path = snapshot_path(namespace, key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def cached(namespace, key, build):
+    """Return the snapshot for ``key``, building and storing it on a miss."""
+    obj = read_snapshot(namespace, key)
+    if obj is None:
+        obj = build()
+        write_snapshot(namespace, key, obj)
+    return obj
@@ -0,0 +1,83 @@
+"""Several suppliers' flat files combined into one tariff table.
+
+Each file goes through the usual ingestion (schema, snapshot cache), the
+uncached ones in parallel, and the frames are stacked with a ``Supplier``
+column naming the file each row came from. Every tool that indexes or
+filters one flat file can then work on all suppliers at once; the gas
+tariff index, for instance, already returns the cheapest matching row
+across the combined table.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.ingest import flat_file_key, load_flat_files, read_source_bytes
+
+SUPPLIER_COLUMN = "Supplier"
+
+
+def supplier_name(source):
+    """Supplier label for an uploaded file or path: the file name without its extension."""
+    name = getattr(source, "name", None) or str(source)
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def unique_names(names):
+    """``names`` with repeats numbered, e.g. ["Acme", "Acme (2)"]."""
+    seen = {}
+    result = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        result.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return result
+
+
+def _combined_key(names, keys):
+    parts = "|".join(f"{name}={key}" for name, key in zip(names, keys))
+    return "suppliers-" + hashlib.sha256(parts.encode("utf-8")).hexdigest()
+
+
+def suppliers_key(sources, names=None):
+    """The ``flat_file_key`` that ``load_suppliers`` would give these files, without parsing them."""
+    sources = list(sources)
+    names = list(names) if names is not None else [supplier_name(source) for source in sources]
+    return _combined_key(unique_names(names), [flat_file_key(read_source_bytes(source)) for source in sources])
+
+
+def combine_suppliers(frames, names):
+    """Stack flat files into one frame with a categorical ``Supplier`` column first.
+
+    Categorical columns keep a categorical dtype over the union of the
+    files' categories. The combined ``flat_file_key`` is derived from the
+    files' keys and names, so indexes cached per key stay valid.
+    """
+    frames = list(frames)
+    names = unique_names(list(names))
+    for column in {c for df in frames for c in df.columns}:
+        dtypes = [df[column].dtype for df in frames if column in df.columns]
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            categories = pd.Index(sorted({c for dtype in dtypes for c in dtype.categories}))
+            frames = [
+                df.assign(**{column: df[column].cat.set_categories(categories)}) if column in df.columns else df
+                for df in frames
+            ]
+
+    combined = pd.concat(frames, ignore_index=True)
+    codes = np.repeat(np.arange(len(frames)), [len(df) for df in frames])
+    combined.insert(0, SUPPLIER_COLUMN, pd.Categorical.from_codes(codes, categories=names))
+
+    combined.attrs["flat_file_key"] = _combined_key(names, [df.attrs.get("flat_file_key", "") for df in frames])
+    return combined
+
+
+def load_suppliers(sources, names=None, max_workers=None):
+    """Load one flat file per supplier and combine them (see ``combine_suppliers``).
+
+    ``names`` default to the file names.
+    """
+    sources = list(sources)
+    names = list(names) if names is not None else [supplier_name(source) for source in sources]
+    return combine_suppliers(load_flat_files(sources, max_workers=max_workers), names)
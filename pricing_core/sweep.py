@@ -0,0 +1,120 @@
+"""Margin and customer cost over a grid of band uplifts.
+
+For one (year, band, standard/carbon) partition of the flat file, every
+combination of a unit uplift and a standing uplift from two grids is
+priced, and the flat file's total margin (customer cost less the
+supplier's rates) and total customer annual cost are reported::
+
+    sweep = UpliftSweep(df, year_inputs)
+    surface = sweep.sweep(1, 0, unit_grid=np.linspace(0, 2, 21), standing_grid=np.linspace(0, 20, 21))
+
+A unit uplift only moves the unit rate and a standing uplift only the
+standing charge, so each grid is evaluated once against all the band's
+rows (a grid × rows matrix, chunk by chunk) and the surface is the sum of
+the two. Prices keep the price list's per-row rounding to 4 d.p., so every
+grid point matches ``price_flat_file`` with that uplift. The rest of the
+flat file stays priced with ``year_inputs``.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.bands import band_label
+from pricing_core.uplifts import band_positions, calculate_uplifts, carbon_flags, contract_years, cost_uplifts
+
+SWEEP_METRICS = ["Total Margin (£)", "Total Customer Cost (£)", "Band Margin (£)", "Band Customer Cost (£)"]
+
+
+def uplift_grid(low, high, steps):
+    """``steps`` evenly spaced uplifts from ``low`` to ``high``, rounded to 4 d.p. like the price list inputs."""
+    return np.round(np.linspace(low, high, int(steps)), 4)
+
+
+def _rounded_totals(rate, uplift, weight, grid, chunk_rows):
+    """``sum(round(rate + (uplift + g), 4) * weight)`` for every ``g`` in ``grid``."""
+    totals = np.zeros(len(grid))
+    for start in range(0, len(rate), chunk_rows):
+        chunk = slice(start, start + chunk_rows)
+        prices = np.round(rate[chunk] + (uplift[chunk] + grid[:, None]), 4)
+        totals += prices @ weight[chunk]
+    return totals
+
+
+class UpliftSweep:
+    """A flat file priced with ``year_inputs``, ready to sweep one partition's band uplifts at a time."""
+
+    def __init__(self, df, year_inputs, chunk_rows=8192):
+        self.year_inputs = {int(y): c for y, c in year_inputs.items()}
+        self.chunk_rows = chunk_rows
+        self.consumption = df["Minimum_Annual_Consumption"].to_numpy(dtype="float64")
+        self.unit_rate = df["Unit_Rate"].to_numpy(dtype="float64")
+        self.standing_charge = df["Standing_Charge"].to_numpy(dtype="float64")
+        self.years = contract_years(df)
+        self.carbon = carbon_flags(df)
+
+        uplifts = calculate_uplifts(df, self.year_inputs)
+        unit = np.round(self.unit_rate + uplifts["Uplift_Unit"].to_numpy(), 4)
+        standing = np.round(self.standing_charge + uplifts["Uplift_Standing"].to_numpy(), 4)
+        self.customer_cost = ((standing * 365) + (unit * self.consumption)) / 100
+        self.supplier_cost = ((self.standing_charge * 365) + (self.unit_rate * self.consumption)) / 100
+
+        self._bands = {}
+        for year, year_config in self.year_inputs.items():
+            rows = np.flatnonzero(self.years == year)
+            self._bands[year] = (rows, band_positions(self.consumption[rows], year_config["bands"]))
+
+    def partitions(self):
+        """``(year, band, carbon, rows)`` for every non-empty partition of a configured year."""
+        result = []
+        for year, (rows, positions) in self._bands.items():
+            for band in range(len(self.year_inputs[year]["bands"])):
+                for carbon in (False, True):
+                    count = int(np.count_nonzero((positions == band) & (self.carbon[rows] == carbon)))
+                    if count:
+                        result.append((year, band, carbon, count))
+        return result
+
+    def rows(self, year, band, carbon=False):
+        """Row positions of one partition."""
+        rows, positions = self._bands[int(year)]
+        return rows[(positions == band) & (self.carbon[rows] == carbon)]
+
+    def sweep(self, year, band, unit_grid, standing_grid, carbon=False):
+        """One row per (unit uplift, standing uplift) with the partition's and the flat file's totals."""
+        unit_grid = np.asarray(unit_grid, dtype="float64")
+        standing_grid = np.asarray(standing_grid, dtype="float64")
+        rows = self.rows(year, band, carbon)
+        consumption = self.consumption[rows]
+        cost_unit, cost_standing = (
+            np.broadcast_to(np.asarray(u, dtype="float64"), consumption.shape)
+            for u in cost_uplifts(consumption, self.year_inputs[int(year)])
+        )
+
+        unit_totals = _rounded_totals(self.unit_rate[rows], cost_unit, consumption / 100, unit_grid, self.chunk_rows)
+        standing_totals = _rounded_totals(self.standing_charge[rows], cost_standing, np.full(len(rows), 365 / 100),
+                                          standing_grid, self.chunk_rows)
+        band_cost = (unit_totals[:, None] + standing_totals[None, :]).ravel()
+        band_margin = band_cost - self.supplier_cost[rows].sum()
+
+        # Everything outside the partition keeps its current prices
+        other_cost = self.customer_cost.sum() - self.customer_cost[rows].sum()
+        other_margin = other_cost - (self.supplier_cost.sum() - self.supplier_cost[rows].sum())
+
+        bands = self.year_inputs[int(year)]["bands"]
+        return pd.DataFrame({
+            "Year": int(year),
+            "Band": band_label(bands[band]["Min"], bands[band]["Max"]),
+            "Product": "Carbon" if carbon else "Standard",
+            "Tariffs": len(rows),
+            "Unit Uplift (p/kWh)": np.repeat(unit_grid, len(standing_grid)),
+            "Standing Uplift (p/day)": np.tile(standing_grid, len(unit_grid)),
+            "Total Margin (£)": other_margin + band_margin,
+            "Total Customer Cost (£)": other_cost + band_cost,
+            "Band Margin (£)": band_margin,
+            "Band Customer Cost (£)": band_cost,
+        })
+
+    def sweep_all(self, unit_grid, standing_grid):
+        """``sweep`` for every non-empty partition, stacked."""
+        frames = [self.sweep(year, band, unit_grid, standing_grid, carbon) for year, band, carbon, _ in self.partitions()]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Year", "Band", "Product"])
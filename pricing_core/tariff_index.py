@@ -0,0 +1,126 @@
+"""Tariff lookup index for the multi-site quoting tools.
+
+Rows of a flat file are grouped by their exact-match key columns (LDZ or
+DNO/LLF band, duration, carbon/green flag, rate structure...). Within a group
+the Min/Max consumption bounds are cut into elementary pieces, and every
+piece keeps the rows covering it already in preference order (cheapest
+first, or file order). A site lookup is then a dict hit plus one binary
+search, however large the flat file gets.
+"""
+
+import numpy as np
+import pandas as pd
+
+MIN_COLUMN = "Minimum_Annual_Consumption"
+MAX_COLUMN = "Maximum_Annual_Consumption"
+
+
+class _IntervalTable:
+    def __init__(self, mins, maxs, rows):
+        keep = ~(np.isnan(mins) | np.isnan(maxs)) & (mins <= maxs)
+        mins, maxs, rows = mins[keep], maxs[keep], rows[keep]
+
+        self.points = np.unique(np.concatenate([mins, maxs]))
+        # Piece 2i is the point points[i]; piece 2i+1 the open gap after it
+        first = 2 * np.searchsorted(self.points, mins)
+        last = 2 * np.searchsorted(self.points, maxs)
+        lengths = last - first + 1
+
+        pieces = np.repeat(first, lengths) + _ranges(lengths)
+        members = np.repeat(rows, lengths)
+        order = np.argsort(pieces, kind="stable")
+        self.rows = members[order]
+        n_pieces = max(2 * len(self.points) - 1, 0)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(pieces, minlength=n_pieces))])
+
+    def piece(self, value):
+        i = int(np.searchsorted(self.points, value))
+        if i < len(self.points) and self.points[i] == value:
+            return 2 * i
+        if 0 < i < len(self.points):
+            return 2 * i - 1
+        return None
+
+    def best_many(self, values):
+        """First candidate row for each value, -1 where nothing covers it."""
+        values = np.asarray(values, dtype="float64")
+        n_points = len(self.points)
+        if not n_points:
+            return np.full(len(values), -1)
+        i = np.searchsorted(self.points, values)
+        exact = (i < n_points) & (self.points[np.minimum(i, n_points - 1)] == values)
+        inside = exact | ((i > 0) & (i < n_points))
+        j = np.where(exact, 2 * i, np.maximum(2 * i - 1, 0))
+        j = np.where(inside, j, 0)
+        start = self.indptr[j]
+        found = inside & (self.indptr[j + 1] > start)
+        return np.where(found, self.rows[np.minimum(start, len(self.rows) - 1)], -1)
+
+    def candidates(self, value):
+        j = self.piece(value)
+        if j is None:
+            return self.rows[:0]
+        return self.rows[self.indptr[j]:self.indptr[j + 1]]
+
+
+def _ranges(lengths):
+    """Concatenated ``arange(n)`` for each n in ``lengths``."""
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype="int64")
+    starts = np.cumsum(lengths) - lengths
+    return np.arange(total) - np.repeat(starts, lengths)
+
+
+class TariffIndex:
+    """Exact-match keys plus consumption intervals over one flat file.
+
+    ``keys`` are the columns compared with ``==`` (values must already be
+    normalised the way lookups will be keyed). When ``order_by`` is given,
+    candidates come back sorted by that column (e.g. cheapest Unit_Rate
+    first, ties in file order); otherwise in file order.
+    """
+
+    def __init__(self, df, keys, order_by=None, min_col=MIN_COLUMN, max_col=MAX_COLUMN):
+        self.keys = list(keys)
+        if order_by is None:
+            preference = np.arange(len(df))
+        else:
+            preference = np.argsort(df[order_by].to_numpy(dtype="float64"), kind="stable")
+
+        mins = df[min_col].to_numpy(dtype="float64")[preference]
+        maxs = df[max_col].to_numpy(dtype="float64")[preference]
+        grouped = df[self.keys].iloc[preference].groupby(self.keys, sort=False, dropna=False, observed=True).indices
+
+        self._tables = {}
+        for key, positions in grouped.items():
+            key = key if isinstance(key, tuple) else (key,)
+            self._tables[key] = _IntervalTable(mins[positions], maxs[positions], preference[positions])
+
+    def candidates(self, key, consumption):
+        """Row positions matching ``key`` whose band covers ``consumption``, best first."""
+        table = self._tables.get(tuple(key))
+        if table is None:
+            return np.zeros(0, dtype="int64")
+        return table.candidates(consumption)
+
+    def best(self, key, consumption):
+        """Position of the preferred matching row, or ``None``."""
+        rows = self.candidates(key, consumption)
+        return int(rows[0]) if len(rows) else None
+
+    def best_many(self, keys, consumption):
+        """Preferred row position for many lookups at once, -1 where none match.
+
+        ``keys`` is a DataFrame (or list of tuples) of key values in the
+        order of ``self.keys``; lookups sharing a key are answered together.
+        """
+        keys = pd.DataFrame(keys).reset_index(drop=True)
+        keys.columns = range(keys.shape[1])
+        consumption = np.asarray(consumption, dtype="float64")
+        result = np.full(len(keys), -1, dtype="int64")
+        for key, positions in keys.groupby(list(keys.columns), sort=False, dropna=False).indices.items():
+            table = self._tables.get(key if isinstance(key, tuple) else (key,))
+            if table is not None:
+                result[positions] = table.best_many(consumption[positions])
+        return result
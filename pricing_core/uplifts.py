@@ -0,0 +1,144 @@
+"""Columnar band/year uplift engine for the gas flat-file pricers.
+
+``year_inputs`` has the shape built by Gaswcost4.py (and saved in margin
+templates): ``{year: {"cost_method": "fixed" | "per_kwh", ..., "bands": [...]}}``
+where each band carries Min/Max plus Standard/Carbon unit and standing uplifts.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.schema import TRUTHY
+
+UPLIFT_COLUMNS = ["Uplift_Unit", "Uplift_Standing"]
+CREDIT_SCORE_COLUMNS = ["Minimum_Credit_Score", "Maximum_Credit_Score"]
+
+
+def contract_years(df):
+    """Whole contract years for each row, i.e. ``int(Contract_Duration / 12)``."""
+    return np.trunc(df["Contract_Duration"].to_numpy(dtype="float64") / 12).astype("int64")
+
+
+def carbon_flags(df):
+    """True where the row's Carbon_Offset reads as yes/y/true/1."""
+    if "Carbon_Offset" not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    col = df["Carbon_Offset"]
+    if pd.api.types.is_bool_dtype(col):
+        return col.fillna(False).to_numpy(dtype=bool)
+    # Only the distinct values need string parsing
+    codes, uniques = pd.factorize(col)
+    truth = np.array([str(u).strip().lower() in TRUTHY for u in uniques] + [False])
+    return truth[codes]
+
+
+def band_positions(consumption, bands):
+    """Index of the first band whose Min <= consumption <= Max, else the last band."""
+    mins = np.array([b["Min"] for b in bands], dtype="float64")
+    maxs = np.array([b["Max"] for b in bands], dtype="float64")
+    last = len(bands) - 1
+
+    if np.all(mins[1:] > maxs[:-1]) and np.all(mins <= maxs):
+        # Sorted, non-overlapping bands: one boundary search covers every row
+        pos = np.searchsorted(mins, consumption, side="right") - 1
+        clipped = np.clip(pos, 0, last)
+        hit = (pos >= 0) & (consumption <= maxs[clipped])
+        return np.where(hit, clipped, last)
+
+    # Overlapping or unsorted bands keep "first match wins"
+    pos = np.full(len(consumption), last)
+    for i in range(last, -1, -1):
+        pos[(mins[i] <= consumption) & (consumption <= maxs[i])] = i
+    return pos
+
+
+def _band_uplifts(consumption, is_carbon, bands):
+    pos = band_positions(consumption, bands)
+    carbon_col = is_carbon.astype(int)
+    unit_table = np.array([[b["Standard_Unit"], b["Carbon_Unit"]] for b in bands], dtype="float64")
+    standing_table = np.array([[b["Standard_Standing"], b["Carbon_Standing"]] for b in bands], dtype="float64")
+    return unit_table[pos, carbon_col], standing_table[pos, carbon_col]
+
+
+def band_uplifts(df, bands):
+    """Uplift_Unit / Uplift_Standing from the band uplifts alone, whatever the contract length (Gas105.py)."""
+    consumption = df["Minimum_Annual_Consumption"].to_numpy(dtype="float64")
+    uplift_unit, uplift_standing = _band_uplifts(consumption, carbon_flags(df), bands)
+    return pd.DataFrame({"Uplift_Unit": uplift_unit, "Uplift_Standing": uplift_standing})
+
+
+def cost_uplifts(consumption, year_config):
+    """Unit and standing uplifts from a year's cost inputs alone (fixed £ per meter or p/kWh)."""
+    if year_config["cost_method"] == "fixed":
+        fixed = year_config["fixed_cost"] * 100
+        cost_standing = (fixed * year_config["standing_pct"] / 100) / 365
+        cost_unit = (fixed * year_config["unit_pct"] / 100) / np.maximum(consumption, 1)
+    else:
+        cost_standing = 0
+        cost_unit = year_config["ppkwh"]
+    return cost_unit, cost_standing
+
+
+def year_uplifts(consumption, is_carbon, year_config):
+    """Unit and standing uplift arrays for rows priced with one year's configuration."""
+    cost_unit, cost_standing = cost_uplifts(consumption, year_config)
+    band_unit, band_standing = _band_uplifts(consumption, is_carbon, year_config["bands"])
+    return cost_unit + band_unit, cost_standing + band_standing
+
+
+def calculate_uplifts(df, year_inputs):
+    """Return Uplift_Unit / Uplift_Standing for every row of ``df``.
+
+    Rows whose contract length has no year configuration get zero uplift.
+    """
+    consumption = df["Minimum_Annual_Consumption"].to_numpy(dtype="float64")
+    years = contract_years(df)
+    carbon = carbon_flags(df)
+
+    uplift_unit = np.zeros(len(df))
+    uplift_standing = np.zeros(len(df))
+
+    for year, year_config in year_inputs.items():
+        rows = np.flatnonzero(years == int(year))
+        if not len(rows):
+            continue
+        uplift_unit[rows], uplift_standing[rows] = year_uplifts(consumption[rows], carbon[rows], year_config)
+
+    return pd.DataFrame({"Uplift_Unit": uplift_unit, "Uplift_Standing": uplift_standing})
+
+
+def unconfigured_durations(df, year_inputs):
+    """Contract durations (months) in ``df`` that have no year configuration."""
+    configured = {int(y) for y in year_inputs}
+    missing = ~np.isin(contract_years(df), list(configured))
+    return sorted(df.loc[missing, "Contract_Duration"].dropna().unique())
+
+
+def apply_uplifts(df, uplift_df):
+    """Append ``uplift_df`` and the final Unit Rate / Standing Charge / annual cost columns."""
+    df_final = pd.concat([df.reset_index(drop=True), uplift_df], axis=1)
+
+    df_final["Unit Rate"] = (df_final["Unit_Rate"] + df_final["Uplift_Unit"]).round(4)
+    df_final["Standing Charge"] = (df_final["Standing_Charge"] + df_final["Uplift_Standing"]).round(4)
+    df_final["Total Annual Cost (£)"] = ((df_final["Standing Charge"] * 365) + (df_final["Unit Rate"] * df_final["Minimum_Annual_Consumption"])) / 100
+    return df_final
+
+
+def price_flat_file(df, year_inputs):
+    """Price every row of ``df`` with the year/band uplifts of ``year_inputs``."""
+    return apply_uplifts(df, calculate_uplifts(df, year_inputs))
+
+
+def drop_credit_scores(df):
+    """``df`` without the supplier's credit score columns, which the pricing tools do not use."""
+    return df.drop(columns=[col for col in CREDIT_SCORE_COLUMNS if col in df.columns])
+
+
+def broker_columns(columns):
+    """Price-list columns shown to brokers: everything except the raw uplifts."""
+    return [c for c in columns if c not in UPLIFT_COLUMNS]
+
+
+def year_inputs_from_template(template):
+    """``year_inputs`` from a saved margin template (whose year keys are strings)."""
+    return {int(year): config for year, config in template.get("years", {}).items()}
@@ -0,0 +1,84 @@
+"""Date validity windows of flat-file tariffs.
+
+Every tariff row carries a contract start window (Minimum/Maximum
+_Contract_Start_Date) and a quote window (Minimum/Maximum_Valid_Quote_Date).
+A flat file only has a handful of distinct window combinations, so the
+dates are parsed once, each row keeps the code of its combination, and
+asking which rows are valid for a start date and quote date checks the
+combinations once and then looks up the rows' codes::
+
+    validity = ValidityIndex(df)
+    rows = validity.filter(candidates, start_date=date(2025, 4, 1), quote_date=date.today())
+
+A row with a missing bound is never valid for that window, as with the
+old ``pd.to_datetime(...) <= date`` filters.
+"""
+
+import numpy as np
+import pandas as pd
+
+START_WINDOW = ("Minimum_Contract_Start_Date", "Maximum_Contract_Start_Date")
+QUOTE_WINDOW = ("Minimum_Valid_Quote_Date", "Maximum_Valid_Quote_Date")
+
+_NEVER_FROM = np.iinfo("int64").max
+_NEVER_TO = np.iinfo("int64").min
+
+
+def _bounds(df, column, missing):
+    if column not in df.columns:
+        return None
+    values = pd.to_datetime(df[column], errors="coerce").to_numpy(dtype="datetime64[us]").astype("int64")
+    # NaT is the smallest int64
+    values[values == np.iinfo("int64").min] = missing
+    return values
+
+
+def _timestamp(value):
+    return np.datetime64(pd.Timestamp(value), "us").astype("int64")
+
+
+class ValidityIndex:
+    """Which rows of a flat file are valid for a contract start date and quote date.
+
+    A window whose columns are not in the file places no restriction.
+    """
+
+    def __init__(self, df, start_window=START_WINDOW, quote_window=QUOTE_WINDOW):
+        bounds = []
+        self._windows = {}
+        for name, (low_col, high_col) in (("start", start_window), ("quote", quote_window)):
+            low, high = _bounds(df, low_col, _NEVER_FROM), _bounds(df, high_col, _NEVER_TO)
+            if low is None or high is None:
+                continue
+            self._windows[name] = len(bounds)
+            bounds.extend([low, high])
+
+        # Fold the bound columns into one code per distinct combination
+        codes = np.zeros(len(df), dtype="int64")
+        for values in bounds:
+            column_codes, uniques = pd.factorize(values)
+            codes, _ = pd.factorize(codes * len(uniques) + column_codes)
+        first = np.unique(codes, return_index=True)[1]
+        self.codes = codes
+        self.combos = np.column_stack([b[first] for b in bounds]) if bounds else np.zeros((len(first), 0), dtype="int64")
+
+    def valid_combos(self, start_date=None, quote_date=None):
+        """Boolean per window combination; a date of ``None`` is not checked."""
+        valid = np.ones(len(self.combos), dtype=bool)
+        for name, date in (("start", start_date), ("quote", quote_date)):
+            if date is None or name not in self._windows:
+                continue
+            column = self._windows[name]
+            when = _timestamp(date)
+            valid &= (self.combos[:, column] <= when) & (self.combos[:, column + 1] >= when)
+        return valid
+
+    def mask(self, rows=None, start_date=None, quote_date=None):
+        """Boolean mask over ``rows`` (row positions; every row if ``None``)."""
+        codes = self.codes if rows is None else self.codes[rows]
+        return self.valid_combos(start_date, quote_date)[codes]
+
+    def filter(self, rows, start_date=None, quote_date=None):
+        """The positions in ``rows`` that are valid, in their original order."""
+        rows = np.asarray(rows, dtype="int64")
+        return rows[self.mask(rows, start_date, quote_date)]
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from pricing_core.credit import CRITERIA, calibrate, criteria_scores, prediction_accuracy, weight_grid, weighted_total
+
+
+def customers(rows=400, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Creditsafe Score": rng.integers(0, 101, rows),
+        "Years Trading": rng.integers(0, 12, rows),
+        "Sector Risk": rng.choice(["Low", "Medium", "High", "Very High"], rows),
+        "Annual Consumption (MWh)": rng.uniform(0, 800, rows),
+        "Contract Value (£)": rng.uniform(0, 150000, rows),
+    })
+    defaulted = rng.random(rows) < 0.8 - df["Creditsafe Score"].to_numpy() / 150
+    return df, defaulted
+
+
+def test_calibrate_matches_a_brute_force_search():
+    df, defaulted = customers()
+    weights = weight_grid(0.25)
+    cutoffs = np.arange(40, 81)
+    ranked = calibrate(df, defaulted, weights, cutoffs, top=len(weights))
+
+    scores = criteria_scores(df)
+    for _, row in ranked.iterrows():
+        w = [row[f"Weight: {c}"] for c in CRITERIA]
+        total = weighted_total(scores, w)
+        accuracies = [prediction_accuracy(total, defaulted, c) for c in cutoffs]
+        assert row["Accuracy"] == max(accuracies)
+        assert row["Cutoff"] == cutoffs[int(np.argmax(accuracies))]
+
+
+def test_best_cutoff_stays_within_the_cutoffs_searched():
+    df, defaulted = customers(seed=1)
+    ranked = calibrate(df, defaulted, weight_grid(0.25), range(60, 71))
+    assert ranked["Cutoff"].between(60, 70).all()
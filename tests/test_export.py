@@ -0,0 +1,76 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from pricing_core.export import iter_chunks, write_workbooks
+
+
+def priced(rows):
+    return pd.DataFrame({
+        "LDZ": [f"L{i % 3}" for i in range(rows)],
+        "Uplift_Unit": np.arange(rows) / 10,
+        "Unit Rate": np.arange(rows) + 0.5,
+        "Note": [None if i % 4 == 0 else f"n{i}" for i in range(rows)],
+    })
+
+
+def read_sheets(output):
+    return pd.read_excel(io.BytesIO(output.getvalue()), sheet_name=None)
+
+
+def test_sheets_roll_over_at_max_rows():
+    df = priced(10)
+    broker, audit = io.BytesIO(), io.BytesIO()
+    write_workbooks(iter_chunks(df, chunk_rows=3), [
+        (broker, "PriceList", lambda columns: [c for c in columns if c != "Uplift_Unit"]),
+        (audit, "AuditData", None),
+    ], max_rows=4)
+
+    sheets = read_sheets(audit)
+    # A header plus three rows per sheet
+    assert list(sheets) == ["AuditData", "AuditData (2)", "AuditData (3)", "AuditData (4)"]
+    assert [len(sheet) for sheet in sheets.values()] == [3, 3, 3, 1]
+    pd.testing.assert_frame_equal(pd.concat(sheets.values(), ignore_index=True), df)
+
+    sheets = read_sheets(broker)
+    assert list(sheets) == ["PriceList", "PriceList (2)", "PriceList (3)", "PriceList (4)"]
+    pd.testing.assert_frame_equal(pd.concat(sheets.values(), ignore_index=True), df.drop(columns=["Uplift_Unit"]))
+
+
+def test_exactly_full_sheet_does_not_add_an_empty_one():
+    output = io.BytesIO()
+    write_workbooks(priced(6), [(output, "PriceList", ["LDZ", "Unit Rate"])], max_rows=4)
+    sheets = read_sheets(output)
+    assert list(sheets) == ["PriceList", "PriceList (2)"]
+    assert [len(sheet) for sheet in sheets.values()] == [3, 3]
+
+
+def test_no_chunks_still_writes_every_workbook(tmp_path):
+    broker, audit = tmp_path / "broker.xlsx", tmp_path / "audit.xlsx"
+    rows = write_workbooks(iter([]), [(str(broker), "PriceList", ["LDZ", "Unit Rate"]), (str(audit), "AuditData", None)])
+
+    assert rows == 0
+    assert list(read_sheets(io.BytesIO(broker.read_bytes()))["PriceList"].columns) == ["LDZ", "Unit Rate"]
+    assert read_sheets(io.BytesIO(audit.read_bytes()))["AuditData"].empty
+
+
+def test_empty_frame_keeps_its_header():
+    output = io.BytesIO()
+    assert write_workbooks(priced(0), [(output, "AuditData", None)]) == 0
+    assert list(read_sheets(output)["AuditData"].columns) == list(priced(0).columns)
+
+
+def test_flags_are_written_as_yes_no():
+    df = pd.DataFrame({
+        "Carbon_Offset": pd.array([True, False, None], dtype="boolean"),
+        "Green_Energy": [False, True, True],
+        "Unit Rate": [1.0, 2.0, 3.0],
+    })
+    output = io.BytesIO()
+    write_workbooks(iter_chunks(df, chunk_rows=2), [(output, "PriceList", None)])
+    sheet = read_sheets(output)["PriceList"]
+    assert sheet["Carbon_Offset"].tolist()[:2] == ["Yes", "No"]
+    assert pd.isna(sheet["Carbon_Offset"].iloc[2])
+    assert sheet["Green_Energy"].tolist() == ["No", "Yes", "Yes"]
+    assert pd.api.types.is_bool_dtype(df["Carbon_Offset"])
@@ -0,0 +1,106 @@
+import copy
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.flatfiles import gas_flat_file
+from pricing_core.incremental import PricingState
+from pricing_core.uplifts import price_flat_file
+
+BANDS = [
+    {"Min": 0, "Max": 24999},
+    {"Min": 25000, "Max": 73199},
+    {"Min": 73200, "Max": 292999},
+    {"Min": 293000, "Max": 732000},
+]
+
+
+def year_config(seed, **cost):
+    rng = np.random.default_rng(seed)
+    bands = [
+        {**band, **{field: float(np.round(rng.uniform(0, 3), 3))
+                    for field in ("Standard_Unit", "Standard_Standing", "Carbon_Unit", "Carbon_Standing")}}
+        for band in BANDS
+    ]
+    return {**(cost or {"cost_method": "per_kwh", "ppkwh": 0.1}), "bands": bands}
+
+
+def initial_inputs():
+    return {
+        1: year_config(1, cost_method="fixed", fixed_cost=40.0, standing_pct=50, unit_pct=50),
+        2: year_config(2),
+    }
+
+
+def flat_file():
+    df = gas_flat_file(2000, seed=7)
+    df.loc[::17, "Minimum_Annual_Consumption"] = 800000
+    df.loc[::5, "Carbon_Offset"] = "y"
+    return df
+
+
+def edit(inputs, year, change):
+    inputs = copy.deepcopy(inputs)
+    change(inputs, year)
+    return inputs
+
+
+# A new value for every edit, so repeated edits always change something
+VALUES = (round(v * 0.137, 3) for v in itertools.count(1))
+
+EDITS = [
+    ("standard uplift", lambda i, y: i[y]["bands"][1].update(Standard_Unit=next(VALUES))),
+    ("carbon uplift", lambda i, y: i[y]["bands"][-1].update(Carbon_Standing=next(VALUES))),
+    ("both uplifts of a band", lambda i, y: i[y]["bands"][0].update(Standard_Standing=next(VALUES), Carbon_Unit=next(VALUES))),
+    ("cost inputs", lambda i, y: i[y].update(fixed_cost=next(VALUES)) if i[y]["cost_method"] == "fixed" else i[y].update(ppkwh=next(VALUES))),
+    ("cost method", lambda i, y: i.__setitem__(y, {**year_config(9), "bands": i[y]["bands"]})),
+    ("band limit", lambda i, y: i[y]["bands"][1].update(Max=i[y]["bands"][1]["Max"] - 5000)),
+    ("band limits overlapping", lambda i, y: i[y]["bands"][2].update(Min=i[y]["bands"][1]["Min"] + 1000)),
+    ("band removed", lambda i, y: i[y]["bands"].pop(2)),
+    ("band added", lambda i, y: i[y]["bands"].append({**i[y]["bands"][-1], "Min": 732001, "Max": 10**7})),
+    ("year removed", lambda i, y: i.pop(y)),
+    ("year added", lambda i, y: i.__setitem__(3, year_config(3))),
+    ("unchanged", lambda i, y: None),
+]
+
+
+def test_updates_match_a_full_reprice():
+    df = flat_file()
+    inputs = initial_inputs()
+    state = PricingState(df, inputs)
+    pd.testing.assert_frame_equal(state.df_final, price_flat_file(df, inputs))
+
+    # Every edit applies on top of the previous ones, so cached partitions
+    # have to follow band changes made earlier in the sequence
+    uplift_edits = EDITS[:3]
+    for name, change in EDITS + [step for limit in EDITS[5:9] for step in [limit] + uplift_edits]:
+        for year in (1, 2):
+            if year not in inputs:
+                inputs[year] = year_config(10 + year)
+            inputs = edit(inputs, year, change)
+            result = state.update(inputs)
+            expected = price_flat_file(df, inputs)
+            pd.testing.assert_frame_equal(result, expected, obj=f"after {name} in year {year}")
+
+
+def test_only_touched_partitions_are_repriced():
+    df = flat_file()
+    inputs = initial_inputs()
+    state = PricingState(df, inputs)
+
+    state.update(edit(inputs, 1, EDITS[0][1]))
+    years = (df["Contract_Duration"] // 12).to_numpy()
+    assert 0 < state.last_repriced < np.count_nonzero(years == 1)
+
+    state.update(state.year_inputs)
+    assert state.last_repriced == 0
+
+
+def test_update_accepts_string_year_keys():
+    df = flat_file()
+    inputs = initial_inputs()
+    state = PricingState(df, inputs)
+    changed = edit(inputs, 2, EDITS[3][1])
+    result = state.update({str(year): config for year, config in changed.items()})
+    pd.testing.assert_frame_equal(result, price_flat_file(df, changed))
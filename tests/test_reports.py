@@ -0,0 +1,32 @@
+import io
+import zipfile
+
+import pandas as pd
+
+from pricing_core import reports
+from pricing_core.reports import latin1_text, render_decision_report, write_reports_zip
+
+
+def test_report_renders_with_the_logo_and_pasted_punctuation():
+    data = render_decision_report({"Business Name": "O’Brien’s Café – Ltd"}, "Approved", None, ["Margin “fine”…"], "2025-01-01")
+    assert data.startswith(b"%PDF")
+    assert b"/Subtype /Image" in data
+
+
+def test_latin1_text_replaces_what_it_cannot_map():
+    assert latin1_text("“ok” — 5€ ☃") == '"ok" - 5? ?'
+
+
+def test_failing_report_does_not_lose_the_batch(monkeypatch):
+    def render(inputs, decision, approver, reasons, timestamp):
+        if inputs["Business Name"] == "Bad":
+            raise ValueError("cannot render")
+        return b"%PDF"
+
+    monkeypatch.setattr(reports, "render_decision_report", render)
+    decisions = pd.DataFrame({"Business Name": ["Good", "Bad"], "Decision": ["Approved", "Decline"]})
+    target = io.BytesIO()
+    failed = write_reports_zip(decisions, target, max_workers=1)
+
+    assert failed == [("00002_Bad.pdf", "ValueError: cannot render")]
+    assert zipfile.ZipFile(target).namelist() == ["00001_Good.pdf", "00002_Bad.error.txt"]
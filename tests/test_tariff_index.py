@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.flatfiles import LDZS, gas_flat_file
+from pricing_core.bulk import GAS_TARIFF_KEYS, build_gas_index, prepare_gas_tariffs
+from pricing_core.tariff_index import TariffIndex
+
+
+def flat_file(rows=3000, seed=0):
+    df = gas_flat_file(rows, seed=seed)
+    rng = np.random.default_rng(seed)
+    # Distinct rates, so "cheapest" names one row however ties would sort
+    df["Unit_Rate"] = np.round(4 + rng.permutation(rows) / 1000, 4)
+    # Overlapping, nested and inverted consumption bands
+    df.loc[::7, "Maximum_Annual_Consumption"] += 30000
+    df.loc[::11, "Minimum_Annual_Consumption"] = 0
+    df.loc[::13, "Maximum_Annual_Consumption"] = df.loc[::13, "Minimum_Annual_Consumption"] - 1
+    df["Carbon_Offset"] = df["Carbon_Offset"] == "Yes"
+    return prepare_gas_tariffs(df)
+
+
+def sites(df, count=400, seed=1):
+    rng = np.random.default_rng(seed)
+    edges = np.concatenate([df["Minimum_Annual_Consumption"], df["Maximum_Annual_Consumption"]])
+    kwh = np.where(rng.random(count) < 0.5, rng.choice(edges, count), rng.integers(-10, 800000, count))
+    return pd.DataFrame({
+        "LDZ": rng.choice(LDZS + ["ZZ"], count),
+        "Contract_Duration": rng.choice([12, 24, 36, 48], count),
+        "Carbon_Offset": rng.random(count) < 0.5,
+        "kwh": kwh.astype("float64"),
+    })
+
+
+def masked(df, site):
+    """Rows the old boolean-mask filter matched for one site, in file order."""
+    return df[
+        (df["LDZ"] == site["LDZ"]) &
+        (df["Contract_Duration"] == site["Contract_Duration"]) &
+        (df["Minimum_Annual_Consumption"] <= site["kwh"]) &
+        (df["Maximum_Annual_Consumption"] >= site["kwh"]) &
+        (df["Carbon_Offset"] == site["Carbon_Offset"])
+    ]
+
+
+def test_best_matches_cheapest_masked_tariff():
+    df = flat_file()
+    index = build_gas_index(df)
+    lookups = sites(df)
+    best = index.best_many(lookups[GAS_TARIFF_KEYS], lookups["kwh"])
+
+    matched = 0
+    for i, site in lookups.iterrows():
+        tariffs = masked(df, site)
+        expected = tariffs.sort_values("Unit_Rate").index[0] if len(tariffs) else -1
+        assert best[i] == expected
+        assert index.best(tuple(site[GAS_TARIFF_KEYS]), site["kwh"]) == (None if expected == -1 else expected)
+        matched += expected != -1
+    assert 0 < matched < len(lookups)
+
+
+def test_candidates_keep_file_order_without_order_by():
+    df = flat_file(seed=2)
+    index = TariffIndex(df, GAS_TARIFF_KEYS)
+    for _, site in sites(df, seed=3).iterrows():
+        candidates = index.candidates(tuple(site[GAS_TARIFF_KEYS]), site["kwh"])
+        assert list(candidates) == list(masked(df, site).index)
+
+
+def test_unknown_keys_find_nothing():
+    df = flat_file(rows=200)
+    index = build_gas_index(df)
+    assert index.best(("ZZ", 12, False), 5000) is None
+    assert list(index.best_many([("ZZ", 12, False), ("EA", 99, True)], [5000, 5000])) == [-1, -1]
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.flatfiles import gas_flat_file
+from pricing_core.ingest import normalize_flat_file
+from pricing_core.uplifts import calculate_uplifts, price_flat_file
+
+BANDS = [
+    {"Min": 0, "Max": 24999},
+    {"Min": 25000, "Max": 73199},
+    {"Min": 73200, "Max": 292999},
+    {"Min": 293000, "Max": 732000},
+]
+OVERLAPPING_BANDS = [
+    {"Min": 20000, "Max": 80000},
+    {"Min": 0, "Max": 30000},
+    {"Min": 70000, "Max": 300000},
+    {"Min": 250000, "Max": 600000},
+]
+
+
+def band_uplifts(bands, seed):
+    rng = np.random.default_rng(seed)
+    return [
+        {**band, **{field: float(np.round(rng.uniform(0, 3), 3))
+                    for field in ("Standard_Unit", "Standard_Standing", "Carbon_Unit", "Carbon_Standing")}}
+        for band in bands
+    ]
+
+
+def year_inputs(bands=BANDS):
+    return {
+        1: {"cost_method": "fixed", "fixed_cost": 45.0, "standing_pct": 30, "unit_pct": 70, "bands": band_uplifts(bands, 1)},
+        2: {"cost_method": "per_kwh", "ppkwh": 0.125, "bands": band_uplifts(bands, 2)},
+    }
+
+
+def rowwise_price(df, year_inputs):
+    """The row-by-row ``df.apply`` pricing the tools used before pricing_core."""
+    def calculate(row):
+        duration = int(row["Contract_Duration"] / 12)
+        year_config = year_inputs.get(duration)
+        if not year_config:
+            return pd.Series({"Uplift_Unit": 0, "Uplift_Standing": 0})
+
+        cost_unit = cost_standing = 0
+        if year_config["cost_method"] == "fixed":
+            fixed = year_config["fixed_cost"] * 100
+            cost_standing = (fixed * year_config["standing_pct"] / 100) / 365
+            cost_unit = (fixed * year_config["unit_pct"] / 100) / max(row["Minimum_Annual_Consumption"], 1)
+        else:
+            cost_unit = year_config["ppkwh"]
+
+        band = next((b for b in year_config["bands"] if b["Min"] <= row["Minimum_Annual_Consumption"] <= b["Max"]), year_config["bands"][-1])
+        carbon = str(row.get("Carbon_Offset", "")).strip().lower() in ["yes", "y", "true", "1"]
+        uplift_unit = cost_unit + (band["Carbon_Unit"] if carbon else band["Standard_Unit"])
+        uplift_standing = cost_standing + (band["Carbon_Standing"] if carbon else band["Standard_Standing"])
+        return pd.Series({"Uplift_Unit": uplift_unit, "Uplift_Standing": uplift_standing})
+
+    df_final = pd.concat([df.reset_index(drop=True), df.apply(calculate, axis=1)], axis=1)
+    df_final["Unit Rate"] = (df_final["Unit_Rate"] + df_final["Uplift_Unit"]).round(4)
+    df_final["Standing Charge"] = (df_final["Standing_Charge"] + df_final["Uplift_Standing"]).round(4)
+    df_final["Total Annual Cost (£)"] = ((df_final["Standing Charge"] * 365) + (df_final["Unit Rate"] * df_final["Minimum_Annual_Consumption"])) / 100
+    return df_final
+
+
+def flat_file(rows=600, seed=0):
+    df = gas_flat_file(rows, seed=seed).astype({"Minimum_Annual_Consumption": "float64", "Carbon_Offset": object})
+    # Band edges, gaps, consumption beyond every band and a few blanks
+    df.loc[:7, "Minimum_Annual_Consumption"] = [0, 0.5, 24999, 25000, 73199.5, 732000, 900000, np.nan]
+    df.loc[df.index[-5:], "Minimum_Annual_Consumption"] = np.nan
+    spellings = ["Yes", "No", " yes ", "Y", "n", "TRUE", "false", "1", "0", True, False, np.nan, ""]
+    df["Carbon_Offset"] = [spellings[i % len(spellings)] for i in range(len(df))]
+    return df
+
+
+def assert_priced_equal(actual, expected):
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("bands", [BANDS, OVERLAPPING_BANDS], ids=["sorted", "overlapping"])
+def test_price_flat_file_matches_rowwise_apply(bands):
+    df = flat_file()
+    inputs = year_inputs(bands)
+    assert_priced_equal(price_flat_file(df, inputs), rowwise_price(df, inputs))
+
+
+def test_unsorted_bands_keep_first_match():
+    df = flat_file(seed=3)
+    inputs = year_inputs(list(reversed(BANDS)) + [{"Min": 0, "Max": 10**9}])
+    assert_priced_equal(price_flat_file(df, inputs), rowwise_price(df, inputs))
+
+
+def test_unconfigured_years_get_no_uplift():
+    df = flat_file(seed=4)
+    uplifts = calculate_uplifts(df, year_inputs())
+    unconfigured = (df["Contract_Duration"] == 36).to_numpy()
+    assert unconfigured.any()
+    assert (uplifts.loc[unconfigured, ["Uplift_Unit", "Uplift_Standing"]] == 0).all().all()
+
+
+def test_schema_flags_price_like_the_raw_spellings():
+    df = gas_flat_file(600, seed=5)
+    df["Carbon_Offset"] = np.where(np.arange(len(df)) % 3 == 0, "yes", "NO")
+    typed = normalize_flat_file(df.copy())
+    assert pd.api.types.is_bool_dtype(typed["Carbon_Offset"])
+
+    inputs = year_inputs()
+    expected = rowwise_price(df, inputs)
+    actual = price_flat_file(typed, inputs)
+    for column in ["Uplift_Unit", "Uplift_Standing", "Unit Rate", "Standing Charge", "Total Annual Cost (£)"]:
+        np.testing.assert_array_equal(actual[column].to_numpy(dtype="float64"), expected[column].to_numpy(dtype="float64"))